@@ -0,0 +1,111 @@
+"""
+Event-loop stalls while an async pipeline persists generated notes, calling the
+synchronous repositories from coroutines ("blocking") versus awaiting the
+async repositories on a DBExecutor ("executor").
+
+    python -m benchmarks.bench_async_repositories --notes 300 --concurrency 8
+
+Each pipeline task stores a note, its summary, questions, options and
+gradings, as a model response handler would. A ticker coroutine sleeps 1 ms at a
+time; how late it wakes up is the time the loop could not serve anything else.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from repositories.async_repositories import create_async_repositories
+from repositories.db_executor import DBExecutor
+from repositories.grading_repository import GradingRepository
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+from repositories.option_repository import OptionRepository
+from repositories.question_repository import QuestionRepository
+from repositories.summary_repository import SummaryRepository
+
+TEXT = "Cellular respiration turns glucose and oxygen into ATP, water and carbon dioxide. " * 30
+
+
+async def ticker(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - started_at - 0.001)
+
+
+async def run_pipeline(persist, notes: int, concurrency: int) -> tuple[float, list[float]]:
+    lags, stop = [], asyncio.Event()
+    tick = asyncio.create_task(ticker(stop, lags))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def task(i: int) -> None:
+        async with semaphore:
+            await asyncio.sleep(0)  # stands in for awaiting the model
+            await persist(i)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(task(i) for i in range(notes)))
+    elapsed = time.perf_counter() - started_at
+    stop.set()
+    await tick
+    return elapsed, lags
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--questions", type=int, default=10)
+    args = parser.parse_args()
+
+    def quiz(note_id: int) -> list[tuple[str, str, str]]:
+        return [(f"Question {q} of note {note_id}?", "multiple_choice", "A") for q in range(args.questions)]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = MyDB(db_path=os.path.join(tmp_dir, "bench.db"))
+        db.connect()
+        executor = DBExecutor(db.conn)
+        try:
+            notes, summaries = NoteRepository(db.conn), SummaryRepository(db.conn)
+            questions, options, gradings = QuestionRepository(db.conn), OptionRepository(db.conn), GradingRepository(db.conn)
+
+            async def persist_blocking(i: int) -> None:
+                note_id = notes.insert_note(f"Blocking {i}", TEXT + str(i))
+                summaries.insert_summary(note_id, TEXT)
+                question_ids = questions.insert_questions(note_id, quiz(note_id))
+                options.insert_options_for_questions({question_id: ["A", "B", "C", "D"] for question_id in question_ids})
+                gradings.upsert_gradings([(question_id, "A", "A", "Correct", TEXT, TEXT) for question_id in question_ids])
+
+            repos = create_async_repositories(db.conn, executor)
+
+            async def persist_async(i: int) -> None:
+                note_id = await repos["note_repository"].insert_note(f"Async {i}", TEXT + str(i))
+                await repos["summary_repository"].insert_summary(note_id, TEXT)
+                question_ids = await repos["question_repository"].insert_questions(note_id, quiz(note_id))
+                await repos["option_repository"].insert_options_for_questions(
+                    {question_id: ["A", "B", "C", "D"] for question_id in question_ids}
+                )
+                await repos["grading_repository"].upsert_gradings(
+                    [(question_id, "A", "A", "Correct", TEXT, TEXT) for question_id in question_ids]
+                )
+
+            for name, persist in (("blocking", persist_blocking), ("executor", persist_async)):
+                results[name] = asyncio.run(run_pipeline(persist, args.notes, args.concurrency))
+        finally:
+            executor.close()
+            db.close()
+
+    print(f"{args.notes} notes with {args.questions} graded questions, {args.concurrency} tasks at a time")
+    print(f"{'repositories':<14}{'total':>10}{'loop lag p50':>15}{'p99':>10}{'max':>10}")
+    for name, (elapsed, lags) in results.items():
+        lags.sort()
+        p99 = lags[int(len(lags) * 0.99)] if lags else 0.0
+        print(f"{name:<14}{elapsed:>9.2f}s{statistics.median(lags) * 1000:>13.1f}ms"
+              f"{p99 * 1000:>8.1f}ms{lags[-1] * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
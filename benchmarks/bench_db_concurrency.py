@@ -0,0 +1,118 @@
+"""
+Read/write throughput of concurrent sessions against a Back Note database,
+comparing the previous per-session default-journal connections ("before")
+with the pooled WAL connections of MyDB ("after").
+
+    python -m benchmarks.bench_db_concurrency --sessions 8 --seconds 5
+
+Each session loops over a mix of note reads and question inserts, committing
+every write like the repositories do. The database is a fresh temporary file.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+from repositories.question_repository import QuestionRepository
+
+SEED_NOTES = 200
+
+
+def seed(db_path: str) -> None:
+    with MyDB(db_path=db_path) as db:
+        note_repository = NoteRepository(db.conn)
+        for i in range(SEED_NOTES):
+            note_repository.insert_note(f"Note {i}", "Lorem ipsum dolor sit amet. " * 50)
+    # Start each run from the default rollback journal so "before" measures the old setup
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = DELETE;")
+    conn.close()
+
+
+def run_sessions(open_session, sessions: int, seconds: float, write_ratio: float) -> dict:
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def session(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        note_repository, question_repository, close = open_session()
+        reads = writes = errors = 0
+        try:
+            while time.perf_counter() < deadline:
+                note_id = rng.randint(1, SEED_NOTES)
+                try:
+                    if rng.random() < write_ratio:
+                        question_repository.insert_question(note_id, "Q?", "short_answer", "A")
+                        writes += 1
+                    else:
+                        note_repository.get_note(note_id)
+                        reads += 1
+                except Exception:
+                    errors += 1
+        finally:
+            close()
+            with lock:
+                counts["reads"] += reads
+                counts["writes"] += writes
+                counts["errors"] += errors
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--pool-size", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        seed(db_path)
+
+        def open_legacy_session():
+            # What every session used to get: its own connection with default pragmas
+            conn = sqlite3.connect(db_path)
+            conn.execute("PRAGMA foreign_keys = ON;")
+            return NoteRepository(conn), QuestionRepository(conn), conn.close
+
+        print(f"{args.sessions} sessions, {args.seconds:.0f}s each, {args.write_ratio:.0%} writes")
+        print(f"{'setup':<8}{'reads/s':>12}{'writes/s':>12}{'errors':>10}")
+        results = {"before": run_sessions(open_legacy_session, args.sessions, args.seconds, args.write_ratio)}
+
+        # Connecting switches the file to WAL, so the pool is only opened after the "before" run
+        db = MyDB(db_path=db_path, pool_size=args.pool_size)
+        db.connect()
+        shared_note_repository = NoteRepository(db.conn)
+        shared_question_repository = QuestionRepository(db.conn)
+
+        def open_pooled_session():
+            # Sessions share the repositories; the pool hands each thread its own connection
+            return shared_note_repository, shared_question_repository, db.pool.release
+
+        results["after"] = run_sessions(open_pooled_session, args.sessions, args.seconds, args.write_ratio)
+        db.close()
+
+        for name, counts in results.items():
+            print(f"{name:<8}{counts['reads'] / args.seconds:>12.0f}{counts['writes'] / args.seconds:>12.0f}{counts['errors']:>10}")
+
+        before_ops = results["before"]["reads"] + results["before"]["writes"]
+        after_ops = results["after"]["reads"] + results["after"]["writes"]
+        if before_ops:
+            print(f"throughput change: {after_ops / before_ops:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Full-text search latency over many long transcripts: NoteSearchRepository.search
+(FTS5, migration 5) versus a LIKE '%term%' scan of note_content.
+
+    python -m benchmarks.bench_full_text_search --notes 20000 --words 500
+
+Notes are random text over a Zipf-distributed vocabulary of made-up words,
+inserted through the note table so the triggers build the index. Queries
+range from a word in most notes to rare words and prefixes. The database is a
+fresh temporary file.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from repositories.my_db import MyDB
+from repositories.note_search_repository import NoteSearchRepository
+
+VOCABULARY_SIZE = 30000
+# Vocabulary ranks of the searched words: common, mid-frequency and rare, alone and combined
+QUERY_RANKS = {"common word": [20], "mid word": [1000], "rare word": [10000], "two words": [1000, 5000]}
+
+
+def make_vocabulary(rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 10))) for _ in range(VOCABULARY_SIZE)]
+
+
+def median_time(search, query: str, samples: int) -> float:
+    durations = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        search(query)
+        durations.append(time.perf_counter() - started_at)
+    return statistics.median(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=500, help="Words per note")
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng)
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+    queries = {name: " ".join(vocabulary[rank] for rank in ranks) for name, ranks in QUERY_RANKS.items()}
+    queries["prefix"] = vocabulary[5000][:3]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = MyDB(db_path=os.path.join(tmp_dir, "bench.db"))
+        db.connect()
+        try:
+            started_at = time.perf_counter()
+            db.cursor.executemany(
+                "INSERT INTO note (note_name, note_content) VALUES (?, ?)",
+                ((f"Lecture {i}", " ".join(rng.choices(vocabulary, weights, k=args.words))) for i in range(args.notes)),
+            )
+            db.conn.commit()
+            print(f"{args.notes} notes of {args.words} words indexed in {time.perf_counter() - started_at:.1f}s")
+
+            search_repository = NoteSearchRepository(db.conn)
+
+            def like_scan(query: str) -> list:
+                # Every note has to be read to find (let alone rank) all matches
+                conditions = " AND ".join("note_content LIKE ?" for _ in query.split())
+                return db.cursor.execute(
+                    f"SELECT note_id FROM note WHERE {conditions}", [f"%{word}%" for word in query.split()]
+                ).fetchall()
+
+            print(f"{'query (median)':<16}{'LIKE scan':>12}{'FTS5':>12}{'results':>10}")
+            for name, query in queries.items():
+                scan = median_time(like_scan, query, 1)
+                fts = median_time(search_repository.search, query, args.samples)
+                print(f"{name:<16}{scan * 1000:>10.2f}ms{fts * 1000:>10.2f}ms{len(search_repository.search(query)):>10}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
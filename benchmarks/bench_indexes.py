@@ -0,0 +1,132 @@
+"""
+Query time of the repository lookups at 100k+ questions, with and without
+the secondary indexes of schema migration 2.
+
+    python -m benchmarks.bench_indexes --notes 10000 --questions-per-note 10
+
+The database is a fresh temporary file. Each lookup is timed over random
+ids; the indexes are then dropped and the same lookups are timed again.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from repositories.migrations import MIGRATIONS
+from repositories.my_db import MyDB
+from repositories.question_repository import QuestionRepository
+from repositories.option_repository import OptionRepository
+from repositories.grading_repository import GradingRepository
+from repositories.summary_repository import SummaryRepository
+from repositories.note_repository import NoteRepository
+
+INDEX_MIGRATION = next(migration for migration in MIGRATIONS if migration["version"] == 2)
+
+
+def populate(db: MyDB, notes: int, questions_per_note: int) -> None:
+    c = db.cursor
+    c.executemany(
+        "INSERT INTO note (note_id, note_name, note_content) VALUES (?, ?, ?)",
+        ((i, f"Note {i}", "content") for i in range(1, notes + 1)),
+    )
+    c.executemany(
+        "INSERT INTO summary (note_id, summary) VALUES (?, ?)",
+        ((i, "summary") for i in range(1, notes + 1)),
+    )
+    question_ids = range(1, notes * questions_per_note + 1)
+    c.executemany(
+        "INSERT INTO question (question_id, note_id, question, question_type, preview_answer) VALUES (?, ?, ?, ?, ?)",
+        ((q, (q - 1) // questions_per_note + 1, "Q?", "multiple_choice", "A") for q in question_ids),
+    )
+    c.executemany(
+        "INSERT INTO option (question_id, option) VALUES (?, ?)",
+        ((q, option) for q in question_ids for option in ("A", "B", "C", "D")),
+    )
+    c.executemany(
+        "INSERT INTO grading (question_id, user_answer, real_answer, score, correction_and_explanation, additional_context) "
+        "VALUES (?, 'A', 'A', 'Correct', 'ok', 'ctx')",
+        ((q,) for q in question_ids),
+    )
+    db.conn.commit()
+    c.execute("ANALYZE;")
+
+
+def time_lookups(db: MyDB, notes: int, questions_per_note: int, samples: int, delete_ids: list[int]) -> dict:
+    rng = random.Random(0)
+    question_repository = QuestionRepository(db.conn)
+    option_repository = OptionRepository(db.conn)
+    grading_repository = GradingRepository(db.conn)
+    summary_repository = SummaryRepository(db.conn)
+    note_repository = NoteRepository(db.conn)
+
+    lookups = {
+        "get_all_questions": lambda: question_repository.get_all_questions(rng.randint(1, notes)),
+        "get_options_by_question_id": lambda: option_repository.get_options_by_question_id(
+            rng.randint(1, notes * questions_per_note)),
+        "get_all_gradings": lambda: grading_repository.get_all_gradings(
+            [rng.randint(1, notes * questions_per_note) for _ in range(questions_per_note)]),
+        "get_summary_by_note_id": lambda: summary_repository.get_summary_by_note_id(rng.randint(1, notes)),
+        "notes ordered by created_at": lambda: db.cursor.execute(
+            "SELECT note_id FROM note ORDER BY created_at DESC LIMIT 20").fetchall(),
+    }
+
+    timings = {}
+    for name, lookup in lookups.items():
+        durations = []
+        for _ in range(samples):
+            started_at = time.perf_counter()
+            lookup()
+            durations.append(time.perf_counter() - started_at)
+        timings[name] = statistics.median(durations)
+
+    # Cascading delete of notes (and their questions, options and gradings); delete_note commits
+    durations = []
+    for note_id in delete_ids:
+        started_at = time.perf_counter()
+        assert note_repository.delete_note(note_id) == 1
+        durations.append(time.perf_counter() - started_at)
+    timings["delete_note (cascade)"] = statistics.median(durations)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=10000)
+    parser.add_argument("--questions-per-note", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = MyDB(db_path=os.path.join(tmp_dir, "bench.db"))
+        db.connect()
+        try:
+            populate(db, args.notes, args.questions_per_note)
+            print(f"{args.notes} notes, {args.notes * args.questions_per_note} questions, "
+                  f"{args.notes * args.questions_per_note * 4} options")
+
+            # Each pass deletes its own notes
+            delete_ids = random.Random(1).sample(range(1, args.notes + 1), 2 * max(1, args.samples // 4))
+            half = len(delete_ids) // 2
+
+            indexed = time_lookups(db, args.notes, args.questions_per_note, args.samples, delete_ids[:half])
+
+            for statement in INDEX_MIGRATION["statements"]:
+                index_name = statement.split("EXISTS ")[1].split(" ")[0]
+                db.cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+            # Migration 3 replaced the grading index with a unique one
+            db.cursor.execute("DROP INDEX IF EXISTS idx_grading_question_id_unique")
+            db.conn.commit()
+            unindexed = time_lookups(db, args.notes, args.questions_per_note, args.samples, delete_ids[half:])
+        finally:
+            db.close()
+
+    print(f"{'lookup (median)':<30}{'no index':>12}{'indexed':>12}{'speedup':>10}")
+    for name in indexed:
+        before, after = unindexed[name] * 1000, indexed[name] * 1000
+        print(f"{name:<30}{before:>10.3f}ms{after:>10.3f}ms{before / after:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
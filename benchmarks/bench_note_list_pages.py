@@ -0,0 +1,69 @@
+"""
+Time to load the note list as the number of notes grows: the previous full
+load (get_all_notes and a sort in Python) versus the first and a deep keyset
+page of NoteRepository.get_notes_page.
+
+    python -m benchmarks.bench_note_list_pages --sizes 1000 10000 100000
+
+The database is a fresh temporary file per size.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+
+
+def median_time(load, samples: int) -> float:
+    durations = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        load()
+        durations.append(time.perf_counter() - started_at)
+    return statistics.median(durations)
+
+
+def measure(notes: int, page_size: int, samples: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = MyDB(db_path=os.path.join(tmp_dir, "bench.db"))
+        db.connect()
+        try:
+            db.cursor.executemany(
+                "INSERT INTO note (note_name, note_content, created_at) VALUES (?, 'content', datetime('2024-01-01', ?))",
+                ((f"Note {i}", f"+{i} minutes") for i in range(notes)),
+            )
+            db.conn.commit()
+            repo = NoteRepository(db.conn)
+
+            # Cursor of the page halfway through the list
+            deep_cursor = None
+            for _ in range(notes // page_size // 2):
+                _, deep_cursor = repo.get_notes_page(page_size=page_size, after=deep_cursor)
+
+            return {
+                "full load": median_time(lambda: sorted(repo.get_all_notes(), key=lambda n: n[2], reverse=True), samples),
+                "first page": median_time(lambda: repo.get_notes_page(page_size=page_size), samples),
+                "middle page": median_time(lambda: repo.get_notes_page(page_size=page_size, after=deep_cursor), samples),
+            }
+        finally:
+            db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--page-size", type=int, default=NoteRepository.DEFAULT_PAGE_SIZE)
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {notes: measure(notes, args.page_size, args.samples) for notes in args.sizes}
+    print(f"{'notes':>8}{'full load':>14}{'first page':>14}{'middle page':>14}")
+    for notes, timings in results.items():
+        print(f"{notes:>8}" + "".join(f"{timings[name] * 1000:>12.3f}ms" for name in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Write latency and commit/fsync count of storing one analysed note: the previous
+per-call commits versus NoteDataProcessor.process_submission (one unit of work).
+
+    python -m benchmarks.bench_note_write_path --notes 50
+
+Commits are counted with a SQLite trace callback. In WAL mode with
+synchronous=FULL every commit fsyncs the WAL once, so the commit count is the
+fsync count; with the default synchronous=NORMAL commits do not fsync and the
+WAL is only synced at checkpoints. Both settings are timed.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from core.note_data_processor import NoteDataProcessor
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+from repositories.note_hashtag_repository import NoteHashtagRepository
+from repositories.question_repository import QuestionRepository
+from repositories.option_repository import OptionRepository
+from repositories.summary_repository import SummaryRepository
+
+TAGS = ["python", "sqlite", "study"]
+QUIZ = [
+    {"question": f"Multiple choice {i}?", "question_type": "multiple_choice", "answer": "A",
+     "options": ["A", "B", "C", "D"]} for i in range(4)
+] + [
+    {"question": f"Short answer {i}?", "question_type": "short_answer", "answer": "X"} for i in range(6)
+]
+
+
+def write_per_call(repositories: dict, i: int) -> None:
+    # The write path before the unit of work: every repository call commits on its own
+    note_id = repositories["note_repository"].insert_note(f"Note {i}", "content " * 200)
+    repositories["note_hashtag_repository"].insert_note_hashtags(note_id, TAGS)
+    repositories["summary_repository"].insert_summary(note_id, "summary " * 50)
+    for question in QUIZ:
+        question_id = repositories["question_repository"].insert_question(
+            note_id, question["question"], question["question_type"], question["answer"]
+        )
+        if question.get("options"):
+            repositories["option_repository"].insert_options(question_id, question["options"])
+
+
+def write_unit_of_work(repositories: dict, i: int) -> None:
+    NoteDataProcessor(repositories).process_submission(f"Note {i}", "content " * 200, TAGS, "summary " * 50, QUIZ)
+
+
+def measure(write, notes: int, synchronous: str) -> tuple[float, float]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = MyDB(db_path=os.path.join(tmp_dir, "bench.db"))
+        db.connect()
+        try:
+            # Inserts and commits all run on the pool's single writer
+            conn = db.pool.get_writer()
+            conn.execute(f"PRAGMA synchronous = {synchronous};")
+            repositories = {
+                "note_repository": NoteRepository(db.conn),
+                "note_hashtag_repository": NoteHashtagRepository(db.conn),
+                "question_repository": QuestionRepository(db.conn),
+                "option_repository": OptionRepository(db.conn),
+                "summary_repository": SummaryRepository(db.conn),
+            }
+
+            statements = []
+            conn.set_trace_callback(statements.append)
+            durations = []
+            for i in range(notes):
+                started_at = time.perf_counter()
+                write(repositories, i)
+                durations.append(time.perf_counter() - started_at)
+            conn.set_trace_callback(None)
+
+            commits = sum(1 for statement in statements if statement.strip().upper() == "COMMIT")
+            return statistics.median(durations), commits / notes
+        finally:
+            db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.notes} notes, {len(TAGS)} tags and {len(QUIZ)} questions each")
+    print(f"{'write path':<16}{'synchronous':<14}{'median latency':>16}{'commits/note':>14}")
+    for synchronous in ("NORMAL", "FULL"):
+        for name, write in (("per-call", write_per_call), ("unit of work", write_unit_of_work)):
+            latency, commits = measure(write, args.notes, synchronous)
+            print(f"{name:<16}{synchronous:<14}{latency * 1000:>14.2f}ms{commits:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Build time, memory footprint and lookup latency of the in-memory PrefixIndex
+over note names and hashtags, against the SQL lookups it replaces
+(get_all_hashtags per render, search_hashtags' LIKE '%x%').
+
+    python -m benchmarks.bench_prefix_index --notes 100000 --hashtags 10000
+
+The database is a fresh temporary file.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+from repositories.note_hashtag_repository import NoteHashtagRepository
+from repositories.prefix_index import PrefixIndex
+
+
+def median_time(lookup, prefixes: list[str]) -> float:
+    durations = []
+    for prefix in prefixes:
+        started_at = time.perf_counter()
+        lookup(prefix)
+        durations.append(time.perf_counter() - started_at)
+    return statistics.median(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--hashtags", type=int, default=10000)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(rng.choices(letters, k=rng.randint(4, 10))) for _ in range(5000)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = MyDB(db_path=os.path.join(tmp_dir, "bench.db"))
+        db.connect()
+        try:
+            db.cursor.executemany(
+                "INSERT INTO note (note_name, note_content) VALUES (?, 'content')",
+                ((" ".join(rng.choices(words, k=3)).capitalize(),) for _ in range(args.notes)),
+            )
+            db.cursor.executemany(
+                "INSERT OR IGNORE INTO note_hashtag (hashtag) VALUES (?)",
+                ((f"{rng.choice(words)}{i}",) for i in range(args.hashtags)),
+            )
+            db.conn.commit()
+
+            note_repository = NoteRepository(db.conn)
+            hashtag_repository = NoteHashtagRepository(db.conn)
+
+            started_at = time.perf_counter()
+            name_index = PrefixIndex((name, note_id) for note_id, name, _ in note_repository.get_all_notes())
+            hashtag_index = PrefixIndex((hashtag, hashtag) for hashtag in hashtag_repository.get_all_hashtags())
+            build_time = time.perf_counter() - started_at
+
+            prefixes = [rng.choice(words)[:rng.randint(1, 4)] for _ in range(args.samples)]
+            timings = {
+                "get_all_hashtags": median_time(lambda prefix: hashtag_repository.get_all_hashtags(), prefixes[:20]),
+                "search_hashtags (LIKE)": median_time(hashtag_repository.search_hashtags, prefixes),
+                "hashtag index": median_time(hashtag_index.search, prefixes),
+                "get_all_note_names": median_time(lambda prefix: note_repository.get_all_note_names(), prefixes[:20]),
+                "note name index": median_time(name_index.search, prefixes),
+            }
+
+            started_at = time.perf_counter()
+            for i in range(1000):
+                name_index.add(f"New note {i}", args.notes + i + 1)
+            for i in range(1000):
+                name_index.remove(args.notes + i + 1)
+            update_time = (time.perf_counter() - started_at) / 2000
+        finally:
+            db.close()
+
+    print(f"indexes built in {build_time * 1000:.0f}ms")
+    print(f"{'index':<12}{'entries':>10}{'memory':>12}")
+    for name, index in (("note names", name_index), ("hashtags", hashtag_index)):
+        print(f"{name:<12}{len(index):>10}{index.memory_footprint() / 1024 / 1024:>10.1f}MiB")
+    print(f"incremental add/remove: {update_time * 1e6:.1f}us each")
+    print(f"{'lookup (median)':<26}{'time':>12}")
+    for name, seconds in timings.items():
+        print(f"{name:<26}{seconds * 1e6:>10.1f}us")
+
+
+if __name__ == "__main__":
+    main()
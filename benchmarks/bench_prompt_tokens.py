@@ -0,0 +1,117 @@
+"""
+Compare prompt sizes of the "pretty" and "compact" prompt modes over the notes
+stored in a Back Note database.
+
+    python -m benchmarks.bench_prompt_tokens --db data/my_app_database.db
+    python -m benchmarks.bench_prompt_tokens --api-key $GEMINI_API_KEY
+
+Without an API key the token counts are estimated locally; with one they come
+from the Gemini count_tokens endpoint.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import statistics
+
+from core.note_prompt_builder import NotePromptBuilder
+from core.quiz_prompt_builder import QuizPromptBuilder
+from repositories.note_repository import NoteRepository
+from repositories.text_compression import TextCompression
+
+QUIZ_STRUCTURE = {"multiple_choice": 4, "short_answer": 3, "long_answer": 3}
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]|\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    # Words, punctuation marks and whitespace runs each count as one token,
+    # which tracks BPE tokenizers closely enough to compare encodings.
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def make_token_counter(api_key: str, model: str):
+    if not api_key:
+        return estimate_tokens
+
+    from google import genai
+    client = genai.Client(api_key=api_key)
+
+    def count_tokens(text: str) -> int:
+        return client.models.count_tokens(model=model, contents=text).total_tokens
+
+    return count_tokens
+
+
+def load_corpus(db_path: str) -> list[tuple[str, list[dict]]]:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    TextCompression.register(conn)
+    try:
+        corpus = []
+        # Notes sharing another note's analysis would count the same content twice
+        notes = conn.execute(
+            f"SELECT n.note_id, decompress_text({NoteRepository.CONTENT_COLUMN}) FROM {NoteRepository.CONTENT_SOURCE}"
+            " WHERE n.analysis_note_id IS NULL"
+        ).fetchall()
+        for note_id, note_content in notes:
+            quiz = []
+            questions = conn.execute(
+                "SELECT question_id, question, question_type, preview_answer FROM question WHERE note_id = ?",
+                (note_id,)
+            ).fetchall()
+            for question_id, question, question_type, answer in questions:
+                options = [row[0] for row in conn.execute(
+                    "SELECT option FROM option WHERE question_id = ?", (question_id,)
+                ).fetchall()]
+                grading = conn.execute(
+                    "SELECT user_answer FROM grading WHERE question_id = ?", (question_id,)
+                ).fetchone()
+                quiz.append({
+                    "question": question,
+                    "question_type": question_type,
+                    "options": options or None,
+                    "answer": answer,
+                    "user_answer": (grading[0] if grading else None) or answer
+                })
+            corpus.append((note_content, quiz))
+        return corpus
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join("data", "my_app_database.db"))
+    parser.add_argument("--api-key", default=os.getenv("GEMINI_API_KEY", ""))
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    args = parser.parse_args()
+
+    count_tokens = make_token_counter(args.api_key, args.model)
+    corpus = load_corpus(args.db)
+    if not corpus:
+        print(f"No notes found in {args.db}")
+        return
+
+    print(f"{len(corpus)} notes from {args.db} ({'count_tokens API' if args.api_key else 'local estimate'})")
+    print(f"{'prompt':<8}{'mode':<10}{'total':>10}{'mean':>10}{'chars':>12}{'saved':>8}")
+    for prompt_name in ("note", "quiz"):
+        totals = {}
+        for mode in NotePromptBuilder.PROMPT_MODES:
+            counts, chars = [], 0
+            for note_content, quiz in corpus:
+                if prompt_name == "note":
+                    prompt = NotePromptBuilder.create_submit_note_prompt(note_content, QUIZ_STRUCTURE, mode=mode)
+                elif quiz:
+                    prompt = QuizPromptBuilder.create_submit_quiz_prompt(quiz, mode=mode)
+                else:
+                    continue
+                counts.append(count_tokens(prompt))
+                chars += len(prompt)
+            if not counts:
+                continue
+            totals[mode] = sum(counts)
+            saved = 1 - totals[mode] / totals["pretty"]
+            print(f"{prompt_name:<8}{mode:<10}{totals[mode]:>10}{statistics.mean(counts):>10.0f}{chars:>12}{saved:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
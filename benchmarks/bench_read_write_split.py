@@ -0,0 +1,183 @@
+"""
+Note-list read latency and write throughput while other sessions run long
+grading writes and cascade deletes. The benchmark compares the former
+per-thread read/write connections ("per-thread") with the reader pool plus
+single writer of ConnectionPool ("split").
+
+    python -m benchmarks.bench_read_write_split --readers 6 --writers 3 --seconds 5
+
+Reader sessions render the first note-list page and one note's detail.
+Writer sessions each loop over one of two units of work:
+- regrade every question of a note, with long feedback;
+- delete a note, cascading to its questions, options and gradings, and
+  insert it again.
+Both setups use the same pragmas and a fresh copy of the same seeded file.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from repositories.connection_pool import ConnectionPool, PooledConnection
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+from repositories.question_repository import QuestionRepository
+from repositories.option_repository import OptionRepository
+from repositories.grading_repository import GradingRepository
+from repositories.note_aggregate_repository import NoteAggregateRepository
+
+SEED_NOTES = 300
+QUESTIONS_PER_NOTE = 20
+FEEDBACK = "The answer misses the role of the electron transport chain. " * 40
+
+
+class PerThreadPool(ConnectionPool):
+    """The former routing: every statement runs on the calling thread's own read/write connection"""
+
+    def _open_connection(self, read_only: bool = False):
+        conn = super()._open_connection()
+        # Each connection checkpointed as it committed, at SQLite's default threshold
+        conn.execute("PRAGMA wal_autocheckpoint = 1000;")
+        return conn
+
+    def checkpoint(self) -> None:
+        pass
+
+    def owned_writer(self):
+        return self.get_reader()
+
+    def acquire_writer(self):
+        return self.get_reader()
+
+    def release_writer(self) -> None:
+        pass
+
+
+def seed(db_path: str) -> None:
+    with MyDB(db_path=db_path) as db:
+        with db.conn.transaction():
+            for i in range(SEED_NOTES):
+                add_note(db.conn, i)
+
+
+def add_note(conn, i: int) -> int:
+    note_id = NoteRepository(conn).insert_note(f"Lecture {i}", f"Transcript of lecture {i}. " * 200)
+    question_ids = QuestionRepository(conn).insert_questions(note_id, [
+        (f"Question {q} of lecture {i}?", "multiple_choice", "A") for q in range(QUESTIONS_PER_NOTE)
+    ])
+    OptionRepository(conn).insert_options_for_questions({question_id: ["A", "B", "C", "D"] for question_id in question_ids})
+    GradingRepository(conn).upsert_gradings([(question_id, "B", "A", "Incorrect", FEEDBACK, FEEDBACK)
+                                             for question_id in question_ids])
+    return note_id
+
+
+def run(open_session, readers: int, writers: int, seconds: float) -> dict:
+    latencies, counts, lock = [], {"writes": 0, "errors": 0}, threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        conn, close = open_session()
+        notes, aggregates = NoteRepository(conn), NoteAggregateRepository(conn)
+        durations, errors = [], 0
+        try:
+            while time.perf_counter() < deadline:
+                started_at = time.perf_counter()
+                try:
+                    page, _ = notes.get_notes_page(page_size=20)
+                    aggregates.get_note_aggregate(rng.choice(page).note_id)
+                    durations.append(time.perf_counter() - started_at)
+                except Exception:
+                    errors += 1
+        finally:
+            close()
+            with lock:
+                latencies.extend(durations)
+                counts["errors"] += errors
+
+    def writer(index: int) -> None:
+        rng = random.Random(readers + index)
+        conn, close = open_session()
+        notes, questions, gradings = NoteRepository(conn), QuestionRepository(conn), GradingRepository(conn)
+        # Each writer works on its own notes, so writers never race on the same rows
+        own_note_ids = list(range(index + 1, SEED_NOTES + 1, writers))
+        writes = errors = 0
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    position = rng.randrange(len(own_note_ids))
+                    note_id = own_note_ids[position]
+                    if rng.random() < 0.5:
+                        question_ids = [row[0] for row in questions.get_all_questions(note_id, columns=["question_id"])]
+                        gradings.upsert_gradings([(question_id, "A", "A", "Correct", FEEDBACK, FEEDBACK)
+                                                  for question_id in question_ids])
+                    else:
+                        notes.delete_note(note_id)
+                        own_note_ids[position] = add_note(conn, note_id)
+                    writes += 1
+                except Exception:
+                    errors += 1
+        finally:
+            close()
+            with lock:
+                counts["writes"] += writes
+                counts["errors"] += errors
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "reads": len(latencies),
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p99": latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+        "max": latencies[-1] if latencies else 0.0,
+        **counts,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=6)
+    parser.add_argument("--writers", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        seed_path = os.path.join(tmp_dir, "seed.db")
+        seed(seed_path)
+
+        def fresh_copy(name: str) -> str:
+            path = os.path.join(tmp_dir, name)
+            shutil.copy(seed_path, path)
+            return path
+
+        # One connection per session plus the main thread's
+        pool_size = args.readers + args.writers + 1
+        results = {}
+        for name, pool_type in (("per-thread", PerThreadPool), ("split", ConnectionPool)):
+            pool = pool_type(fresh_copy(f"{name}.db"), pool_size)
+            conn = PooledConnection(pool)
+            try:
+                results[name] = run(lambda: (conn, pool.release), args.readers, args.writers, args.seconds)
+            finally:
+                pool.close()
+
+    print(f"{args.readers} reader and {args.writers} writer sessions, {args.seconds:.0f}s")
+    print(f"{'setup':<12}{'reads/s':>10}{'read p50':>11}{'read p99':>11}{'read max':>11}{'writes/s':>10}{'errors':>8}")
+    for name, result in results.items():
+        print(f"{name:<12}{result['reads'] / args.seconds:>10.0f}{result['p50'] * 1000:>9.1f}ms"
+              f"{result['p99'] * 1000:>9.1f}ms{result['max'] * 1000:>9.1f}ms"
+              f"{result['writes'] / args.seconds:>10.1f}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Python memory taken by repository reads: the note list and detail renders, full
+rows versus column projections, and all transcripts at once versus
+NoteRepository.iter_note_content.
+
+    python -m benchmarks.bench_row_memory --notes 500 --words 3000
+
+Memory is the tracemalloc peak while the call runs and its result is alive,
+so it includes the rows, the decoded text and sqlite3's own row tuples.
+Notes are written through the repositories into a fresh temporary file.
+"""
+import argparse
+import os
+import random
+import tempfile
+import tracemalloc
+
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+from repositories.question_repository import QuestionRepository
+from repositories.option_repository import OptionRepository
+from repositories.grading_repository import GradingRepository
+from repositories.summary_repository import SummaryRepository
+from repositories.note_aggregate_repository import NoteAggregateRepository
+
+WORDS = "cell energy protein membrane function structure process system lecture theory model result data".split()
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def peak_bytes(read) -> int:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        result = read()
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+        return peak
+    finally:
+        tracemalloc.stop()
+
+
+def consume(iterator) -> None:
+    for _ in iterator:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=500)
+    parser.add_argument("--words", type=int, default=3000, help="Words per transcript")
+    parser.add_argument("--questions", type=int, default=10, help="Graded questions per note")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = MyDB(db_path=os.path.join(tmp_dir, "bench.db"))
+        db.connect()
+        try:
+            notes = NoteRepository(db.conn)
+            questions = QuestionRepository(db.conn)
+            options = OptionRepository(db.conn)
+            gradings = GradingRepository(db.conn)
+            summaries = SummaryRepository(db.conn)
+            with db.conn.transaction():
+                for i in range(args.notes):
+                    note_id = notes.insert_note(f"Lecture {i}", make_text(rng, args.words))
+                    summaries.insert_summary(note_id, make_text(rng, args.words // 5))
+                    question_ids = questions.insert_questions(note_id, [
+                        (make_text(rng, 20), "multiple_choice", make_text(rng, 60)) for _ in range(args.questions)
+                    ])
+                    options.insert_options_for_questions({question_id: [make_text(rng, 8) for _ in range(4)]
+                                                          for question_id in question_ids})
+                    gradings.upsert_gradings([
+                        (question_id, make_text(rng, 30), make_text(rng, 60), "Correct",
+                         make_text(rng, 200), make_text(rng, 200)) for question_id in question_ids
+                    ])
+
+            all_question_ids = [row[0] for row in db.cursor.execute("SELECT question_id FROM question").fetchall()]
+            aggregates = NoteAggregateRepository(db.conn)
+            middle_id = args.notes // 2
+            reads = {
+                "list page (20 notes)": lambda: notes.get_notes_page(page_size=20),
+                "get_all_notes": notes.get_all_notes,
+                "detail (get_note_aggregate)": lambda: aggregates.get_note_aggregate(middle_id),
+                "get_all_note_content": notes.get_all_note_content,
+                "iter_note_content": lambda: consume(notes.iter_note_content()),
+                "questions, all columns": lambda: [questions.get_all_questions(n) for n in range(1, args.notes + 1)],
+                "questions, id + question": lambda: [questions.get_all_questions(n, columns=["question_id", "question"])
+                                                     for n in range(1, args.notes + 1)],
+                "gradings, all columns": lambda: gradings.get_all_gradings(all_question_ids[:900]),
+                "gradings, id + score": lambda: gradings.get_all_gradings(all_question_ids[:900], columns=["question_id", "score"]),
+                "summaries, all columns": lambda: [summaries.get_summary_by_note_id(n) for n in range(1, args.notes + 1)],
+                "summaries, ids only": lambda: [summaries.get_summary_by_note_id(n, columns=["summary_id"])
+                                                for n in range(1, args.notes + 1)],
+            }
+            results = {name: peak_bytes(read) for name, read in reads.items()}
+        finally:
+            db.close()
+
+    print(f"{args.notes} notes of {args.words} words, {args.questions} graded questions each")
+    print(f"{'read':<30}{'peak memory':>14}")
+    for name, peak in results.items():
+        print(f"{name:<30}{peak / 1024:>11.0f}KiB")
+
+
+if __name__ == "__main__":
+    main()
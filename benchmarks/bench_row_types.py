@@ -0,0 +1,102 @@
+"""
+CPU time and allocations of reading and rendering a large note list with the
+former rows (plain tuples, created_at as text re-parsed by the view on every
+render) versus the typed rows of repositories.rows (created_at decoded once by
+the connection's TIMESTAMP converter).
+
+    python -m benchmarks.bench_row_types --notes 20000 --renders 5
+
+A "render" formats every row the way NoteListView does, so the former path
+pays a datetime.fromisoformat per row per render, the typed path none.
+Allocations are the tracemalloc peak of one read plus its renders; the
+"read only" lines leave out the renders.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+
+LIST_QUERY = "SELECT note_id, note_name, created_at FROM note ORDER BY created_at DESC, note_id DESC"
+
+
+def tuple_path(db_path: str, renders: int) -> list[str]:
+    # Connection without detect_types, as every connection was before the converter
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(LIST_QUERY).fetchall()
+    finally:
+        conn.close()
+    lines = []
+    for _ in range(renders):
+        lines = [f"{note_name} {datetime.fromisoformat(created_at).strftime('%Y-%m-%d %H:%M')}"
+                 for note_id, note_name, created_at in rows]
+    return lines
+
+
+def typed_path(notes: NoteRepository, renders: int) -> list[str]:
+    rows = notes.get_all_notes()
+    lines = []
+    for _ in range(renders):
+        lines = [f"{note.note_name} {note.created_at.strftime('%Y-%m-%d %H:%M')}" for note in rows]
+    return lines
+
+
+def measure(read, repeat: int) -> tuple[float, int]:
+    durations = []
+    for _ in range(repeat):
+        started_at = time.process_time()
+        read()
+        durations.append(time.process_time() - started_at)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        result = read()
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return min(durations), peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=20000)
+    parser.add_argument("--renders", type=int, default=5, help="Reruns of the list per read, as Streamlit reruns the page")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        db = MyDB(db_path=db_path)
+        db.connect()
+        try:
+            notes = NoteRepository(db.conn)
+            with db.conn.transaction():
+                for i in range(args.notes):
+                    notes.insert_note(f"Lecture {i}", f"Transcript {i}")
+                db.cursor.execute("UPDATE note SET created_at = datetime('2024-01-01', '+' || note_id || ' minutes')")
+
+            results = {
+                "tuples, read only": measure(lambda: tuple_path(db_path, 0), args.repeat),
+                "typed rows, read only": measure(lambda: typed_path(notes, 0), args.repeat),
+                "tuples, parse per render": measure(lambda: tuple_path(db_path, args.renders), args.repeat),
+                "typed rows, converter": measure(lambda: typed_path(notes, args.renders), args.repeat),
+            }
+        finally:
+            db.close()
+
+    print(f"{args.notes} notes, {args.renders} renders per read")
+    print(f"{'rows':<28}{'CPU time':>12}{'peak memory':>14}")
+    for name, (cpu, peak) in results.items():
+        print(f"{name:<28}{cpu * 1000:>10.1f}ms{peak / 1024:>11.0f}KiB")
+
+
+if __name__ == "__main__":
+    main()
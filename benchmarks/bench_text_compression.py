@@ -0,0 +1,111 @@
+"""
+Database size, page-cache coverage and read latency of long note content and
+summaries stored as plain TEXT versus through TextCompression (migration 8).
+
+    python -m benchmarks.bench_text_compression --notes 5000 --words 1500
+
+Notes are pseudo-English (Zipf-distributed common words), written through
+NoteRepository and SummaryRepository into a fresh temporary file per setup.
+Python's sqlite3 module does not expose SQLite's page-cache hit counters, so
+the cache effect is reported as the share of the note and summary tables the
+default 16 MiB page cache can hold, and as random get_note latency with the
+cache cut to 2 MiB and memory mapping off.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from repositories.connection_pool import ConnectionPool
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+from repositories.summary_repository import SummaryRepository
+from repositories.text_compression import TextCompression
+
+WORDS = (
+    "the of and to a in is that for it as was with be by on not he this are or his from at which but have an they "
+    "you were her she there been one all we their has would when if so no will what up can more out other into time "
+    "only some could them these may then do first any like my now over such our man me even most made after also did "
+    "many before must through back years where much your way well down should because each just those people how too "
+    "little state good very make world still own see men work long get here between both life being under never day "
+    "same another know while last might us great old year off come since against go came right used take three cell "
+    "energy protein membrane function structure process system example lecture theory model equation result data"
+).split()
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    sentences, remaining = [], words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 20))
+        sentences.append(" ".join(rng.choices(WORDS, weights, k=length)).capitalize() + ".")
+        remaining -= length
+    return " ".join(sentences)
+
+
+def measure(compress: bool, notes: int, words: int, samples: int) -> dict:
+    TextCompression.ENABLED = compress
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        db = MyDB(db_path=db_path)
+        db.connect()
+        try:
+            note_repository = NoteRepository(db.conn)
+            summary_repository = SummaryRepository(db.conn)
+            with db.conn.transaction():
+                for i in range(notes):
+                    note_id = note_repository.insert_note(f"Lecture {i}", make_text(rng, words))
+                    summary_repository.insert_summary(note_id, make_text(rng, words // 5))
+            db.cursor.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+
+            table_bytes = dict(db.cursor.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ('note', 'summary') GROUP BY name"
+            ).fetchall())
+            search_bytes = db.cursor.execute(
+                "SELECT SUM(pgsize) FROM dbstat WHERE name LIKE 'note_search%'"
+            ).fetchone()[0]
+
+            # Read latency under cache pressure
+            conn = db.pool.get_connection()
+            conn.execute("PRAGMA cache_size = -2048;")
+            conn.execute("PRAGMA mmap_size = 0;")
+            durations = []
+            for _ in range(samples):
+                note_id = rng.randint(1, notes)
+                started_at = time.perf_counter()
+                note_repository.get_note(note_id)
+                durations.append(time.perf_counter() - started_at)
+        finally:
+            db.close()
+            TextCompression.ENABLED = True
+
+        return {
+            "file": os.path.getsize(db_path),
+            "tables": sum(table_bytes.values()),
+            "search": search_bytes,
+            "read": statistics.median(durations),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=1500, help="Words per note; summaries get a fifth")
+    parser.add_argument("--samples", type=int, default=2000)
+    args = parser.parse_args()
+
+    cache_bytes = ConnectionPool.CACHE_SIZE_KIB * 1024
+    print(f"{args.notes} notes of {args.words} words, TextCompression.MIN_BYTES = {TextCompression.MIN_BYTES}")
+    print(f"{'storage':<12}{'file':>10}{'note+summary':>14}{'FTS index':>11}{'cache holds':>13}{'get_note':>12}")
+    for name, compress in (("plain TEXT", False), ("compressed", True)):
+        result = measure(compress, args.notes, args.words, args.samples)
+        coverage = min(1.0, cache_bytes / result["tables"])
+        print(f"{name:<12}{result['file'] / 2**20:>8.1f}MB{result['tables'] / 2**20:>12.1f}MB"
+              f"{result['search'] / 2**20:>9.1f}MB{coverage:>13.0%}{result['read'] * 1e6:>10.1f}us")
+
+
+if __name__ == "__main__":
+    main()
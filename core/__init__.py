@@ -8,6 +8,10 @@ from .quiz_prompt_builder import QuizPromptBuilder
 from .quiz_result_validator import QuizResultValidator
 from .text_cleaner import TextCleaner
 from .api_retry_handler import APIRetryHandler
+from .context_cache import ContextCache
+from .gemini_metrics import GeminiMetrics
+from .generation_profiles import GenerationProfiles
+from .question_bank import QuestionBank, QuestionBankJob
 
 __all__ = [
     'SubmitNote',
@@ -19,5 +23,10 @@ __all__ = [
     'QuizPromptBuilder',
     'QuizResultValidator',
     'TextCleaner',
-    'APIRetryHandler'
+    'APIRetryHandler',
+    'ContextCache',
+    'GeminiMetrics',
+    'GenerationProfiles',
+    'QuestionBank',
+    'QuestionBankJob'
 ]
@@ -1,7 +1,7 @@
 import time
 import logging
 import traceback
-from typing import Callable, Any, Tuple
+from typing import Callable, Any, Tuple, Optional
 
 
 class APIRetryHandler:
@@ -27,11 +27,16 @@ class APIRetryHandler:
     
     @staticmethod
     def call_gemini_with_retry(api_key: str, prompt: str, model: str, 
-                              max_retries: int = 5, retry_delay: float = 2.0) -> str:
+                              max_retries: int = 5, retry_delay: float = 2.0,
+                              system_instruction: Optional[str] = None, operation: str = "generate",
+                              profile: str = "thorough") -> str:
         from .gemini_work import GeminiWork
         
         def gemini_call():
-            return GeminiWork.call_gemini(api_key=api_key, prompt=prompt, model=model)
+            return GeminiWork.call_gemini(
+                api_key=api_key, prompt=prompt, model=model,
+                system_instruction=system_instruction, operation=operation, profile=profile
+            )
         
         return APIRetryHandler.call_with_retry(
             gemini_call, 
@@ -0,0 +1,108 @@
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+from google.genai import errors, types
+
+
+class ContextCache:
+    """Registers static system instructions as Gemini cached contents, once per model"""
+
+    DEFAULT_TTL_SECONDS = 3600
+    REFRESH_MARGIN_SECONDS = 60
+    # Timeouts, rate limits and server errors are retried after this long
+    FAILURE_BACKOFF_SECONDS = 60
+    # Client errors that no retry will change, e.g. a prefix below the minimum cacheable size
+    REFUSAL_CODES = (400, 403, 404)
+
+    # (api key digest, model, instruction digest, tools digest) -> {"name": ..., "expires_at": ...}
+    # A name of None makes callers fall back to a plain system instruction: for the cache's
+    # full lifetime after a refusal, for FAILURE_BACKOFF_SECONDS after any other failure.
+    _entries: Dict[tuple, Dict[str, Any]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_cached_content_name(client: Any, api_key: str, model: str, system_instruction: str,
+                                tools: Optional[List[types.Tool]] = None,
+                                ttl_seconds: int = DEFAULT_TTL_SECONDS) -> Optional[str]:
+        """
+        Get the cached content to use for a static instruction prefix
+
+        Args:
+            client: Gemini client for the API key
+            api_key: API key the cache belongs to
+            model: Model the cache is created for
+            system_instruction: Static instruction prefix
+            tools: Tools to register with the cache (requests using a cache cannot set them)
+            ttl_seconds: Lifetime of a newly created cache
+
+        Returns:
+            Cached content name, or None when the prefix should be sent as a system instruction
+        """
+        key = ContextCache._cache_key(api_key, model, system_instruction, tools)
+        now = time.time()
+
+        with ContextCache._lock:
+            entry = ContextCache._entries.get(key)
+            if entry and entry["expires_at"] - ContextCache.REFRESH_MARGIN_SECONDS > now:
+                return entry["name"]
+
+        try:
+            cached_content = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    display_name="back-note-static-prefix",
+                    system_instruction=system_instruction,
+                    tools=tools or None,
+                    ttl=f"{ttl_seconds}s",
+                ),
+            )
+            name = cached_content.name
+            expires_at = cached_content.expire_time.timestamp() if cached_content.expire_time else now + ttl_seconds
+            logging.info(f"Created context cache {name} for {model}")
+        except errors.ClientError as e:
+            name = None
+            if e.code in ContextCache.REFUSAL_CODES:
+                logging.warning(f"Context cache refused for {model}, sending system instruction instead: {str(e)}")
+                expires_at = now + ttl_seconds
+            else:
+                expires_at = ContextCache._backoff(model, e, now)
+        except Exception as e:
+            name = None
+            expires_at = ContextCache._backoff(model, e, now)
+
+        with ContextCache._lock:
+            ContextCache._entries[key] = {"name": name, "expires_at": expires_at}
+
+        return name
+
+    @staticmethod
+    def invalidate(api_key: str, model: str, system_instruction: str,
+                   tools: Optional[List[types.Tool]] = None) -> None:
+        """Forget a cache entry so the next call recreates it"""
+        key = ContextCache._cache_key(api_key, model, system_instruction, tools)
+        with ContextCache._lock:
+            ContextCache._entries.pop(key, None)
+
+    @staticmethod
+    def clear() -> None:
+        with ContextCache._lock:
+            ContextCache._entries.clear()
+
+    @staticmethod
+    def _backoff(model: str, error: Exception, now: float) -> float:
+        """Expiry of the entry for a failure that may pass, so the next call after the backoff retries"""
+        logging.warning(f"Context cache unavailable for {model}, retrying in "
+                        f"{ContextCache.FAILURE_BACKOFF_SECONDS}s: {str(error)}")
+        # Entries are reused until REFRESH_MARGIN_SECONDS before expiry
+        return now + ContextCache.REFRESH_MARGIN_SECONDS + ContextCache.FAILURE_BACKOFF_SECONDS
+
+    @staticmethod
+    def _cache_key(api_key: str, model: str, system_instruction: str,
+                   tools: Optional[List[types.Tool]]) -> tuple:
+        def digest(value: str) -> str:
+            return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+        tools_repr = repr([tool.model_dump(exclude_none=True) for tool in tools or []])
+        return (digest(api_key), model, digest(system_instruction), digest(tools_repr))
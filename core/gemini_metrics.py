@@ -0,0 +1,79 @@
+import threading
+import statistics
+from collections import deque
+from typing import Dict, Any, List, Tuple
+
+
+class GeminiMetrics:
+    """Process-wide record of recent Gemini calls, used to tune caching and generation settings"""
+
+    MAX_RECORDS = 500
+
+    _records = deque(maxlen=MAX_RECORDS)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def record(call_record: Dict[str, Any]) -> None:
+        """
+        Store one call record
+
+        Args:
+            call_record: Flat dictionary such as {"operation": ..., "latency": ...,
+                "time_to_first_token": ..., "prompt_tokens": ..., "cached_tokens": ...}
+        """
+        with GeminiMetrics._lock:
+            GeminiMetrics._records.append(dict(call_record))
+
+    @staticmethod
+    def get_records() -> List[Dict[str, Any]]:
+        with GeminiMetrics._lock:
+            return list(GeminiMetrics._records)
+
+    @staticmethod
+    def clear() -> None:
+        with GeminiMetrics._lock:
+            GeminiMetrics._records.clear()
+
+    @staticmethod
+    def summary(group_by: Tuple[str, ...] = ("operation", "cached_context")) -> List[Dict[str, Any]]:
+        """
+        Aggregate recorded calls
+
+        Args:
+            group_by: Record keys to group on
+
+        Returns:
+            One dictionary per group with call counts, latency, time-to-first-token
+            and prompt token statistics
+        """
+        groups: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+        for call_record in GeminiMetrics.get_records():
+            key = tuple(call_record.get(field) for field in group_by)
+            groups.setdefault(key, []).append(call_record)
+
+        summaries = []
+        for key, records in groups.items():
+            summary = dict(zip(group_by, key))
+            summary["calls"] = len(records)
+            summary.update(GeminiMetrics._describe(records, "latency"))
+            summary.update(GeminiMetrics._describe(records, "time_to_first_token"))
+
+            prompt_tokens = sum(record.get("prompt_tokens") or 0 for record in records)
+            cached_tokens = sum(record.get("cached_tokens") or 0 for record in records)
+            summary["mean_prompt_tokens"] = prompt_tokens / len(records)
+            summary["cached_token_ratio"] = cached_tokens / prompt_tokens if prompt_tokens else 0.0
+            summaries.append(summary)
+
+        return summaries
+
+    @staticmethod
+    def _describe(records: List[Dict[str, Any]], field: str) -> Dict[str, Any]:
+        values = sorted(record[field] for record in records if record.get(field) is not None)
+        if not values:
+            return {f"mean_{field}": None, f"p50_{field}": None, f"p95_{field}": None}
+
+        return {
+            f"mean_{field}": statistics.fmean(values),
+            f"p50_{field}": values[len(values) // 2],
+            f"p95_{field}": values[min(len(values) - 1, int(len(values) * 0.95))]
+        }
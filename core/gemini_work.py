@@ -5,10 +5,23 @@ import time
 import logging
 import traceback
 from typing import Optional
+from .context_cache import ContextCache
+from .gemini_metrics import GeminiMetrics
+from .generation_profiles import GenerationProfiles
 
 class GeminiWork:
+    MAX_CONTINUATIONS = 3
+    MIN_CONTINUATION_OVERLAP = 20
+    MAX_CONTINUATION_OVERLAP = 500
+    CONTINUATION_PROMPT = (
+        "Your previous response was cut off by the output limit. Continue it exactly from the last "
+        "character you wrote. Do not repeat earlier text, do not restart the JSON and do not add code fences."
+    )
+
     @staticmethod
-    def call_gemini(api_key: str, prompt: str, model: str = "gemini-2.5-pro", retries: int = 3) -> str:
+    def call_gemini(api_key: str, prompt: str, model: str = "gemini-2.5-pro", retries: int = 3,
+                    system_instruction: Optional[str] = None, operation: str = "generate",
+                    profile: str = GenerationProfiles.DEFAULT_PROFILE) -> str:
         try:
             # Input validation
             if not api_key or not api_key.strip():
@@ -23,6 +36,8 @@ class GeminiWork:
             if not isinstance(retries, int) or retries < 0:
                 raise ValueError("Retries must be a non-negative integer")
             
+            profile_settings = GenerationProfiles.get_profile(profile)
+            
             result = ""
             
             # Initialize Gemini client
@@ -50,34 +65,62 @@ class GeminiWork:
             try:
                 tools = [
                     types.Tool(googleSearch=types.GoogleSearch()),
-                ]
+                ] if profile_settings["use_search"] else []
             except Exception as e:
                 logging.error(f"Failed to create tools: {traceback.format_exc()}")
                 raise Exception(f"Failed to create tools: {str(e)}")
 
+            # Reuse the static instruction prefix from the context cache when the model accepts it.
+            # Requests that use a cache carry the tools inside the cache instead.
+            cached_content = None
+            if system_instruction:
+                cached_content = ContextCache.get_cached_content_name(client, api_key, model, system_instruction, tools)
+
             # Prepare configuration
             try:
                 generate_content_config = types.GenerateContentConfig(
-                    max_output_tokens=8192,
+                    max_output_tokens=profile_settings["max_output_tokens"],
                     thinking_config=types.ThinkingConfig(
-                        thinking_budget=-1,
+                        thinking_budget=GenerationProfiles.thinking_budget_for(profile_settings, model),
                     ),
-                    tools=tools,
+                    tools=None if cached_content else tools or None,
+                    system_instruction=None if cached_content else system_instruction,
+                    cached_content=cached_content,
                 )
             except Exception as e:
                 logging.error(f"Failed to create configuration: {traceback.format_exc()}")
                 raise Exception(f"Failed to create configuration: {str(e)}")
 
-            # Generate content
+            # Generate content, continuing in place when the output token limit cuts the answer off
             try:
-                for chunk in client.models.generate_content_stream(
-                    model=model,
-                    contents=contents,
-                    config=generate_content_config,
-                ):
-                    if hasattr(chunk, 'text') and chunk.text:
-                        result += chunk.text
+                started_at = time.perf_counter()
+                result, finish_reason, usage_metadata, time_to_first_token = GeminiWork._stream_content(
+                    client, model, contents, generate_content_config, started_at
+                )
+                usage = [usage_metadata]
+                
+                continuations = 0
+                while finish_reason == types.FinishReason.MAX_TOKENS and not GeminiWork._is_complete_json(result):
+                    if continuations >= GeminiWork.MAX_CONTINUATIONS:
+                        raise Exception(f"Response still truncated after {continuations} continuation requests")
+                    
+                    continuations += 1
+                    logging.info(f"Gemini output hit the token limit, requesting continuation {continuations}")
+                    continuation, finish_reason, usage_metadata, _ = GeminiWork._stream_content(
+                        client, model, GeminiWork._continuation_contents(contents, result),
+                        generate_content_config, started_at
+                    )
+                    usage.append(usage_metadata)
+                    result = GeminiWork._merge_continuation(result, continuation)
+                
+                GeminiWork._record_metrics(
+                    model, operation, profile, time.perf_counter() - started_at, time_to_first_token,
+                    usage, cached_context=bool(cached_content), continuations=continuations
+                )
             except Exception as e:
+                if cached_content:
+                    # The cache may have expired or been evicted early; recreate it on retry
+                    ContextCache.invalidate(api_key, model, system_instruction, tools)
                 logging.error(f"Failed to generate content: {traceback.format_exc()}")
                 raise Exception(f"Failed to generate content: {str(e)}")
             
@@ -103,7 +146,7 @@ class GeminiWork:
             if retries > 0:
                 logging.info(f"Retrying Gemini API call... ({retries} attempts left)")
                 time.sleep(2)  # Wait before retrying
-                return GeminiWork.call_gemini(api_key, prompt, model, retries - 1)
+                return GeminiWork.call_gemini(api_key, prompt, model, retries - 1, system_instruction, operation, profile)
             else:
                 logging.error("All retries failed for Gemini API call")
                 error_response = {
@@ -113,6 +156,86 @@ class GeminiWork:
                 }
                 return json.dumps(error_response)
     
+    @staticmethod
+    def _stream_content(client: genai.Client, model: str, contents: list[types.Content],
+                        config: types.GenerateContentConfig, started_at: float) -> tuple:
+        """Stream one response; returns (text, finish reason, usage metadata, time to first token)"""
+        text = ""
+        finish_reason = None
+        usage_metadata = None
+        time_to_first_token = None
+        for chunk in client.models.generate_content_stream(
+            model=model,
+            contents=contents,
+            config=config,
+        ):
+            if getattr(chunk, 'usage_metadata', None):
+                usage_metadata = chunk.usage_metadata
+            if getattr(chunk, 'candidates', None) and chunk.candidates[0].finish_reason:
+                finish_reason = chunk.candidates[0].finish_reason
+            if hasattr(chunk, 'text') and chunk.text:
+                if time_to_first_token is None:
+                    time_to_first_token = time.perf_counter() - started_at
+                text += chunk.text
+        return text, finish_reason, usage_metadata, time_to_first_token
+
+    @staticmethod
+    def _continuation_contents(contents: list[types.Content], partial_result: str) -> list[types.Content]:
+        return contents + [
+            types.Content(role="model", parts=[types.Part.from_text(text=partial_result)]),
+            types.Content(role="user", parts=[types.Part.from_text(text=GeminiWork.CONTINUATION_PROMPT)]),
+        ]
+
+    @staticmethod
+    def _merge_continuation(partial_result: str, continuation: str) -> str:
+        for fence in ("```json", "```"):
+            if continuation.lstrip().startswith(fence):
+                continuation = continuation.lstrip()[len(fence):].lstrip("\n")
+                break
+        
+        # Drop text the model repeated from the end of the partial result
+        max_overlap = min(len(partial_result), len(continuation), GeminiWork.MAX_CONTINUATION_OVERLAP)
+        for size in range(max_overlap, GeminiWork.MIN_CONTINUATION_OVERLAP - 1, -1):
+            if partial_result.endswith(continuation[:size]):
+                return partial_result + continuation[size:]
+        return partial_result + continuation
+
+    @staticmethod
+    def _is_complete_json(result: str) -> bool:
+        cleaned_result = result.replace("```json", "").replace("```", "")
+        try:
+            json.loads(cleaned_result)
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _record_metrics(model: str, operation: str, profile: str, latency: float, time_to_first_token: Optional[float],
+                        usage: list[Optional[types.GenerateContentResponseUsageMetadata]],
+                        cached_context: bool, continuations: int = 0) -> None:
+        try:
+            def total(field: str) -> Optional[int]:
+                values = [getattr(usage_metadata, field, None) for usage_metadata in usage]
+                values = [value for value in values if value is not None]
+                return sum(values) if values else None
+            
+            call_record = {
+                "model": model,
+                "operation": operation,
+                "profile": profile,
+                "cached_context": cached_context,
+                "latency": latency,
+                "time_to_first_token": time_to_first_token,
+                "continuations": continuations,
+                "prompt_tokens": total("prompt_token_count"),
+                "cached_tokens": total("cached_content_token_count"),
+                "output_tokens": total("candidates_token_count"),
+            }
+            GeminiMetrics.record(call_record)
+            logging.info(f"Gemini call metrics: {call_record}")
+        except Exception as e:
+            logging.warning(f"Failed to record Gemini call metrics: {str(e)}")
+    
     @staticmethod
     def validate_api_key(api_key: str) -> bool:
         """Validate API key format"""
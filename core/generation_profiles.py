@@ -0,0 +1,49 @@
+from typing import Dict, Any, List
+from .gemini_metrics import GeminiMetrics
+
+
+class GenerationProfiles:
+    """Named generation settings that trade answer depth for latency"""
+
+    PROFILES: Dict[str, Dict[str, Any]] = {
+        # Grading and other structured tasks: no thinking, no grounding
+        "fast": {"thinking_budget": 0, "use_search": False, "max_output_tokens": 8192},
+        "balanced": {"thinking_budget": 2048, "use_search": False, "max_output_tokens": 8192},
+        # Note analysis: dynamic thinking with Google Search grounding
+        "thorough": {"thinking_budget": -1, "use_search": True, "max_output_tokens": 8192},
+    }
+    DEFAULT_PROFILE = "thorough"
+
+    # Models that cannot switch thinking off get the smallest budget they accept instead
+    MIN_THINKING_BUDGETS: Dict[str, int] = {"gemini-2.5-pro": 128}
+
+    @staticmethod
+    def get_profile(name: str) -> Dict[str, Any]:
+        """
+        Get the settings of a named profile
+
+        Args:
+            name: Profile name (fast, balanced or thorough)
+
+        Returns:
+            Copy of the profile settings
+        """
+        if name not in GenerationProfiles.PROFILES:
+            raise ValueError(f"Invalid generation profile. Must be one of: {list(GenerationProfiles.PROFILES)}")
+        return dict(GenerationProfiles.PROFILES[name])
+
+    @staticmethod
+    def thinking_budget_for(profile: Dict[str, Any], model: str) -> int:
+        budget = profile["thinking_budget"]
+        if budget == -1:
+            return budget
+
+        for model_prefix, min_budget in GenerationProfiles.MIN_THINKING_BUDGETS.items():
+            if model.startswith(model_prefix):
+                return max(budget, min_budget)
+        return budget
+
+    @staticmethod
+    def latency_report() -> List[Dict[str, Any]]:
+        """Recorded Gemini latency per operation, profile and model, for tuning the defaults"""
+        return GeminiMetrics.summary(group_by=("operation", "profile", "model"))
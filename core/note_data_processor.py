@@ -1,6 +1,7 @@
 import logging
 import traceback
-from typing import Dict, Any, List, Tuple
+from contextlib import nullcontext
+from typing import Dict, Any, List, Tuple, ContextManager
 from datetime import datetime
 
 
@@ -9,6 +10,12 @@ class NoteDataProcessor:
     def __init__(self, repositories: Dict[str, Any]):
         self.repositories = repositories
     
+    def unit_of_work(self) -> ContextManager:
+        """One transaction for every repository write made inside the block (nested blocks join it)"""
+        conn = getattr(self.repositories["note_repository"], "conn", None)
+        transaction = getattr(conn, "transaction", None)
+        return transaction() if transaction else nullcontext()
+    
     def process_api_key(self, api_key: str) -> int:
         try:
             all_api_keys: List[Tuple[int, str, datetime]] = self.repositories["api_key_repository"].get_all_api_keys()
@@ -28,16 +35,50 @@ class NoteDataProcessor:
             logging.error(f"Error processing API key: {traceback.format_exc()}")
             raise Exception(f"Failed to process API key: {str(e)}")
     
-    def process_note(self, note_name: str, note_content: str, note_tags: List[str]) -> int:
+    def process_submission(self, note_name: str, note_content: str, note_tags: List[str],
+                           summary: str, quiz_data: List[Dict[str, Any]]) -> Tuple[int, Dict[str, int]]:
+        """Write a note with its tags, summary, questions and options atomically, with one commit"""
         try:
-            note_id = self.repositories["note_repository"].insert_note(note_name, note_content)
+            with self.unit_of_work():
+                note_id = self.process_note(note_name, note_content, note_tags)
+                self.process_summary(note_id, summary)
+                question_id_with_question = self.process_quiz_questions(note_id, quiz_data)
             
-            if note_tags:
-                try:
-                    self.repositories["note_hashtag_repository"].insert_note_hashtags(note_id, note_tags)
-                except Exception as e:
-                    logging.error(f"Error inserting note tags: {traceback.format_exc()}")
-                    logging.warning(f"Note created but tags failed to insert: {str(e)}")
+            return note_id, question_id_with_question
+            
+        except Exception as e:
+            logging.error(f"Error processing submission: {traceback.format_exc()}")
+            raise Exception(f"Failed to process submission: {str(e)}")
+    
+    def process_linked_submission(self, note_name: str, note_content: str, note_tags: List[str],
+                                  analysis_note_id: int) -> int:
+        """Write a note with its tags that shares analysis_note_id's summary and questions instead of its own"""
+        try:
+            with self.unit_of_work():
+                note_id = self.repositories["note_repository"].insert_note(
+                    note_name, note_content, analysis_note_id=analysis_note_id
+                )
+                
+                if note_tags:
+                    self.repositories["note_hashtag_repository"].insert_hashtags(note_tags, note_id=note_id)
+            
+            return note_id
+            
+        except Exception as e:
+            logging.error(f"Error processing linked submission: {traceback.format_exc()}")
+            raise Exception(f"Failed to process linked submission: {str(e)}")
+    
+    def process_note(self, note_name: str, note_content: str, note_tags: List[str]) -> int:
+        try:
+            with self.unit_of_work():
+                note_id = self.repositories["note_repository"].insert_note(note_name, note_content)
+                
+                if note_tags:
+                    try:
+                        self.repositories["note_hashtag_repository"].insert_hashtags(note_tags, note_id=note_id)
+                    except Exception as e:
+                        logging.error(f"Error inserting note tags: {traceback.format_exc()}")
+                        logging.warning(f"Note created but tags failed to insert: {str(e)}")
             
             return note_id
             
@@ -56,24 +97,36 @@ class NoteDataProcessor:
         try:
             question_id_with_question: Dict[str, int] = {}
             
+            valid_questions = []
             for question in quiz_data:
-                try:
-                    question_id = self.repositories["question_repository"].insert_question(
-                        note_id, 
-                        question["question"], 
-                        question["question_type"], 
-                        question["answer"]
-                    )
-                    
-                    if question.get("options"):
-                        self.repositories["option_repository"].insert_options(question_id, question["options"])
-                    
-                    question_id_with_question[question["question"]] = question_id
-                    
-                except Exception as e:
-                    logging.error(f"Error processing quiz question: {traceback.format_exc()}")
-                    # Continue processing other questions
+                if not all(isinstance(question.get(field), str) and question[field].strip()
+                           for field in ("question", "question_type", "answer")):
+                    logging.warning(f"Skipping invalid quiz question: {question}")
                     continue
+                if question["question_type"] not in ("multiple_choice", "short_answer", "long_answer"):
+                    logging.warning(f"Skipping quiz question with invalid type: {question['question_type']}")
+                    continue
+                valid_questions.append(question)
+            
+            if not valid_questions:
+                return question_id_with_question
+            
+            with self.unit_of_work():
+                question_ids = self.repositories["question_repository"].insert_questions(
+                    note_id,
+                    [(question["question"], question["question_type"], question["answer"]) for question in valid_questions]
+                )
+                
+                options_by_question = {
+                    question_id: question["options"]
+                    for question_id, question in zip(question_ids, valid_questions)
+                    if question.get("options")
+                }
+                if options_by_question:
+                    self.repositories["option_repository"].insert_options_for_questions(options_by_question)
+            
+            for question_id, question in zip(question_ids, valid_questions):
+                question_id_with_question[question["question"]] = question_id
             
             return question_id_with_question
             
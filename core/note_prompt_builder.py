@@ -1,15 +1,33 @@
 import json
 import logging
 import traceback
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 
 class NotePromptBuilder:
+
+    PROMPT_MODES = ("pretty", "compact")
+    ROLE = "You are an AI Lecture Transcript Analyst and Tutor. Your primary function is to help me understand lecture material better by analyzing, refining, and explaining concepts based on the transcripts I provide."
+    INPUT_DESCRIPTION = "I will provide you with a transcript from a lecture. These transcripts might be automatically generated (and thus contain errors), incomplete, or lack proper formatting."
+    TRANSCRIPT_OPEN_TAG = "<note_transcript>"
+    TRANSCRIPT_CLOSE_TAG = "</note_transcript>"
+
+    CITATION_RULE = "DO NOT INCLUDE BRACKETED SOURCE CITATIONS IN THE SUMMARY AND QUIZ like [0, 3, 4, 12, 13, 14, 15]."
+    JSON_ONLY_RULES = [
+        "YOUR OUTPUT SHOULD BE JSON FORMAT!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!",
+        "DO NOT SAY ANYTHING ELSE!!!!! JUST RETURN THE JSON FORMAT I ASKED FOR!!!!!!!!!!!!!"
+    ]
+    COMPACT_OUTPUT_RULE = "Return only one JSON object matching output_format, with no other text and no bracketed source citations like [0, 3, 4]."
     
     @staticmethod
-    def create_submit_note_prompt(note: str, quiz_structure: dict) -> str:
+    def create_submit_note_prompt(note: str, quiz_structure: dict, mode: str = "pretty",
+                                  include_instructions: bool = True,
+                                  exclude_questions: Optional[List[str]] = None) -> str:
         try:
             # Input validation
+            if mode not in NotePromptBuilder.PROMPT_MODES:
+                raise ValueError(f"Invalid prompt mode. Must be one of: {list(NotePromptBuilder.PROMPT_MODES)}")
+            
             if not note or not note.strip():
                 raise ValueError("Note content cannot be empty")
             
@@ -24,33 +42,125 @@ class NotePromptBuilder:
                 if not isinstance(quiz_structure[key], int) or quiz_structure[key] < 0:
                     raise ValueError(f"Quiz structure value for '{key}' must be a non-negative integer")
             
-            prompt_data = NotePromptBuilder._build_prompt_structure(note, quiz_structure)
+            if exclude_questions is not None and not isinstance(exclude_questions, list):
+                raise ValueError("Excluded questions must be a list")
+            
+            # A list of already generated questions (even empty) marks a follow-up page request
+            page_tasks = [] if exclude_questions is None else [NotePromptBuilder._get_page_task(exclude_questions)]
+            
+            if mode == "compact":
+                return NotePromptBuilder._encode_compact(note, quiz_structure, include_instructions, page_tasks)
+            
+            prompt_data = NotePromptBuilder._build_prompt_structure(note, quiz_structure, include_instructions, page_tasks)
             return json.dumps(prompt_data, indent=4, ensure_ascii=False)
             
         except Exception as e:
             logging.error(f"Error creating submit note prompt: {traceback.format_exc()}")
             raise Exception(f"Failed to create submit note prompt: {str(e)}")
+
+    @staticmethod
+    def get_system_instruction(mode: str = "pretty") -> str:
+        """Static instruction prefix shared by every note analysis call, suitable for context caching"""
+        try:
+            if mode not in NotePromptBuilder.PROMPT_MODES:
+                raise ValueError(f"Invalid prompt mode. Must be one of: {list(NotePromptBuilder.PROMPT_MODES)}")
+            
+            compact = mode == "compact"
+            instruction = NotePromptBuilder._get_static_structure(compact)
+            if compact:
+                return json.dumps(instruction, separators=(",", ":"), ensure_ascii=False)
+            return json.dumps(instruction, indent=4, ensure_ascii=False)
+            
+        except Exception as e:
+            logging.error(f"Error creating note system instruction: {traceback.format_exc()}")
+            raise Exception(f"Failed to create note system instruction: {str(e)}")
+
+    @staticmethod
+    def _get_static_structure(compact: bool = False) -> Dict[str, Any]:
+        output_format_key = "output_format" if compact else "example_of_output_format(the result should be a json)"
+        return {
+            "role": NotePromptBuilder.ROLE,
+            "input_description": NotePromptBuilder.INPUT_DESCRIPTION,
+            "core_tasks": NotePromptBuilder._get_static_tasks(compact),
+            output_format_key: NotePromptBuilder._get_output_format_example()
+        }
     
     @staticmethod
-    def _build_prompt_structure(note: str, quiz_structure: dict) -> Dict[str, Any]:
+    def _build_prompt_structure(note: str, quiz_structure: dict, include_instructions: bool = True,
+                                page_tasks: Optional[List[str]] = None) -> Dict[str, Any]:
         mc_count = quiz_structure.get("multiple_choice", 0)
         sa_count = quiz_structure.get("short_answer", 0)
         la_count = quiz_structure.get("long_answer", 0)
         
-        prompt_data = {
-            "role": "You are an AI Lecture Transcript Analyst and Tutor. Your primary function is to help me understand lecture material better by analyzing, refining, and explaining concepts based on the transcripts I provide.",
-            "input_description": "I will provide you with a transcript from a lecture. These transcripts might be automatically generated (and thus contain errors), incomplete, or lack proper formatting.",
-            "core_tasks": NotePromptBuilder._get_core_tasks(mc_count, sa_count, la_count),
-            "example_of_output_format(the result should be a json)": NotePromptBuilder._get_output_format_example(),
-            "user_input": {
-                "note_transcript": note
-            }
+        prompt_data = NotePromptBuilder._get_static_structure() if include_instructions else {}
+        prompt_data["core_tasks"] = prompt_data.get("core_tasks", []) + [
+            NotePromptBuilder._get_question_task(mc_count, sa_count, la_count)
+        ] + (page_tasks or [])
+        prompt_data["user_input"] = {
+            "note_transcript": note
         }
         
         return prompt_data
+
+    @staticmethod
+    def _encode_compact(note: str, quiz_structure: dict, include_instructions: bool = True,
+                        page_tasks: Optional[List[str]] = None) -> str:
+        # Minified instructions followed by the transcript as a raw block, so the
+        # transcript is not paid for twice in JSON escapes.
+        mc_count = quiz_structure.get("multiple_choice", 0)
+        sa_count = quiz_structure.get("short_answer", 0)
+        la_count = quiz_structure.get("long_answer", 0)
+        
+        header = NotePromptBuilder._get_static_structure(compact=True) if include_instructions else {}
+        header["core_tasks"] = header.get("core_tasks", []) + [
+            NotePromptBuilder._get_question_task(mc_count, sa_count, la_count)
+        ] + (page_tasks or [])
+        header["user_input"] = f"note_transcript is the raw text between {NotePromptBuilder.TRANSCRIPT_OPEN_TAG} tags below"
+        
+        return "\n".join([
+            json.dumps(header, separators=(",", ":"), ensure_ascii=False),
+            NotePromptBuilder.TRANSCRIPT_OPEN_TAG,
+            note,
+            NotePromptBuilder.TRANSCRIPT_CLOSE_TAG
+        ])
+
+    @staticmethod
+    def parse_prompt(prompt: str) -> Dict[str, Any]:
+        """Decode a prompt of either mode back into its structured form"""
+        try:
+            opening = f"\n{NotePromptBuilder.TRANSCRIPT_OPEN_TAG}\n"
+            if opening not in prompt:
+                return json.loads(prompt)
+            
+            header, _, rest = prompt.partition(opening)
+            prompt_data = json.loads(header)
+            note, _, _ = rest.rpartition(f"\n{NotePromptBuilder.TRANSCRIPT_CLOSE_TAG}")
+            prompt_data["user_input"] = {"note_transcript": note}
+            return prompt_data
+            
+        except Exception as e:
+            logging.error(f"Error parsing note prompt: {traceback.format_exc()}")
+            raise Exception(f"Failed to parse note prompt: {str(e)}")
     
     @staticmethod
-    def _get_core_tasks(mc_count: int, sa_count: int, la_count: int) -> list[str]:
+    def _get_core_tasks(mc_count: int, sa_count: int, la_count: int, compact: bool = False) -> list[str]:
+        return NotePromptBuilder._get_static_tasks(compact) + [
+            NotePromptBuilder._get_question_task(mc_count, sa_count, la_count)
+        ]
+
+    @staticmethod
+    def _get_question_task(mc_count: int, sa_count: int, la_count: int) -> str:
+        return f"Generate Practice Questions: Create exactly {mc_count} multiple-choice, {sa_count} short-answer, and {la_count} long-answer questions. Adhere strictly to the 'quiz' structure defined in the 'output_format'."
+    
+    @staticmethod
+    def _get_page_task(exclude_questions: List[str]) -> str:
+        return (
+            "This is a follow-up request for more practice questions only: return a JSON object with only the 'quiz' key and no 'summary'. "
+            f"Do not repeat or paraphrase any of these already generated questions: {json.dumps(exclude_questions, ensure_ascii=False)}"
+        )
+    
+    @staticmethod
+    def _get_static_tasks(compact: bool = False) -> list[str]:
         tasks = [
             "Fact-Check: Identify and point out any potential factual inaccuracies or outdated information that might stem from transcription errors or the lecture's content. Suggest corrections with brief explanations.",
             "Identify Gaps: Pinpoint areas that seem incomplete or where crucial information might be missing (e.g., a speaker trailed off, or a key detail was omitted). Suggest what might be missing or what questions I could ask to fill these gaps.",
@@ -61,14 +171,18 @@ class NotePromptBuilder:
             "Provide Examples: Where appropriate, offer relevant examples, analogies, or real-world applications to illustrate the concepts discussed in the lecture.",
             "Connect to Broader Topics: If possible, explain how the concepts in the transcript relate to larger themes within the subject or to previously discussed topics.",
             "Suggest Further Learning: If relevant, suggest resources (articles, videos, concepts to Google) for deeper exploration of the topics.",
-            "DO NOT INCLUDE BRACKETED SOURCE CITATIONS IN THE SUMMARY AND QUIZ like [0, 3, 4, 12, 13, 14, 15].",
-            "YOUR OUTPUT SHOULD BE JSON FORMAT!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!",
-            "DO NOT SAY ANYTHING ELSE!!!!! JUST RETURN THE JSON FORMAT I ASKED FOR!!!!!!!!!!!!!",
+            NotePromptBuilder.CITATION_RULE,
+            *NotePromptBuilder.JSON_ONLY_RULES,
             "The summaary should be concise and easy to read and understand.",
-            "Please structure the summary for at-a-glance comprehension. It must be organized into clear categories based on context or usage level, such as 'Most Common Expressions', 'Simpler Terms', and 'More Technical/Professional Expressions'.",
-            f"Generate Practice Questions: Create exactly {mc_count} multiple-choice, {sa_count} short-answer, and {la_count} long-answer questions. Adhere strictly to the 'quiz' structure defined in the 'output_format'."
+            "Please structure the summary for at-a-glance comprehension. It must be organized into clear categories based on context or usage level, such as 'Most Common Expressions', 'Simpler Terms', and 'More Technical/Professional Expressions'."
         ]
         
+        if compact:
+            # The citation and JSON-only rules are repeated three times above; say them once.
+            redundant = [NotePromptBuilder.CITATION_RULE, *NotePromptBuilder.JSON_ONLY_RULES]
+            tasks = [task for task in tasks if task not in redundant]
+            tasks.append(NotePromptBuilder.COMPACT_OUTPUT_RULE)
+        
         return tasks
     
     @staticmethod
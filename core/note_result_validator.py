@@ -29,6 +29,28 @@ class NoteResultValidator:
             logging.error(f"Error validating Gemini response: {traceback.format_exc()}")
             raise Exception(f"Failed to validate Gemini response: {str(e)}")
     
+    @staticmethod
+    def validate_question_page(result: str) -> Dict[str, Any]:
+
+        try:
+            try:
+                result_json = json.loads(result)
+            except json.JSONDecodeError as e:
+                logging.error(f"Failed to parse JSON result: {str(e)}")
+                raise Exception(f"Invalid JSON response from Gemini: {str(e)}")
+            
+            # Follow-up pages carry questions only
+            if not isinstance(result_json, dict) or not isinstance(result_json.get("quiz"), list):
+                raise Exception("Missing 'quiz' list in Gemini response")
+            
+            NoteResultValidator._validate_quiz_structure(result_json)
+            
+            return result_json
+            
+        except Exception as e:
+            logging.error(f"Error validating question page: {traceback.format_exc()}")
+            raise Exception(f"Failed to validate question page: {str(e)}")
+    
     @staticmethod
     def _validate_basic_structure(result_json: Dict[str, Any]) -> None:
 
@@ -0,0 +1,114 @@
+import logging
+import threading
+import traceback
+from typing import Dict, Any, List, Callable, Optional
+
+
+QUESTION_TYPES = ("multiple_choice", "short_answer", "long_answer")
+
+
+class QuestionBank:
+    """Splits a question bank of any size into pages that fit one Gemini response"""
+
+    DEFAULT_PAGE_SIZE = 10
+
+    @staticmethod
+    def plan_pages(quiz_structure: Dict[str, int], page_size: int = DEFAULT_PAGE_SIZE) -> List[Dict[str, int]]:
+        """
+        Plan the quiz structure of each page
+
+        Args:
+            quiz_structure: Total number of questions per question type
+            page_size: Maximum number of questions per page
+
+        Returns:
+            One quiz structure per page; question types are spread evenly over the pages
+        """
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError("Page size must be a positive integer")
+
+        for key in QUESTION_TYPES:
+            if not isinstance(quiz_structure.get(key, 0), int) or quiz_structure.get(key, 0) < 0:
+                raise ValueError(f"Quiz structure value for '{key}' must be a non-negative integer")
+
+        # Order questions by their relative position within their type so every page gets a similar mix
+        slots = []
+        for type_index, key in enumerate(QUESTION_TYPES):
+            count = quiz_structure.get(key, 0)
+            for i in range(count):
+                slots.append(((i + 0.5) / count, type_index, key))
+        slots.sort()
+
+        pages = []
+        for start in range(0, len(slots), page_size):
+            page = {key: 0 for key in QUESTION_TYPES}
+            for _, _, key in slots[start:start + page_size]:
+                page[key] += 1
+            pages.append(page)
+
+        return pages
+
+
+class QuestionBankJob:
+    """Generates the remaining pages of a question bank on a background thread"""
+
+    def __init__(self, pages: List[Dict[str, int]],
+                 generate_page: Callable[[Dict[str, int], List[str]], List[Dict[str, Any]]],
+                 exclude_questions: Optional[List[str]] = None):
+        """
+        Args:
+            pages: Quiz structure of each page still to generate
+            generate_page: Callable taking a page structure and the questions generated so far,
+                returning the new quiz items
+            exclude_questions: Questions that already exist (e.g. from the first page)
+        """
+        self.pages = list(pages)
+        self.generate_page = generate_page
+        self.total_pages = len(self.pages)
+        self.completed_pages = 0
+        self.error: Optional[str] = None
+
+        self._questions = list(exclude_questions or [])
+        self._ready: List[List[Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="question-bank-job", daemon=True)
+
+    def start(self) -> "QuestionBankJob":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def take_ready_pages(self) -> List[List[Dict[str, Any]]]:
+        """Hand over the pages finished since the last call"""
+        with self._lock:
+            ready, self._ready = self._ready, []
+            return ready
+
+    def _run(self) -> None:
+        for page in self.pages:
+            if self._cancelled.is_set():
+                return
+
+            try:
+                quiz = self.generate_page(page, list(self._questions))
+            except Exception as e:
+                logging.error(f"Error generating question page: {traceback.format_exc()}")
+                self.error = str(e)
+                return
+
+            new_quiz = [item for item in quiz if item.get("question") not in self._questions]
+            with self._lock:
+                if self._cancelled.is_set():
+                    return
+                self._questions.extend(item.get("question") for item in new_quiz)
+                self._ready.append(new_quiz)
+                self.completed_pages += 1
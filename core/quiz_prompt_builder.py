@@ -6,20 +6,39 @@ from typing import Dict, Any, List
 
 class QuizPromptBuilder:
     """Handles the creation of prompts for quiz submission to Gemini API"""
+
+    PROMPT_MODES = ("pretty", "compact")
+    ROLE = "You are a calm, clear, and informative AI Tutor. Your primary function is to provide constructive feedback on my answers to questions."
+    INPUT_DESCRIPTION = "I will provide you with quiz questions with my answers. You will then evaluate my response."
+    CITATION_RULE = "IMPORTANT: Do not include bracketed source citations in the output."
+    JSON_ONLY_RULES = [
+        "YOUR OUTPUT SHOULD BE JSON FORMAT!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!",
+        "DO NOT SAY ANYTHING ELSE!!!!! JUST RETURN THE JSON FORMAT I ASKED FOR!!!!!!!!!!!!!"
+    ]
+    COMPACT_OUTPUT_RULE = "Return only that JSON object, with no other text and no bracketed source citations."
+    COMPACT_ITEM_FIELDS = ["question", "question_type", "options", "answer", "user_answer"]
     
     @staticmethod
-    def create_submit_quiz_prompt(quiz: List[Dict[str, Any]]) -> str:
+    def create_submit_quiz_prompt(quiz: List[Dict[str, Any]], mode: str = "pretty",
+                                  include_instructions: bool = True) -> str:
         """
         Create a structured prompt for quiz submission
         
         Args:
             quiz: List of quiz questions with user answers
+            mode: "pretty" for indented JSON, "compact" for minified JSON with
+                deduplicated instructions and trimmed quiz items
+            include_instructions: False leaves out the static prefix returned by
+                get_system_instruction, for callers that send it separately
             
         Returns:
             JSON string containing the formatted prompt
         """
         try:
             # Input validation
+            if mode not in QuizPromptBuilder.PROMPT_MODES:
+                raise ValueError(f"Invalid prompt mode. Must be one of: {list(QuizPromptBuilder.PROMPT_MODES)}")
+            
             if not isinstance(quiz, list):
                 raise ValueError("Quiz must be a list")
             
@@ -29,12 +48,49 @@ class QuizPromptBuilder:
             # Validate each quiz item
             QuizPromptBuilder._validate_quiz_items(quiz)
             
-            prompt_data = QuizPromptBuilder._build_prompt_structure(quiz)
+            if mode == "compact":
+                prompt_data = QuizPromptBuilder._build_compact_prompt_structure(quiz)
+            else:
+                prompt_data = QuizPromptBuilder._build_prompt_structure(quiz)
+            
+            if not include_instructions:
+                prompt_data = {"user_input": prompt_data["user_input"]}
+            
+            if mode == "compact":
+                return json.dumps(prompt_data, separators=(",", ":"), ensure_ascii=False)
             return json.dumps(prompt_data, indent=4, ensure_ascii=False)
             
         except Exception as e:
             logging.error(f"Error creating submit quiz prompt: {traceback.format_exc()}")
             raise Exception(f"Failed to create submit quiz prompt: {str(e)}")
+
+    @staticmethod
+    def get_system_instruction(mode: str = "pretty") -> str:
+        """
+        Get the static instruction prefix shared by every grading call
+        
+        Args:
+            mode: Prompt mode, as for create_submit_quiz_prompt
+            
+        Returns:
+            JSON string with the role, core tasks and output format
+        """
+        try:
+            if mode not in QuizPromptBuilder.PROMPT_MODES:
+                raise ValueError(f"Invalid prompt mode. Must be one of: {list(QuizPromptBuilder.PROMPT_MODES)}")
+            
+            if mode == "compact":
+                instruction = QuizPromptBuilder._build_compact_prompt_structure([])
+                instruction.pop("user_input")
+                return json.dumps(instruction, separators=(",", ":"), ensure_ascii=False)
+            
+            instruction = QuizPromptBuilder._build_prompt_structure([])
+            instruction.pop("user_input")
+            return json.dumps(instruction, indent=4, ensure_ascii=False)
+            
+        except Exception as e:
+            logging.error(f"Error creating quiz system instruction: {traceback.format_exc()}")
+            raise Exception(f"Failed to create quiz system instruction: {str(e)}")
     
     @staticmethod
     def _validate_quiz_items(quiz: List[Dict[str, Any]]) -> None:
@@ -58,8 +114,8 @@ class QuizPromptBuilder:
     def _build_prompt_structure(quiz: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Build the complete prompt structure"""
         return {
-            "role": "You are a calm, clear, and informative AI Tutor. Your primary function is to provide constructive feedback on my answers to questions.",
-            "input_description": "I will provide you with quiz questions with my answers. You will then evaluate my response.",
+            "role": QuizPromptBuilder.ROLE,
+            "input_description": QuizPromptBuilder.INPUT_DESCRIPTION,
             "core_tasks": QuizPromptBuilder._get_core_tasks(),
             "example_of_output_format(the result should be a json)": QuizPromptBuilder._get_output_format_example(),
             "user_input": {
@@ -68,17 +124,46 @@ class QuizPromptBuilder:
         }
     
     @staticmethod
-    def _get_core_tasks() -> List[str]:
+    def _build_compact_prompt_structure(quiz: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the prompt structure with deduplicated instructions and trimmed items"""
+        return {
+            "role": QuizPromptBuilder.ROLE,
+            "input_description": QuizPromptBuilder.INPUT_DESCRIPTION,
+            "core_tasks": QuizPromptBuilder._get_core_tasks(compact=True),
+            "output_format": QuizPromptBuilder._get_output_format_example(),
+            "user_input": {
+                "quiz_with_answers": [QuizPromptBuilder._compact_quiz_item(quiz_item) for quiz_item in quiz]
+            }
+        }
+    
+    @staticmethod
+    def _compact_quiz_item(quiz_item: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep only the fields the grader needs; options are sent for multiple choice only"""
+        compact_item = {}
+        for field in QuizPromptBuilder.COMPACT_ITEM_FIELDS:
+            value = quiz_item.get(field)
+            if field == "options" and quiz_item.get("question_type") != "multiple_choice":
+                continue
+            if field == "user_answer" or value:
+                compact_item[field] = value
+        return compact_item
+    
+    @staticmethod
+    def _get_core_tasks(compact: bool = False) -> List[str]:
         """Get the list of core tasks for the AI"""
+        if compact:
+            redundant = [QuizPromptBuilder.CITATION_RULE, *QuizPromptBuilder.JSON_ONLY_RULES]
+            tasks = [task for task in QuizPromptBuilder._get_core_tasks() if task not in redundant]
+            return tasks + [QuizPromptBuilder.COMPACT_OUTPUT_RULE]
+        
         return [
             "Score My Answer: Evaluate the correctness and completeness of my answer using one of the following qualitative assessments: 'Correct', 'Partially Correct', or 'Incorrect'.",
             "Provide Corrections (if needed): If my answer is not perfect, gently point out any inaccuracies or omissions. Clearly explain why it's incorrect or could be better, and then provide a well-explained, corrected version of the answer.",
             "Offer Additional Information/Context: Regardless of my answer's correctness, provide some relevant background information, interesting facts, or further explanations related to the topic of the question to help deepen my understanding.",
             "Ensure your feedback is always delivered in a patient, constructive, and easy-to-understand way. Focus on helping me learn.",
             "Return the result as a single JSON object with a top-level key named 'quiz'. The value of 'quiz' should be a list of dictionaries, just like the example.",
-            "IMPORTANT: Do not include bracketed source citations in the output.",
-            "YOUR OUTPUT SHOULD BE JSON FORMAT!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!",
-            "DO NOT SAY ANYTHING ELSE!!!!! JUST RETURN THE JSON FORMAT I ASKED FOR!!!!!!!!!!!!!"
+            QuizPromptBuilder.CITATION_RULE,
+            *QuizPromptBuilder.JSON_ONLY_RULES
         ]
     
     @staticmethod
@@ -1,7 +1,7 @@
 import json
 import logging
 import traceback
-from typing import Any, Tuple, Dict
+from typing import Any, Optional, Tuple, Dict, List
 from .gemini_work import GeminiWork
 from .note_prompt_builder import NotePromptBuilder
 from .note_result_validator import NoteResultValidator
@@ -33,7 +33,8 @@ class SubmitNote:
             raise Exception(f"Failed to initialize SubmitNote: {str(e)}")
 
     def submit_note(self, api_key: str, note_name: str, note_tags: list[str], 
-                   note_content: str, quiz_structure: dict, model: str = "gemini-2.5-pro") -> Tuple[dict, dict, Dict[str, int]]:
+                   note_content: str, quiz_structure: dict, model: str = "gemini-2.5-pro",
+                   prompt_mode: str = "compact", profile: str = "thorough") -> Tuple[dict, dict, Dict[str, int], int]:
 
         try:
             self.data_processor.validate_inputs(api_key, note_name, note_tags, note_content, quiz_structure, model)
@@ -43,15 +44,21 @@ class SubmitNote:
             
             self.data_processor.process_api_key(api_key)
             
-            note_id = self.data_processor.process_note(note_name, note_content, note_tags)
-            
-            full_prompt = NotePromptBuilder.create_submit_note_prompt(note_content, quiz_structure)
-            full_prompt_json = json.loads(full_prompt)
+            # The static prefix goes out as a (cached) system instruction; the prompt carries only per-note input
+            system_instruction = NotePromptBuilder.get_system_instruction(mode=prompt_mode)
+            full_prompt = NotePromptBuilder.create_submit_note_prompt(
+                note_content, quiz_structure, mode=prompt_mode, include_instructions=False
+            )
+            full_prompt_json = NotePromptBuilder.parse_prompt(full_prompt)
+            full_prompt_json["system_instruction"] = json.loads(system_instruction)
             
             result = APIRetryHandler.call_gemini_with_retry(
                 api_key=api_key,
                 prompt=full_prompt,
-                model=model
+                model=model,
+                system_instruction=system_instruction,
+                operation="submit_note",
+                profile=profile
             )
             
             result_json = NoteResultValidator.validate_gemini_response(result)
@@ -60,14 +67,96 @@ class SubmitNote:
             
             NoteResultValidator.save_result_to_file(result_json)
             
-            self.data_processor.process_summary(note_id, result_json.get("summary", ""))
-            
-            question_id_with_question = self.data_processor.process_quiz_questions(
-                note_id, result_json.get("quiz", [])
+            # Nothing is stored until Gemini has answered, then everything is stored with one commit
+            note_id, question_id_with_question = self.data_processor.process_submission(
+                note_name, note_content, note_tags, result_json.get("summary", ""), result_json.get("quiz", [])
             )
             
-            return full_prompt_json, result_json, question_id_with_question
+            return full_prompt_json, result_json, question_id_with_question, note_id
             
         except Exception as e:
             logging.error(f"Error in submit_note: {traceback.format_exc()}")
-            raise Exception(f"Failed to submit note: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to submit note: {str(e)}")
+
+    def find_existing_analysis(self, note_content: str) -> Optional[Tuple[int, str, Any]]:
+        """(note_id, note_name, created_at) of an analyzed note with exactly this content, or None"""
+        try:
+            if not note_content or not note_content.strip():
+                return None
+            return self.repositories["note_repository"].find_analyzed_duplicate(note_content)
+        except Exception as e:
+            logging.error(f"Error in find_existing_analysis: {traceback.format_exc()}")
+            raise Exception(f"Failed to look up existing analysis: {str(e)}")
+
+    def link_note(self, note_name: str, note_tags: list[str], note_content: str,
+                  analysis_note_id: int) -> Tuple[dict, Dict[str, int], int]:
+        """
+        Store a note that reuses analysis_note_id's summary and question set; Gemini is not called.
+
+        Returns:
+            The stored analysis shaped like submit_note's result_json, question_id_with_question and the new note ID
+        """
+        try:
+            if "note_aggregate_repository" not in self.repositories:
+                raise ValueError("Required repository 'note_aggregate_repository' not found")
+            
+            if not note_name or not note_name.strip():
+                raise ValueError("Note name cannot be empty")
+            
+            if not isinstance(note_tags, list):
+                raise ValueError("Note tags must be a list")
+            
+            note_id = self.data_processor.process_linked_submission(note_name, note_content, note_tags, analysis_note_id)
+            
+            aggregate = self.repositories["note_aggregate_repository"].get_note_aggregate(note_id)
+            quiz = [
+                {
+                    "question": question["question"],
+                    "question_type": question["question_type"],
+                    "answer": question["preview_answer"],
+                    "options": question["options"]
+                }
+                for question in aggregate["questions"]
+            ]
+            result_json = {"summary": aggregate["summary"] or "", "quiz": quiz}
+            question_id_with_question = {question["question"]: question["question_id"] for question in aggregate["questions"]}
+            
+            return result_json, question_id_with_question, note_id
+            
+        except Exception as e:
+            logging.error(f"Error in link_note: {traceback.format_exc()}")
+            raise Exception(f"Failed to link note: {str(e)}")
+
+    def generate_question_page(self, api_key: str, note_content: str, quiz_structure: dict,
+                               exclude_questions: List[str], model: str = "gemini-2.5-pro",
+                               prompt_mode: str = "compact", profile: str = "thorough") -> List[Dict[str, Any]]:
+        """Generate one more page of questions for a submitted note; nothing is stored"""
+
+        try:
+            if not note_content or not note_content.strip():
+                raise ValueError("Note content cannot be empty")
+            
+            # Same system instruction as submit_note, so the cached context is reused
+            system_instruction = NotePromptBuilder.get_system_instruction(mode=prompt_mode)
+            page_prompt = NotePromptBuilder.create_submit_note_prompt(
+                note_content, quiz_structure, mode=prompt_mode, include_instructions=False,
+                exclude_questions=exclude_questions
+            )
+            
+            result = APIRetryHandler.call_gemini_with_retry(
+                api_key=api_key,
+                prompt=page_prompt,
+                model=model,
+                system_instruction=system_instruction,
+                operation="question_page",
+                profile=profile
+            )
+            
+            result_json = NoteResultValidator.validate_question_page(result)
+            result_json = TextCleaner.clean_quiz_result(result_json)
+            
+            return result_json.get("quiz", [])
+            
+        except Exception as e:
+            logging.error(f"Error in generate_question_page: {traceback.format_exc()}")
+            raise Exception(f"Failed to generate question page: {str(e)}")
\ No newline at end of file
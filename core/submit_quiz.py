@@ -22,7 +22,8 @@ class SubmitQuiz:
             logging.error(f"Failed to initialize SubmitQuiz: {traceback.format_exc()}")
             raise Exception(f"Failed to initialize SubmitQuiz: {str(e)}")
 
-    def submit_quiz(self, api_key: str, quiz: List[Dict[str, Any]], model: str = "gemini-2.5-pro") -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    def submit_quiz(self, api_key: str, quiz: List[Dict[str, Any]], model: str = "gemini-2.5-pro",
+                    prompt_mode: str = "compact", profile: str = "fast") -> Tuple[Dict[str, Any], Dict[str, Any]]:
 
         try:
             self._validate_inputs(api_key, quiz, model)
@@ -30,13 +31,20 @@ class SubmitQuiz:
             if not GeminiWork.validate_api_key(api_key):
                 raise ValueError("Invalid API key format")
             
-            full_prompt_for_quiz = QuizPromptBuilder.create_submit_quiz_prompt(quiz)
+            system_instruction = QuizPromptBuilder.get_system_instruction(mode=prompt_mode)
+            full_prompt_for_quiz = QuizPromptBuilder.create_submit_quiz_prompt(
+                quiz, mode=prompt_mode, include_instructions=False
+            )
             full_prompt_json_for_quiz = json.loads(full_prompt_for_quiz)
+            full_prompt_json_for_quiz["system_instruction"] = json.loads(system_instruction)
             
             result = APIRetryHandler.call_gemini_with_retry(
                 api_key=api_key,
                 prompt=full_prompt_for_quiz,
-                model=model
+                model=model,
+                system_instruction=system_instruction,
+                operation="submit_quiz",
+                profile=profile
             )
             
             result_json = QuizResultValidator.validate_gemini_response(result, len(quiz))
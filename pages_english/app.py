@@ -13,35 +13,69 @@ from repositories.question_repository import QuestionRepository
 from repositories.option_repository import OptionRepository
 from repositories.grading_repository import GradingRepository
 from repositories.summary_repository import SummaryRepository
+from repositories.note_aggregate_repository import NoteAggregateRepository
+from repositories.note_search_repository import NoteSearchRepository
+from repositories.prefix_index import PrefixIndex
 import traceback
 import logging
+import atexit
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_layer() -> tuple[my_db.MyDB, dict]:
+    """Database and repositories, created once per process and shared by every session and rerun"""
+    db = my_db.MyDB()
+    db.connect()
+    # Streamlit never evicts this resource on its own, so close the pool when the process exits
+    atexit.register(db.close)
+
+    repositories = {}
+    repository_classes = {
+        "api_key_repository": ApiKeyRepository,
+        "note_repository": NoteRepository,
+        "note_hashtag_repository": NoteHashtagRepository,
+        "question_repository": QuestionRepository,
+        "option_repository": OptionRepository,
+        "grading_repository": GradingRepository,
+        "summary_repository": SummaryRepository,
+        "note_aggregate_repository": NoteAggregateRepository,
+        "note_search_repository": NoteSearchRepository
+    }
+
+    try:
+        # Process-wide suggestion indexes, built once here and kept current by the repositories' writes
+        note_name_index = PrefixIndex((note_name, note_id) for note_id, note_name, _ in NoteRepository(db.conn).get_all_notes())
+        # Every stored tag, like the inserts add and the SQL fallback of suggest_hashtags searches, so
+        # suggestions do not depend on the process age; the tag cloud ranks live tags separately
+        hashtag_index = PrefixIndex((hashtag, hashtag) for hashtag in NoteHashtagRepository(db.conn).get_all_hashtags())
+        logging.info(
+            f"Prefix indexes built: {len(note_name_index)} note names, {len(hashtag_index)} hashtags, "
+            f"{(note_name_index.memory_footprint() + hashtag_index.memory_footprint()) / 1024:.0f} KiB"
+        )
+        repository_kwargs = {
+            "note_repository": {"name_index": note_name_index},
+            "note_hashtag_repository": {"hashtag_index": hashtag_index}
+        }
+
+        for repo_name, repo_class in repository_classes.items():
+            try:
+                repositories[repo_name] = repo_class(db.conn, **repository_kwargs.get(repo_name, {}))
+            except Exception as e:
+                logging.error(f"Repository initialization error for {repo_name}: {traceback.format_exc()}")
+                raise Exception(f"Failed to initialize {repo_name}: {str(e)}")
+    except Exception:
+        # A failed build is not cached; do not leak its connections
+        db.close()
+        raise
+
+    return db, repositories
+
 
 class App:
     def __init__(self):
         try:
-            # Initialize database connection
-            self.db = my_db.MyDB()
-            self.db.connect()
-            
-            # Initialize repositories with error handling
-            self.repositories = {}
-            repository_classes = {
-                "api_key_repository": ApiKeyRepository,
-                "note_repository": NoteRepository,
-                "note_hashtag_repository": NoteHashtagRepository,
-                "question_repository": QuestionRepository,
-                "option_repository": OptionRepository,
-                "grading_repository": GradingRepository,
-                "summary_repository": SummaryRepository
-            }
-            
-            for repo_name, repo_class in repository_classes.items():
-                try:
-                    self.repositories[repo_name] = repo_class(self.db.conn)
-                except Exception as e:
-                    st.error(f"Failed to initialize {repo_name}: {str(e)}")
-                    logging.error(f"Repository initialization error for {repo_name}: {traceback.format_exc()}")
-                    raise
+            # Shared database connection pool and repositories
+            self.db, self.repositories = get_data_layer()
             
             # Initialize controller
             self.controller = Controller(self.repositories)
@@ -2,9 +2,10 @@
 import streamlit as st
 from core.submit_note import SubmitNote
 from core.submit_quiz import SubmitQuiz
+from core.question_bank import QuestionBank, QuestionBankJob
 from st_flexible_callout_elements import flexible_success
 import re
-from typing import Any
+from typing import Any, Optional
 
 @st.dialog("Are you sure you want to erase all existing results?")
 def reset_new_note_dialog():
@@ -13,6 +14,9 @@ def reset_new_note_dialog():
 
     with col1:
         if st.button("Erase", type="primary", use_container_width=True):
+            if st.session_state.get("question_bank_job"):
+                st.session_state.question_bank_job.cancel()
+            st.session_state.update(question_bank_job=None, note_id=None, question_bank_error="", duplicate_of=None, reuse_analysis=None)
             st.session_state.update(note_submitted=False, processing_note=False, processing_quiz=False, summary="", quiz=[], graded=False, grading_result="", multiple_choice_count=0, short_answer_count=0, long_answer_count=0)
             st.rerun()
 
@@ -58,48 +62,123 @@ class Controller:
             "processing_note": False,
             "processing_quiz": False,
             "processing_review_quiz": False,
-            "question_id_with_question": {}
+            "question_id_with_question": {},
+            "note_id": None,
+            "question_bank_job": None,
+            "question_bank_error": "",
+            "duplicate_of": None,
+            "reuse_analysis": None
         }
         for key, value in states.items():
             if key not in st.session_state:
                 st.session_state[key] = value
     
-    def handle_note_submission(self, api_key: str, note_name: str, note_tags: list[str], note_content: str, quiz_structure: dict, model: str):
+    def handle_note_submission(self, api_key: str, note_name: str, note_tags: list[str], note_content: str, quiz_structure: dict, model: str, page_size: int = QuestionBank.DEFAULT_PAGE_SIZE, reuse_analysis: Optional[bool] = None):
+        """
+        reuse_analysis: what to do when a note with identical content was analyzed before.
+        None stops and stores that note in duplicate_of for the user to choose; True links the
+        new note to its summary and questions; False analyzes the content again.
+        """
         if st.session_state.note_submitted: reset_new_note_dialog(); return
 
+        duplicate_of = self.submit_note.find_existing_analysis(note_content) if reuse_analysis is not False else None
+        if duplicate_of and reuse_analysis is None:
+            st.session_state.duplicate_of = duplicate_of
+            st.session_state.processing_note = False
+            st.rerun()
+
+        st.session_state.duplicate_of = None
+        st.session_state.reuse_analysis = None
+
+        if duplicate_of:
+            with st.spinner("Linking to the existing analysis..."):
+                result_json, question_id_with_question, note_id = self.submit_note.link_note(
+                    note_name=note_name,
+                    note_tags=note_tags,
+                    note_content=note_content,
+                    analysis_note_id=duplicate_of[0]
+                )
+                st.session_state.summary = result_json.get("summary", "")
+                st.session_state.quiz = result_json.get("quiz", [])
+                st.session_state.question_id_with_question = question_id_with_question
+                st.session_state.note_id = note_id
+                st.session_state.question_bank_error = ""
+                st.session_state.question_bank_job = None
+                st.session_state.note_submitted = True
+                st.session_state.processing_note = False
+                st.rerun()
+
+        pages = QuestionBank.plan_pages(quiz_structure, page_size)
+
         with st.spinner("AI is analyzing your note..."):
 
-            _, result_json, question_id_with_question = self.submit_note.submit_note(
+            _, result_json, question_id_with_question, note_id = self.submit_note.submit_note(
                 api_key=api_key,
                 note_name=note_name,
                 note_tags=note_tags,
                 note_content=note_content,
-                quiz_structure=quiz_structure,
+                quiz_structure=pages[0],
                 model=model
             )
 
             st.session_state.summary = result_json.get("summary", "Error fetching summary")
             st.session_state.quiz = result_json.get("quiz", [])
             st.session_state.question_id_with_question = question_id_with_question
+            st.session_state.note_id = note_id
+            st.session_state.question_bank_error = ""
+            st.session_state.question_bank_job = None
+
+            if len(pages) > 1:
+                # Remaining pages are generated in the background; collect_question_pages stores them
+                def generate_page(page: dict, exclude_questions: list[str]) -> list[dict]:
+                    return self.submit_note.generate_question_page(
+                        api_key=api_key,
+                        note_content=note_content,
+                        quiz_structure=page,
+                        exclude_questions=exclude_questions,
+                        model=model
+                    )
+
+                st.session_state.question_bank_job = QuestionBankJob(
+                    pages[1:], generate_page, exclude_questions=list(question_id_with_question)
+                ).start()
+
             st.session_state.note_submitted = True
             st.session_state.processing_note = False
             st.rerun()
 
+    def collect_question_pages(self) -> bool:
+        """Store the question pages finished in the background; returns whether more are coming"""
+        job = st.session_state.get("question_bank_job")
+        if not job:
+            return False
+
+        # Check before taking pages so a page finished in between is not dropped
+        running = job.is_running()
+
+        # The background job only produces quiz pages; the script thread saves them through the shared repositories
+        for quiz in job.take_ready_pages():
+            question_id_with_question = self.submit_note.data_processor.process_quiz_questions(st.session_state.note_id, quiz)
+            st.session_state.quiz.extend(quiz)
+            st.session_state.question_id_with_question.update(question_id_with_question)
+
+        if running:
+            return True
+
+        if job.error:
+            st.session_state.question_bank_error = job.error
+        st.session_state.question_bank_job = None
+        return False
+
     def handle_quiz_grading(self, api_key: str, quiz: list[dict], model: str):
         if st.session_state.graded: reset_grading_dialog(); return
 
         with st.spinner("AI is grading your quiz..."):
             _, result_json = self.submit_quiz.submit_quiz(api_key=api_key, quiz=quiz, model=model)
-            for question in result_json.get("quiz"):
-                question_id = st.session_state.question_id_with_question.get(question.get("question"))
-                self.repositories["grading_repository"].insert_grading(
-                    question_id, 
-                    question.get("user_answer"), 
-                    question.get("real_answer") or question.get("answer"), 
-                    question.get("score"), 
-                    question.get("correction_and_explanation"), 
-                    question.get("additional_context")
-                )
+            # Upsert, so grading again after erasing the results replaces the stored grading
+            self.repositories["grading_repository"].upsert_gradings([
+                self._grading_row(question) for question in result_json.get("quiz")
+            ])
             st.session_state.grading_result = result_json.get("quiz")
             st.session_state.graded = True
             st.session_state.processing_quiz = False
@@ -109,30 +188,21 @@ class Controller:
         with st.spinner("AI is updating your grading..."):
             _, result_json = self.submit_quiz.submit_quiz(api_key=api_key, quiz=quiz, model=model)
 
-            for question in result_json.get("quiz"):
-                question_id = st.session_state.question_id_with_question[question.get("question")]
-                grading = self.repositories["grading_repository"].get_grading_by_question_id(question_id)
-                
-                if grading:
-                    self.repositories["grading_repository"].update_grading(
-                        grading[0], 
-                        question.get("user_answer"), 
-                        question.get("real_answer") or question.get("answer"), 
-                        question.get("score"), 
-                        question.get("correction_and_explanation"), 
-                        question.get("additional_context")
-                    )
-                else:
-                    self.repositories["grading_repository"].insert_grading(
-                        question_id, 
-                        question.get("user_answer"), 
-                        question.get("real_answer") or question.get("answer"), 
-                        question.get("score"), 
-                        question.get("correction_and_explanation"), 
-                        question.get("additional_context")
-                    )
+            self.repositories["grading_repository"].upsert_gradings([
+                self._grading_row(question) for question in result_json.get("quiz")
+            ])
 
             st.session_state.grading_result = result_json.get("quiz")
             st.session_state.review_graded = True
             st.session_state.processing_review_quiz = False
-            st.rerun()
\ No newline at end of file
+            st.rerun()
+
+    def _grading_row(self, question: dict) -> tuple:
+        return (
+            st.session_state.question_id_with_question.get(question.get("question")),
+            question.get("user_answer"),
+            question.get("real_answer") or question.get("answer"),
+            question.get("score"),
+            question.get("correction_and_explanation"),
+            question.get("additional_context")
+        )
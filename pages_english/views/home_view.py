@@ -47,10 +47,42 @@ class HomeView:
             - Review quiz results to improve your understanding
             """)
             
+            self._render_storage_stats()
+            
         except Exception as e:
             logging.error(f"Error rendering HomeView: {traceback.format_exc()}")
             st.error(f"Failed to render home page: {str(e)}")
 
+    def _render_storage_stats(self):
+        try:
+            stats = self.controller.repositories["note_repository"].get_storage_stats()
+            
+            st.markdown("### 💾 Storage")
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Notes", stats["notes"], help=f"{stats['bodies']} distinct note contents")
+            with col2:
+                st.metric("Note content stored", self._format_bytes(stats["stored_bytes"]),
+                          help=f"{self._format_bytes(stats['content_bytes'])} as submitted")
+            with col3:
+                st.metric("Saved by deduplication", self._format_bytes(stats["dedup_saved_bytes"] + stats["analysis_saved_bytes"]),
+                          help="Identical note contents stored once, and summaries and questions shared instead of copied")
+            with col4:
+                st.metric("Analyses reused", stats["linked_notes"], help="Notes linked to an existing analysis instead of a new Gemini call")
+            if stats["compression_saved_bytes"] > 0:
+                st.caption(f"Compression saves a further {self._format_bytes(stats['compression_saved_bytes'])}.")
+        except Exception as e:
+            logging.error(f"Error in _render_storage_stats: {traceback.format_exc()}")
+            st.error(f"Failed to load storage stats: {str(e)}")
+
+    @staticmethod
+    def _format_bytes(size: int) -> str:
+        for unit in ("B", "KB", "MB"):
+            if size < 1024:
+                return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} GB"
+
     def _render_home_tab(self):
         try:
             # This method is currently empty but kept for future use
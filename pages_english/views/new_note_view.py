@@ -86,6 +86,12 @@ class NewNoteView:
                     st.error("Error in model selection")
                     model = "gemini-2.5-pro"
 
+            try:
+                self.controller.collect_question_pages()
+            except Exception as e:
+                logging.error(f"Error collecting question pages: {traceback.format_exc()}")
+                st.error("Failed to save generated questions")
+
             tabs = st.tabs([
                 "New Note",
                 "Summary",
@@ -118,15 +124,17 @@ class NewNoteView:
                     key="note_tags"
                 )
                 note_content: str = st.text_area("Note Content", height=300)
-                st.markdown("###### Configure Your Quiz (Total 10 questions)", help="Configure the number of multiple choice, short answer, and long answer questions.")
+                st.markdown("###### Configure Your Question Bank", help="Configure the number of multiple choice, short answer, and long answer questions. Questions are generated page by page; the first page is shown while the rest are generated.")
 
-                c1, c2, c3 = st.columns(3)
+                c1, c2, c3, c4 = st.columns(4)
                 with c1: 
-                    st.number_input("Multiple Choice", min_value=0, max_value=10, value=0, step=1, key="multiple_choice_count", help="Number of multiple choice questions")
+                    st.number_input("Multiple Choice", min_value=0, value=0, step=1, key="multiple_choice_count", help="Number of multiple choice questions")
                 with c2: 
-                    st.number_input("Short Answer", min_value=0, max_value=10, value=0, step=1, key="short_answer_count", help="Number of short answer questions")
+                    st.number_input("Short Answer", min_value=0, value=0, step=1, key="short_answer_count", help="Number of short answer questions")
                 with c3: 
-                    st.number_input("Long Answer", min_value=0, max_value=10, value=0, step=1, key="long_answer_count", help="Number of long answer questions")
+                    st.number_input("Long Answer", min_value=0, value=0, step=1, key="long_answer_count", help="Number of long answer questions")
+                with c4: 
+                    page_size = st.number_input("Questions per page", min_value=1, max_value=20, value=10, step=1, key="question_page_size", help="Number of questions generated per request")
                 
                 quiz_structure: dict[str, int] = {
                     "multiple_choice": st.session_state.multiple_choice_count,
@@ -145,11 +153,11 @@ class NewNoteView:
                     if not note_content or not note_content.strip(): 
                         st.error("Please enter your note")
                         return
-                    if sum(quiz_structure.values()) != 10: 
-                        st.error("Total questions must equal 10")
+                    if sum(quiz_structure.values()) < 1: 
+                        st.error("Please add at least one question")
                         return
                     
-                    st.session_state.processing_note = True
+                    st.session_state.update(processing_note=True, duplicate_of=None, reuse_analysis=None)
                     st.rerun()
                 
                 if st.session_state.get("processing_note", False):
@@ -160,7 +168,9 @@ class NewNoteView:
                             note_tags=note_tags,
                             note_content=note_content,
                             quiz_structure=quiz_structure,
-                            model=model
+                            model=model,
+                            page_size=int(page_size),
+                            reuse_analysis=st.session_state.get("reuse_analysis")
                         )
                     except Exception as e:
                         logging.error(f"Error in note submission: {traceback.format_exc()}")
@@ -169,11 +179,39 @@ class NewNoteView:
 
                 if st.session_state.get("note_submitted", False) and not st.session_state.get("processing_note", False):
                     flexible_success("Analysis is complete! Please check the results in the Summary tab.", alignment="center")
+            
+            # Buttons cannot live inside the form
+            self._render_duplicate_prompt()
                     
         except Exception as e:
             logging.error(f"Error in _render_new_note_tab: {traceback.format_exc()}")
             st.error(f"Failed to render new note tab: {str(e)}")
 
+    def _render_duplicate_prompt(self):
+        """Offer to reuse the analysis of a note with identical content instead of calling Gemini again"""
+        try:
+            duplicate_of = st.session_state.get("duplicate_of")
+            if not duplicate_of or st.session_state.get("processing_note", False) or st.session_state.get("note_submitted", False):
+                return
+            
+            st.info(
+                f"This content was already analyzed in the note '{duplicate_of.note_name}' "
+                f"({duplicate_of.created_at.strftime('%Y-%m-%d %H:%M')}). "
+                "Link the new note to its summary and questions, or analyze it again?"
+            )
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Link to existing analysis", type="primary", use_container_width=True, key="reuse_analysis_link"):
+                    st.session_state.update(processing_note=True, reuse_analysis=True)
+                    st.rerun()
+            with col2:
+                if st.button("Analyze again", use_container_width=True, key="reuse_analysis_regenerate"):
+                    st.session_state.update(processing_note=True, reuse_analysis=False)
+                    st.rerun()
+        except Exception as e:
+            logging.error(f"Error in _render_duplicate_prompt: {traceback.format_exc()}")
+            st.error(f"Failed to render duplicate note prompt: {str(e)}")
+
     def _render_summary_tab(self):
         try:
             if not st.session_state.get("note_submitted", False): 
@@ -193,6 +231,8 @@ class NewNoteView:
             if not st.session_state.get("note_submitted", False): 
                 st.info("Please submit a note first.")
             else:
+                self._render_question_bank_progress()
+
                 quiz = st.session_state.get("quiz", [])
                 if not quiz:
                     st.warning("No quiz available")
@@ -257,6 +297,29 @@ class NewNoteView:
             logging.error(f"Error in _render_quiz_tab: {traceback.format_exc()}")
             st.error(f"Failed to render quiz tab: {str(e)}")
 
+    @st.fragment(run_every=2)
+    def _render_question_bank_progress(self):
+        try:
+            job = st.session_state.get("question_bank_job")
+            if not job:
+                if st.session_state.get("question_bank_error"):
+                    st.warning(f"Some questions could not be generated: {st.session_state.question_bank_error}")
+                return
+
+            question_count = len(st.session_state.get("quiz", []))
+            running = self.controller.collect_question_pages()
+            if not running or len(st.session_state.get("quiz", [])) != question_count:
+                # New questions arrived; rerun the whole page so the quiz form includes them
+                st.rerun()
+
+            st.progress(
+                (job.completed_pages + 1) / (job.total_pages + 1),
+                text=f"Generating more questions... ({job.completed_pages + 1}/{job.total_pages + 1} pages ready)"
+            )
+        except Exception as e:
+            logging.error(f"Error in _render_question_bank_progress: {traceback.format_exc()}")
+            st.error(f"Failed to load more questions: {str(e)}")
+
     def _render_grading_tab(self):
         try:
             if not st.session_state.get("graded", False): 
@@ -36,8 +36,9 @@ class NoteDetailView:
             note_name = st.session_state.selected_note_name
             
             try:
-                note_details = self.controller.repositories["note_repository"].get_note(note_id)
-                if not note_details:
+                # Note, tags, summary, questions with options and gradings, in one call
+                note_aggregate = self.controller.repositories["note_aggregate_repository"].get_note_aggregate(note_id)
+                if not note_aggregate:
                     st.error("Note not found.")
                     return
             except Exception as e:
@@ -45,19 +46,11 @@ class NoteDetailView:
                 st.error("Failed to retrieve note details.")
                 return
             
-            note_id, note_name, note_content, created_at = note_details
+            note = note_aggregate["note"]
+            note_id, note_name, note_content = note.note_id, note.note_name, note.note_content
+            questions = note_aggregate["questions"]
             
-            try:
-                if isinstance(created_at, str):
-                    try:
-                        created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    except:
-                        created_at = datetime.now()
-            except Exception as e:
-                logging.error(f"Error parsing date: {traceback.format_exc()}")
-                created_at = datetime.now()
-            
-            formatted_date = created_at.strftime("%Y-%m-%d %H:%M")
+            formatted_date = note.created_at.strftime("%Y-%m-%d %H:%M")
             
             col1, col2, col3 = st.columns([1, 3, 1])
             with col1:
@@ -68,6 +61,8 @@ class NoteDetailView:
             with col2:
                 st.title(f"📖 {note_name}")
                 st.caption(f"Created: {formatted_date}")
+                if note_aggregate.get("analysis_note_id"):
+                    st.caption("Summary, questions and gradings are shared with an earlier note with identical content.")
             
             with col3:
                 if st.button("🗑️ Delete", key="delete_note_detail", type="secondary"):
@@ -85,14 +80,7 @@ class NoteDetailView:
                         st.warning("Click delete again to confirm deletion")
                         st.rerun()
 
-            try:
-                questions = self.controller.repositories["question_repository"].get_all_questions(note_id)
-            except Exception as e:
-                logging.error(f"Error retrieving questions: {traceback.format_exc()}")
-                st.error("Failed to retrieve questions.")
-                questions = []
-            
-            has_quiz_results = self._check_quiz_results(note_id, questions)
+            has_quiz_results = any(question["grading"] for question in questions)
             
             tab_labels = ["Note", "Summary", "Review Quiz"]
             if has_quiz_results:
@@ -101,55 +89,33 @@ class NoteDetailView:
             tabs = st.tabs(tab_labels, width="stretch")
 
             with tabs[0]: 
-                self._render_note_content_tab(note_content, note_id)
+                self._render_note_content_tab(note_content, note_aggregate["hashtags"])
             
             with tabs[1]: 
-                self._render_summary_tab(note_id)
+                self._render_summary_tab(note_aggregate["summary"])
 
             if has_quiz_results:
                 with tabs[2]: 
-                    self._render_quiz_result_tab(note_id)
+                    self._render_quiz_result_tab(questions)
                 with tabs[3]: 
-                    self._render_review_quiz_tab(note_id)
+                    self._render_review_quiz_tab(note_id, questions)
             else:
                 with tabs[2]: 
-                    self._render_review_quiz_tab(note_id)
+                    self._render_review_quiz_tab(note_id, questions)
                     
         except Exception as e:
             logging.error(f"Error rendering NoteDetailView: {traceback.format_exc()}")
             st.error(f"Failed to render note detail view: {str(e)}")
 
-    def _check_quiz_results(self, note_id: int, questions: list) -> bool:
-        try:
-            if not questions:
-                return False
-            
-            question_ids = [q[0] for q in questions]
-            try:
-                gradings = self.controller.repositories["grading_repository"].get_all_gradings(question_ids)
-                return len(gradings) > 0
-            except Exception as e:
-                logging.error(f"Error checking quiz results: {traceback.format_exc()}")
-                return False
-        except Exception as e:
-            logging.error(f"Error in _check_quiz_results: {traceback.format_exc()}")
-            return False
-
-    def _render_note_content_tab(self, note_content: str, note_id: int):
+    def _render_note_content_tab(self, note_content: str, hashtags: list[str]):
         try:
             st.markdown("### Note")
 
-            # Get hashtags with error handling
-            try:
-                hashtags = self.controller.repositories["note_hashtag_repository"].get_hashtags_by_note_id(note_id)
-                if hashtags:
-                    hashtags_str = " ".join([f"`#{tag}`" for tag in hashtags])
-                    st.markdown(f"{hashtags_str}")
-                else:
-                    st.info("No tags found for this note.")
-            except Exception as e:
-                logging.error(f"Error retrieving hashtags: {traceback.format_exc()}")
-                st.warning("Failed to load tags.")
+            if hashtags:
+                hashtags_str = " ".join([f"`#{tag}`" for tag in hashtags])
+                st.markdown(f"{hashtags_str}")
+            else:
+                st.info("No tags found for this note.")
 
             st.text_area(
                 "Content", 
@@ -162,41 +128,29 @@ class NoteDetailView:
             logging.error(f"Error in _render_note_content_tab: {traceback.format_exc()}")
             st.error(f"Failed to render note content tab: {str(e)}")
 
-    def _render_summary_tab(self, note_id: int):
+    def _render_summary_tab(self, summary: str):
         try:
             st.markdown("### Summary")
-            summary: list[tuple[int, int, str, datetime]] = self.controller.repositories["summary_repository"].get_summary_by_note_id(note_id)
-            st.markdown(summary[0][2])
+            if summary:
+                st.markdown(summary)
+            else:
+                st.warning("Summary not available")
         except Exception as e:
             logging.error(f"Error in _render_summary_tab: {traceback.format_exc()}")
             st.error(f"Failed to render summary tab: {str(e)}")
 
-    def _render_quiz_result_tab(self, note_id: int):
+    def _render_quiz_result_tab(self, questions: list[dict]):
         try:
-            # Get questions with error handling
-            try:
-                questions = self.controller.repositories["question_repository"].get_all_questions(note_id)
-                if not questions:
-                    st.info("No questions found for this note.")
-                    return
-            except Exception as e:
-                logging.error(f"Error retrieving questions: {traceback.format_exc()}")
-                st.error("Failed to retrieve questions.")
+            if not questions:
+                st.info("No questions found for this note.")
                 return
             
             st.markdown("### Quiz Result")
 
-            question_ids = [q[0] for q in questions]
-            
-            # Get gradings with error handling
-            try:
-                gradings = self.controller.repositories["grading_repository"].get_all_gradings(question_ids)
-                if not gradings:
-                    st.info("No quiz results found.")
-                    return
-            except Exception as e:
-                logging.error(f"Error retrieving gradings: {traceback.format_exc()}")
-                st.error("Failed to retrieve quiz results.")
+            graded_questions = [question for question in questions if question["grading"]]
+            gradings = [question["grading"] for question in graded_questions]
+            if not gradings:
+                st.info("No quiz results found.")
                 return
             
             total_correct = 0
@@ -205,9 +159,9 @@ class NoteDetailView:
 
             for grading in gradings:
                 try:
-                    if grading[4] == "Correct":
+                    if grading.score == "Correct":
                         total_correct += 1
-                    elif grading[4] == "Partially Correct":
+                    elif grading.score == "Partially Correct":
                         total_partially_correct += 1
                     else:
                         total_incorrect += 1
@@ -222,32 +176,22 @@ class NoteDetailView:
             cols[2].metric("Incorrect", f"{total_incorrect}")
             st.divider()
 
-            for i, result in enumerate(gradings):
+            for i, question in enumerate(graded_questions):
                 try:
-                    # Get question details with error handling
-                    try:
-                        question = self.controller.repositories["question_repository"].get_question_by_id(result[1])
-                        if not question:
-                            st.warning(f"Question {i+1}: Question not found")
-                            continue
-                    except Exception as e:
-                        logging.error(f"Error retrieving question {result[1]}: {traceback.format_exc()}")
-                        st.warning(f"Question {i+1}: Failed to load question")
-                        continue
-                    
-                    with st.expander(f"Question {i+1}: {question[2]}", expanded=True):
-                        score = result[4]
+                    result = question["grading"]
+                    with st.expander(f"Question {i+1}: {question['question']}", expanded=True):
+                        score = result.score
                         score_color = SCORE_COLORS.get(score, 'gray')
                         st.markdown(f"**Score: <span style='color: {score_color};'>{score}</span>**", unsafe_allow_html=True)
 
                         st.markdown(f"**Your Answer**")
-                        st.info(result[2])
+                        st.info(result.user_answer)
                         st.markdown(f"**Correct Answer**")
-                        st.info(result[3])
+                        st.info(result.real_answer)
                         st.markdown(f"**Correction and Explanation**")
-                        st.info(result[5])
+                        st.info(result.correction_and_explanation)
                         st.markdown(f"**Additional Context**")
-                        st.info(result[6])
+                        st.info(result.additional_context)
                 except Exception as e:
                     logging.error(f"Error rendering result {i}: {traceback.format_exc()}")
                     st.error(f"Error displaying result for question {i+1}")
@@ -256,17 +200,10 @@ class NoteDetailView:
             logging.error(f"Error in _render_quiz_result_tab: {traceback.format_exc()}")
             st.error(f"Failed to render quiz result tab: {str(e)}")
 
-    def _render_review_quiz_tab(self, note_id: int):
+    def _render_review_quiz_tab(self, note_id: int, questions: list[dict]):
         try:
-            # Get questions with error handling
-            try:
-                questions = self.controller.repositories["question_repository"].get_all_questions(note_id)
-                if not questions:
-                    st.info("No questions found for this note.")
-                    return
-            except Exception as e:
-                logging.error(f"Error retrieving questions: {traceback.format_exc()}")
-                st.error("Failed to retrieve questions.")
+            if not questions:
+                st.info("No questions found for this note.")
                 return
             
             if 'selected_api_key_option_detail' not in st.session_state:
@@ -320,24 +257,18 @@ class NoteDetailView:
                 
                 for i, question in enumerate(questions):
                     try:
-                        st.markdown(f"**Question {i+1}: {question[2]}**")
+                        st.markdown(f"**Question {i+1}: {question['question']}**")
                         
-                        if question[3] == "multiple_choice":
-                            try:
-                                options = self.controller.repositories["option_repository"].get_options_by_question_id(question[0])
-                                if options:
-                                    option_texts = [option[2] for option in options]
-                                    user_answers[f"q_{i}"] = st.radio(
-                                        "Select your answer:",
-                                        options=option_texts,
-                                        key=f"quiz_q_{note_id}_{i}",
-                                        label_visibility="collapsed"
-                                    )
-                                else:
-                                    st.warning("No options available for multiple choice question")
-                            except Exception as e:
-                                logging.error(f"Error retrieving options for question {i}: {traceback.format_exc()}")
-                                st.warning("Failed to load options for multiple choice question")
+                        if question["question_type"] == "multiple_choice":
+                            if question["options"]:
+                                user_answers[f"q_{i}"] = st.radio(
+                                    "Select your answer:",
+                                    options=question["options"],
+                                    key=f"quiz_q_{note_id}_{i}",
+                                    label_visibility="collapsed"
+                                )
+                            else:
+                                st.warning("No options available for multiple choice question")
                         else:
                             user_answers[f"q_{i}"] = st.text_area(
                                 "Your answer:",
@@ -362,19 +293,14 @@ class NoteDetailView:
                     for i, question in enumerate(questions):
                         try:
                             quiz_item = {
-                                'question': question[2],
-                                'question_type': question[3],
-                                'answer': question[4],
+                                'question': question["question"],
+                                'question_type': question["question_type"],
+                                'answer': question["preview_answer"],
                                 'user_answer': user_answers.get(f"q_{i}", "")
                             }
                             
-                            if question[3] == "multiple_choice":
-                                try:
-                                    options = self.controller.repositories["option_repository"].get_options_by_question_id(question[0])
-                                    if options:
-                                        quiz_item['options'] = [option[2] for option in options]
-                                except Exception as e:
-                                    logging.error(f"Error retrieving options for grading: {traceback.format_exc()}")
+                            if question["question_type"] == "multiple_choice" and question["options"]:
+                                quiz_item['options'] = question["options"]
                             
                             quiz_for_grading.append(quiz_item)
                         except Exception as e:
@@ -388,8 +314,7 @@ class NoteDetailView:
                 try:
                     quiz_for_grading = st.session_state.get("quiz_for_grading_review_quiz", [])
                     
-                    questions = self.controller.repositories["question_repository"].get_all_questions(note_id)
-                    question_id_with_question = {question[2]: question[0] for question in questions}
+                    question_id_with_question = {question["question"]: question["question_id"] for question in questions}
                     
                     original_mapping = st.session_state.get("question_id_with_question", {})
                     st.session_state.question_id_with_question = question_id_with_question
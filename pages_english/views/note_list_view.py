@@ -3,6 +3,8 @@ import streamlit as st
 from datetime import datetime
 from st_flexible_callout_elements import flexible_success
 from pages_english.controller import Controller
+from repositories.note_repository import NoteRepository
+from repositories.rows import NoteRow
 import logging
 import traceback
 
@@ -12,6 +14,18 @@ SCORE_COLORS = {
     "Partially Correct": "yellow"
 }
 
+PAGE_SIZE_OPTIONS = [10, 20, 50, 100]
+FULL_TEXT_RESULT_LIMIT = 20
+TITLE_SUGGESTION_LIMIT = 10
+HASHTAG_SUGGESTION_LIMIT = 10
+TAG_CLOUD_SIZE = 30
+SEARCH_SOURCE_LABELS = {
+    "note": "Note",
+    "summary": "Summary",
+    "question": "Question",
+    "grading": "Feedback"
+}
+
 class NoteListView:
     def __init__(self, controller: Controller, language: str):
         try:
@@ -33,163 +47,223 @@ class NoteListView:
             
             # Search section
             st.markdown("### Search Notes")
+            full_text_search = st.text_input(
+                "Full-text search",
+                placeholder="Search names, notes, summaries, questions and feedback...",
+                key="full_text_search"
+            )
+            if full_text_search.strip():
+                self._render_full_text_results(full_text_search)
+                return
+
+            self._render_tag_cloud()
+
             col2, col3 = st.columns([2, 2])
             
             with col2:
-                try:
-                    autocomplete_options = self.controller.repositories["note_repository"].get_all_note_names()
+                title_query = st.text_input(
+                    "Title Search",
+                    placeholder="Enter title to search...",
+                    key="title_query"
+                )
+                title_content_search = title_query.strip()
+                if title_content_search:
+                    try:
+                        # Only the closest names are fetched, tolerating typos in the query
+                        suggestions = self.controller.repositories["note_repository"].suggest_note_names(
+                            title_content_search, limit=TITLE_SUGGESTION_LIMIT
+                        )
+                    except Exception as e:
+                        logging.error(f"Error loading note name suggestions: {traceback.format_exc()}")
+                        st.error("Failed to load note name suggestions")
+                        suggestions = []
                     
-                    title_content_search = st.selectbox(
-                        "Title Search", 
-                        options=[""] + autocomplete_options,
-                        placeholder="Enter title to search...", 
-                        key="title_content_search"
-                    )
-                except Exception as e:
-                    logging.error(f"Error loading note names for autocomplete: {traceback.format_exc()}")
-                    st.error("Failed to load note names for search")
-                    title_content_search = ""
+                    if suggestions:
+                        selected_title = st.selectbox(
+                            "Did you mean",
+                            options=[""] + suggestions,
+                            key="title_suggestion"
+                        )
+                        # A picked suggestion replaces the typed prefix
+                        title_content_search = selected_title or title_content_search
 
             with col3:
-                try:
-                    hashtag_options = self.controller.repositories["note_hashtag_repository"].get_all_hashtags()
-                    hashtag_search = st.selectbox(
-                        "Hashtag Search", 
-                        options=[""] + hashtag_options,
-                        placeholder="Enter hashtag to search...", 
-                        key="hashtag_search"
-                    )
-                except Exception as e:
-                    logging.error(f"Error loading hashtags for autocomplete: {traceback.format_exc()}")
-                    st.error("Failed to load hashtags for search")
-                    hashtag_search = ""
+                hashtag_query = st.text_input(
+                    "Hashtag Search",
+                    placeholder="Enter hashtag to search...",
+                    key="hashtag_query"
+                )
+                hashtag_search = hashtag_query.strip()
+                if hashtag_search:
+                    try:
+                        # Prefix lookup in the process-wide hashtag index
+                        hashtag_suggestions = self.controller.repositories["note_hashtag_repository"].suggest_hashtags(
+                            hashtag_search, limit=HASHTAG_SUGGESTION_LIMIT
+                        )
+                    except Exception as e:
+                        logging.error(f"Error loading hashtag suggestions: {traceback.format_exc()}")
+                        st.error("Failed to load hashtag suggestions")
+                        hashtag_suggestions = []
+                    
+                    if hashtag_suggestions:
+                        selected_hashtag = st.selectbox(
+                            "Matching hashtags",
+                            options=hashtag_suggestions,
+                            key="hashtag_suggestion"
+                        )
+                        hashtag_search = selected_hashtag or hashtag_search
 
             if st.button("🔍", key="search_button", help="Search notes", use_container_width=True):
                 st.rerun()
 
-            # Get all notes with error handling
+            sort_col, page_size_col = st.columns([3, 1])
+            with sort_col:
+                sort_option = st.selectbox(
+                    "Sort by",
+                    ["Newest First", "Oldest First"],
+                    key="note_sort_option"
+                )
+            with page_size_col:
+                page_size = st.selectbox(
+                    "Notes per page",
+                    PAGE_SIZE_OPTIONS,
+                    index=PAGE_SIZE_OPTIONS.index(NoteRepository.DEFAULT_PAGE_SIZE),
+                    key="note_page_size"
+                )
+
+            # Pages already loaded with "Load more" are kept as keyset cursors; a new search starts over
+            query = (title_content_search, hashtag_search, sort_option, page_size)
+            if st.session_state.get("note_list_query") != query:
+                st.session_state.note_list_query = query
+                st.session_state.note_list_cursors = [None]
+
+            # Filtering, sorting and paging run in SQL; each page is an index seek from its cursor
+            filtered_notes, next_cursor = [], None
             try:
-                all_notes = self.controller.repositories["note_repository"].get_all_notes()
+                for cursor in st.session_state.note_list_cursors:
+                    notes, next_cursor = self.controller.repositories["note_repository"].get_notes_page(
+                        page_size=page_size,
+                        after=cursor,
+                        title=title_content_search or None,
+                        hashtag=hashtag_search or None,
+                        order="newest" if sort_option == "Newest First" else "oldest"
+                    )
+                    filtered_notes.extend(notes)
+                    if next_cursor is None:
+                        break
             except Exception as e:
                 logging.error(f"Error retrieving notes: {traceback.format_exc()}")
                 st.error("Failed to retrieve notes")
-                all_notes = []
-            
-            if not all_notes:
-                st.info("No notes found. Create your first note in the 'New Note' tab!")
-                return
-            
-            st.markdown(f"### Your Notes ({len(all_notes)} found)")
-            
-            # Sort options
-            sort_option = st.selectbox(
-                "Sort by",
-                ["Newest First", "Oldest First"],
-                key="note_sort_option"
-            )
-
-            # Filter notes based on search criteria
-            try:
-                filtered_notes = self._filter_notes(all_notes, hashtag_search, title_content_search)
-            except Exception as e:
-                logging.error(f"Error filtering notes: {traceback.format_exc()}")
-                st.error("Failed to filter notes")
-                filtered_notes = all_notes
             
             if not filtered_notes:
-                st.warning("No notes found matching your search criteria.")
+                if title_content_search or hashtag_search:
+                    st.warning("No notes found matching your search criteria.")
+                else:
+                    st.info("No notes found. Create your first note in the 'New Note' tab!")
                 return
             
-            # Sort notes based on selection
-            try:
-                if sort_option == "Newest First":
-                    filtered_notes = sorted(filtered_notes, key=lambda x: x[2], reverse=True)
-                else:
-                    filtered_notes = sorted(filtered_notes, key=lambda x: x[2])
-            except Exception as e:
-                logging.error(f"Error sorting notes: {traceback.format_exc()}")
-                st.warning("Failed to sort notes")
+            st.markdown(f"### Your Notes ({len(filtered_notes)} shown)")
                     
-            for note_id, note_name, created_at in filtered_notes:
-                try:
-                    # Format the date with error handling
-                    try:
-                        if isinstance(created_at, str):
-                            try:
-                                created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                            except:
-                                created_at = datetime.now()
-                    except Exception as e:
-                        logging.error(f"Error parsing date for note {note_id}: {traceback.format_exc()}")
-                        created_at = datetime.now()
-                    
-                    formatted_date = created_at.strftime("%Y-%m-%d %H:%M")
-                    
-                    with st.container():
-                        col1, col2, col3 = st.columns([3, 1, 0.5])
-                        
-                        with col1:
-                            if st.button(f"{note_name}", key=f"note_{note_id}", use_container_width=True):
-                                # Navigate to note detail view
-                                st.session_state.current_view = "note_detail"
-                                st.session_state.selected_note_id = note_id
-                                st.session_state.selected_note_name = note_name
-                                st.rerun()
-                        
-                        with col2:
-                            st.write(f"📅 {formatted_date}")
-                        
-                        with col3:
-                            if st.button("🗑️", key=f"delete_{note_id}", help="Delete note"):
-                                if st.session_state.get(f"confirm_delete_{note_id}", False):
-                                    # Delete the note with error handling
-                                    try:
-                                        self.controller.repositories["note_repository"].delete_note(note_id)
-                                        st.success(f"Note '{note_name}' deleted successfully!")
-                                        st.rerun()
-                                    except Exception as e:
-                                        logging.error(f"Error deleting note {note_id}: {traceback.format_exc()}")
-                                        st.error(f"Failed to delete note '{note_name}'")
-                                else:
-                                    st.session_state[f"confirm_delete_{note_id}"] = True
-                                    st.warning(f"Click delete again to confirm deletion of '{note_name}'")
-                                    st.rerun()
-                except Exception as e:
-                    logging.error(f"Error rendering note {note_id}: {traceback.format_exc()}")
-                    st.error(f"Error displaying note {note_id}")
-                    continue
+            for note in filtered_notes:
+                self._render_note_row(note)
+
+            if next_cursor is not None:
+                if st.button("Load more", key="load_more_notes", use_container_width=True):
+                    st.session_state.note_list_cursors.append(next_cursor)
+                    st.rerun()
                     
         except Exception as e:
             logging.error(f"Error rendering NoteListView: {traceback.format_exc()}")
             st.error(f"Failed to render note list view: {str(e)}")
 
-    def _filter_notes(self, all_notes, hashtag_search, title_content_search):
-        """Filter notes based on hashtag and title/content search criteria"""
+    def _render_tag_cloud(self):
         try:
-            filtered_notes = []
-            
-            for note_id, note_name, created_at in all_notes:
-                try:
-                    hashtag_match = True
-                    if hashtag_search:
-                        try:
-                            hashtags = self.controller.repositories["note_hashtag_repository"].get_hashtags_by_note_id(note_id)
-                            hashtag_match = any(hashtag_search.lower() in hashtag.lower() for hashtag in hashtags)
-                        except Exception as e:
-                            logging.error(f"Error retrieving hashtags for note {note_id}: {traceback.format_exc()}")
-                            hashtag_match = False
-                    
-                    title_content_match = True
-                    if title_content_search:
-                        title_content_match = title_content_search.lower() in note_name.lower()
-                    
-                    if hashtag_match and title_content_match:
-                        filtered_notes.append((note_id, note_name, created_at))
-                except Exception as e:
-                    logging.error(f"Error filtering note {note_id}: {traceback.format_exc()}")
-                    continue
+            live_hashtags = self.controller.repositories["note_hashtag_repository"].get_live_hashtags(limit=TAG_CLOUD_SIZE)
+        except Exception as e:
+            logging.error(f"Error loading tag cloud: {traceback.format_exc()}")
+            st.error("Failed to load popular hashtags")
+            return
+
+        if not live_hashtags:
+            return
+
+        usage_counts = dict(live_hashtags)
+
+        def filter_by_tag():
+            # Runs before the next render, so the hashtag input can still be set
+            selected_tag = st.session_state.get("tag_cloud")
+            if selected_tag:
+                st.session_state.hashtag_query = selected_tag
+            st.session_state.tag_cloud = None
+
+        st.pills(
+            "Popular hashtags",
+            options=list(usage_counts),
+            format_func=lambda tag: f"#{tag} · {usage_counts[tag]}",
+            key="tag_cloud",
+            on_change=filter_by_tag
+        )
+
+    def _render_full_text_results(self, text: str):
+        try:
+            results = self.controller.repositories["note_search_repository"].search(text, limit=FULL_TEXT_RESULT_LIMIT)
+        except Exception as e:
+            logging.error(f"Error running full-text search: {traceback.format_exc()}")
+            st.error("Failed to search notes")
+            return
+
+        if not results:
+            st.warning("No notes found matching your search criteria.")
+            return
+
+        st.markdown(f"### Best Matches ({len(results)})")
+        for result in results:
+            try:
+                if st.button(result["note_name"], key=f"search_note_{result['note_id']}", use_container_width=True):
+                    st.session_state.current_view = "note_detail"
+                    st.session_state.selected_note_id = result["note_id"]
+                    st.session_state.selected_note_name = result["note_name"]
+                    st.rerun()
+                st.caption(f"{SEARCH_SOURCE_LABELS[result['source']]}: {result['snippet']}")
+            except Exception as e:
+                logging.error(f"Error rendering search result {result.get('note_id')}: {traceback.format_exc()}")
+                st.error(f"Error displaying note {result.get('note_id')}")
+
+    def _render_note_row(self, note: NoteRow):
+        try:
+            note_id, note_name = note.note_id, note.note_name
+            # created_at arrives as a datetime, decoded once by the connection's TIMESTAMP converter
+            formatted_date = note.created_at.strftime("%Y-%m-%d %H:%M")
             
-            return filtered_notes
+            with st.container():
+                col1, col2, col3 = st.columns([3, 1, 0.5])
+                
+                with col1:
+                    if st.button(f"{note_name}", key=f"note_{note_id}", use_container_width=True):
+                        # Navigate to note detail view
+                        st.session_state.current_view = "note_detail"
+                        st.session_state.selected_note_id = note_id
+                        st.session_state.selected_note_name = note_name
+                        st.rerun()
+                
+                with col2:
+                    st.write(f"📅 {formatted_date}")
+                
+                with col3:
+                    if st.button("🗑️", key=f"delete_{note_id}", help="Delete note"):
+                        if st.session_state.get(f"confirm_delete_{note_id}", False):
+                            # Delete the note with error handling
+                            try:
+                                self.controller.repositories["note_repository"].delete_note(note_id)
+                                st.success(f"Note '{note_name}' deleted successfully!")
+                                st.rerun()
+                            except Exception as e:
+                                logging.error(f"Error deleting note {note_id}: {traceback.format_exc()}")
+                                st.error(f"Failed to delete note '{note_name}'")
+                        else:
+                            st.session_state[f"confirm_delete_{note_id}"] = True
+                            st.warning(f"Click delete again to confirm deletion of '{note_name}'")
+                            st.rerun()
         except Exception as e:
-            logging.error(f"Error in _filter_notes: {traceback.format_exc()}")
-            return all_notes  # Return all notes if filtering fails
\ No newline at end of file
+            logging.error(f"Error rendering note {note_id}: {traceback.format_exc()}")
+            st.error(f"Error displaying note {note_id}")
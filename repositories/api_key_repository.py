@@ -2,6 +2,7 @@ from datetime import datetime
 import sqlite3
 import logging
 import traceback
+from repositories.rows import ApiKeyRow
 
 class ApiKeyRepository:
     def __init__(self, conn: sqlite3.Connection):
@@ -12,10 +13,10 @@ class ApiKeyRepository:
             logging.error(f"Failed to initialize ApiKeyRepository: {traceback.format_exc()}")
             raise Exception(f"Failed to initialize ApiKeyRepository: {str(e)}")
 
-    def get_all_api_keys(self) -> list[tuple[int, str, datetime]]:
+    def get_all_api_keys(self) -> list[ApiKeyRow]:
         try:
             self.cursor.execute("SELECT api_key_id, api_key, last_used_at FROM api_key ORDER BY last_used_at DESC")
-            return self.cursor.fetchall()
+            return [ApiKeyRow._make(row) for row in self.cursor]
         except sqlite3.Error as e:
             logging.error(f"Database error in get_all_api_keys: {traceback.format_exc()}")
             raise Exception(f"Failed to retrieve API keys: {str(e)}")
@@ -0,0 +1,168 @@
+import functools
+import sqlite3
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from repositories.api_key_repository import ApiKeyRepository
+from repositories.db_executor import DBExecutor
+from repositories.grading_repository import GradingRepository
+from repositories.note_hashtag_repository import NoteHashtagRepository
+from repositories.note_repository import NoteRepository
+from repositories.option_repository import OptionRepository
+from repositories.prefix_index import PrefixIndex
+from repositories.question_repository import QuestionRepository
+from repositories.summary_repository import SummaryRepository
+
+
+def on_executor(method: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Async counterpart of a repository method: the same call, with the same validation and errors, run on the DBExecutor"""
+    @functools.wraps(method)
+    async def call(self: "AsyncRepository", *args: Any, **kwargs: Any) -> Any:
+        return await self.executor.run(method, self.repository, *args, **kwargs)
+    return call
+
+
+class AsyncRepository:
+    """
+    Base of the async repositories. Each wraps the synchronous repository of the same
+    name and awaits its methods on a DBExecutor, so the SQL, validation, row types and
+    errors are those of the synchronous class.
+    """
+
+    REPOSITORY: type = None
+
+    def __init__(self, conn: sqlite3.Connection, executor: DBExecutor, **kwargs: Any):
+        """kwargs: passed to the synchronous repository, e.g. its shared prefix index"""
+        self.executor = executor
+        self.repository = self.REPOSITORY(conn, **kwargs)
+
+
+class AsyncNoteRepository(AsyncRepository):
+    REPOSITORY = NoteRepository
+
+    def __init__(self, conn: sqlite3.Connection, executor: DBExecutor, name_index: Optional[PrefixIndex] = None):
+        super().__init__(conn, executor, name_index=name_index)
+
+    hash_content = staticmethod(NoteRepository.hash_content)
+
+    get_all_notes = on_executor(NoteRepository.get_all_notes)
+    get_all_note_names = on_executor(NoteRepository.get_all_note_names)
+    get_all_note_content = on_executor(NoteRepository.get_all_note_content)
+    search_note_names = on_executor(NoteRepository.search_note_names)
+    suggest_note_names = on_executor(NoteRepository.suggest_note_names)
+    search_note_content = on_executor(NoteRepository.search_note_content)
+    search_notes = on_executor(NoteRepository.search_notes)
+    get_notes_page = on_executor(NoteRepository.get_notes_page)
+    get_note = on_executor(NoteRepository.get_note)
+    find_analyzed_duplicate = on_executor(NoteRepository.find_analyzed_duplicate)
+    insert_note = on_executor(NoteRepository.insert_note)
+    delete_note = on_executor(NoteRepository.delete_note)
+    get_storage_stats = on_executor(NoteRepository.get_storage_stats)
+
+    async def iter_note_content(self, batch_size: int = NoteRepository.CONTENT_BATCH_SIZE) -> AsyncIterator[tuple[int, str]]:
+        """NoteRepository.iter_note_content, with one trip to the DB thread per batch"""
+        items = self.repository.iter_note_content(batch_size)
+
+        def next_batch() -> list[tuple[int, str]]:
+            # Advancing the generator runs its validation, as in the synchronous walk
+            batch = []
+            for item in items:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    break
+            return batch
+
+        while True:
+            batch = await self.executor.run(next_batch)
+            if not batch:
+                return
+            for item in batch:
+                yield item
+
+
+class AsyncNoteHashtagRepository(AsyncRepository):
+    REPOSITORY = NoteHashtagRepository
+
+    def __init__(self, conn: sqlite3.Connection, executor: DBExecutor, hashtag_index: Optional[PrefixIndex] = None):
+        super().__init__(conn, executor, hashtag_index=hashtag_index)
+
+    insert_note_hashtags = on_executor(NoteHashtagRepository.insert_note_hashtags)
+    insert_hashtags = on_executor(NoteHashtagRepository.insert_hashtags)
+    get_hashtags_by_note_id = on_executor(NoteHashtagRepository.get_hashtags_by_note_id)
+    get_all_hashtags = on_executor(NoteHashtagRepository.get_all_hashtags)
+    get_live_hashtags = on_executor(NoteHashtagRepository.get_live_hashtags)
+    search_hashtags = on_executor(NoteHashtagRepository.search_hashtags)
+    suggest_hashtags = on_executor(NoteHashtagRepository.suggest_hashtags)
+    delete_hashtag_from_note = on_executor(NoteHashtagRepository.delete_hashtag_from_note)
+
+
+class AsyncQuestionRepository(AsyncRepository):
+    REPOSITORY = QuestionRepository
+
+    get_all_questions = on_executor(QuestionRepository.get_all_questions)
+    get_question_by_id = on_executor(QuestionRepository.get_question_by_id)
+    insert_question = on_executor(QuestionRepository.insert_question)
+    insert_questions = on_executor(QuestionRepository.insert_questions)
+
+
+class AsyncOptionRepository(AsyncRepository):
+    REPOSITORY = OptionRepository
+
+    get_all_options = on_executor(OptionRepository.get_all_options)
+    get_options_by_question_id = on_executor(OptionRepository.get_options_by_question_id)
+    insert_options = on_executor(OptionRepository.insert_options)
+    insert_options_for_questions = on_executor(OptionRepository.insert_options_for_questions)
+
+
+class AsyncSummaryRepository(AsyncRepository):
+    REPOSITORY = SummaryRepository
+
+    get_summary_by_id = on_executor(SummaryRepository.get_summary_by_id)
+    get_summary_by_note_id = on_executor(SummaryRepository.get_summary_by_note_id)
+    insert_summary = on_executor(SummaryRepository.insert_summary)
+
+
+class AsyncGradingRepository(AsyncRepository):
+    REPOSITORY = GradingRepository
+
+    get_all_gradings = on_executor(GradingRepository.get_all_gradings)
+    get_grading_by_question_id = on_executor(GradingRepository.get_grading_by_question_id)
+    insert_grading = on_executor(GradingRepository.insert_grading)
+    upsert_gradings = on_executor(GradingRepository.upsert_gradings)
+    update_grading = on_executor(GradingRepository.update_grading)
+
+
+class AsyncApiKeyRepository(AsyncRepository):
+    REPOSITORY = ApiKeyRepository
+
+    get_all_api_keys = on_executor(ApiKeyRepository.get_all_api_keys)
+    insert_api_key = on_executor(ApiKeyRepository.insert_api_key)
+    update_api_key = on_executor(ApiKeyRepository.update_api_key)
+    delete_api_key = on_executor(ApiKeyRepository.delete_api_key)
+
+
+ASYNC_REPOSITORY_CLASSES = {
+    "api_key_repository": AsyncApiKeyRepository,
+    "note_repository": AsyncNoteRepository,
+    "note_hashtag_repository": AsyncNoteHashtagRepository,
+    "question_repository": AsyncQuestionRepository,
+    "option_repository": AsyncOptionRepository,
+    "grading_repository": AsyncGradingRepository,
+    "summary_repository": AsyncSummaryRepository,
+}
+
+
+def create_async_repositories(conn: sqlite3.Connection, executor: DBExecutor,
+                              note_name_index: Optional[PrefixIndex] = None,
+                              hashtag_index: Optional[PrefixIndex] = None) -> dict[str, AsyncRepository]:
+    """
+    Async repositories under the keys the app uses for the synchronous ones. Pass the app's
+    prefix indexes so writes made from async code show up in its suggestions.
+    """
+    repository_kwargs = {
+        "note_repository": {"name_index": note_name_index},
+        "note_hashtag_repository": {"hashtag_index": hashtag_index},
+    }
+    return {
+        name: repository_class(conn, executor, **repository_kwargs.get(name, {}))
+        for name, repository_class in ASYNC_REPOSITORY_CLASSES.items()
+    }
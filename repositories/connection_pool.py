@@ -0,0 +1,576 @@
+import os
+import re
+import sqlite3
+import logging
+import threading
+import time
+import traceback
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional, Tuple
+from repositories.text_compression import TextCompression
+
+
+class ConnectionPool:
+    """
+    Read/write split over one SQLite file in WAL mode.
+
+    Every thread reads through its own read-only connection, up to a bounded number of them,
+    so view rendering works on WAL snapshots and never waits for a writer. All mutations go
+    through a single writer connection that one thread at a time owns, from its first write
+    until it commits or rolls back; other writers wait for it in-process rather than in
+    SQLite's busy handler. Outside a unit of work, a failed statement rolls the thread's
+    writes back and releases the writer.
+    """
+
+    DEFAULT_POOL_SIZE = 8
+    POOL_SIZE_ENV = "BACK_NOTE_DB_POOL_SIZE"
+
+    # Negative cache_size is in KiB: 16 MiB page cache per connection
+    CACHE_SIZE_KIB = 16384
+    MMAP_SIZE = 256 * 1024 * 1024
+    BUSY_TIMEOUT_MS = 5000
+    CHECKPOINT_INTERVAL_S = 1.0
+
+    # Statements that start with these only read; everything else is routed to the writer
+    READ_KEYWORDS = ("SELECT", "VALUES", "EXPLAIN")
+    WRITE_PRAGMAS = ("wal_checkpoint", "optimize", "incremental_vacuum")
+    LEADING_KEYWORD = re.compile(r"^(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*\(*\s*(\w+)", re.DOTALL)
+    DATA_CHANGE = re.compile(r"\b(?:INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+    def __init__(self, db_path: str, pool_size: Optional[int] = None):
+        if pool_size is None:
+            pool_size = int(os.getenv(ConnectionPool.POOL_SIZE_ENV, ConnectionPool.DEFAULT_POOL_SIZE))
+        if not isinstance(pool_size, int) or pool_size < 1:
+            raise ValueError("Pool size must be a positive integer")
+        ConnectionPool.check_db_path(db_path)
+
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.closed = False
+
+        # thread ident -> (thread, read-only connection)
+        self._connections: Dict[int, Tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._condition = threading.Condition()
+        # The calling thread's reader, so the hot path takes no lock
+        self._local = threading.local()
+        # Separate from _condition, which every thread's first read takes
+        self._writer_condition = threading.Condition()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_owner: Optional[threading.Thread] = None
+        self._checkpoint_lock = threading.Lock()
+        self._checkpointer: Optional[sqlite3.Connection] = None
+        self._next_checkpoint_at = 0.0
+
+    @staticmethod
+    def check_db_path(db_path: str) -> None:
+        """
+        Reject paths where every connection opens a database of its own: ":memory:" and ""
+        (a private temporary file). Readers would not see the writer's schema or writes, and a
+        shared-cache memory database has no WAL snapshots, so readers would block on writes.
+        """
+        if db_path in (":memory:", ""):
+            raise ValueError(
+                f"Database path {db_path!r} is not supported: each pooled connection would open a separate "
+                "database. Use a file, e.g. one in a temporary directory."
+            )
+
+    def get_connection(self) -> sqlite3.Connection:
+        """The connection the calling thread works on: the writer while it owns it, else its reader"""
+        writer = self.owned_writer()
+        return writer if writer is not None else self.get_reader()
+
+    def get_reader(self) -> sqlite3.Connection:
+        """Get the calling thread's read-only connection, opening it when the thread has none"""
+        conn = getattr(self._local, "reader", None)
+        if conn is not None and not self.closed:
+            return conn
+
+        thread = threading.current_thread()
+        with self._condition:
+            if self.closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+
+            entry = self._connections.get(thread.ident)
+            if entry and entry[0] is thread:
+                self._local.reader = entry[1]
+                return entry[1]
+            if entry:
+                # Thread ident reused after the previous owner finished
+                del self._connections[thread.ident]
+                ConnectionPool._close_quietly(entry[1])
+
+            waited_ms = 0
+            while len(self._connections) >= self.pool_size and not self._reap_dead_threads():
+                # Wait for another thread to release its connection
+                if waited_ms >= ConnectionPool.BUSY_TIMEOUT_MS:
+                    raise sqlite3.OperationalError(
+                        f"Connection pool exhausted ({self.pool_size} connections in use)"
+                    )
+                self._condition.wait(0.05)
+                waited_ms += 50
+
+            conn = self._open_connection(read_only=True)
+            self._connections[thread.ident] = (thread, conn)
+            self._local.reader = conn
+            return conn
+
+    def acquire_writer(self) -> sqlite3.Connection:
+        """Take ownership of the writer connection for the calling thread, waiting while another thread holds it"""
+        thread = threading.current_thread()
+        deadline = time.monotonic() + ConnectionPool.BUSY_TIMEOUT_MS / 1000
+
+        with self._writer_condition:
+            while True:
+                if self.closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                if self._writer_owner is None or self._writer_owner is thread:
+                    break
+                if not self._writer_owner.is_alive():
+                    # The owner finished without committing; its writes die with it
+                    logging.warning(f"Rolling back writes left uncommitted by thread {self._writer_owner.name}")
+                    self._writer.rollback()
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError("database is locked (writer connection busy)")
+                self._writer_condition.wait(min(remaining, 0.05))
+
+            if self._writer is None:
+                self._writer = self._open_connection()
+            self._writer_owner = thread
+            return self._writer
+
+    def owned_writer(self) -> Optional[sqlite3.Connection]:
+        """The writer connection if the calling thread owns it, else None"""
+        if self._writer_owner is threading.current_thread():
+            return self._writer
+        return None
+
+    def release_writer(self) -> None:
+        """Give up the calling thread's ownership of the writer connection"""
+        with self._writer_condition:
+            if self._writer_owner is not threading.current_thread():
+                return
+            self._writer_owner = None
+            self._writer_condition.notify_all()
+        self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """
+        Passive WAL checkpoint, at most every CHECKPOINT_INTERVAL_S, on a connection of its own.
+        SQLite lets the next writer proceed during a checkpoint, so the writer is never held through one.
+        """
+        now = time.monotonic()
+        if now < self._next_checkpoint_at or not self._checkpoint_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_checkpoint_at = now + ConnectionPool.CHECKPOINT_INTERVAL_S
+            if self.closed:
+                return
+            if self._checkpointer is None:
+                self._checkpointer = self._open_connection()
+            self._checkpointer.execute("PRAGMA wal_checkpoint(PASSIVE);").fetchone()
+        except sqlite3.Error:
+            # The next release tries again; readers and the writer are unaffected
+            logging.error(f"WAL checkpoint failed: {traceback.format_exc()}")
+        finally:
+            self._checkpoint_lock.release()
+
+    def settle_writer(self) -> None:
+        """Release the writer once the calling thread has nothing left uncommitted on it"""
+        writer = self.owned_writer()
+        if writer is not None and not writer.in_transaction:
+            self.release_writer()
+
+    def get_writer(self) -> sqlite3.Connection:
+        """
+        The writer connection without taking ownership, for instrumentation such as tracing
+        or per-connection pragmas. Statements reach it through route() or acquire_writer().
+        """
+        with self._writer_condition:
+            if self.closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            if self._writer is None:
+                self._writer = self._open_connection()
+            return self._writer
+
+    def route(self, sql: str) -> Tuple[sqlite3.Connection, bool]:
+        """
+        Connection for one statement of the calling thread, and whether it is the writer.
+        While the thread owns the writer everything stays on it, so it reads its own uncommitted writes.
+        """
+        writer = self.owned_writer()
+        if writer is not None:
+            return writer, True
+        if ConnectionPool.is_read(sql):
+            return self.get_reader(), False
+        return self.acquire_writer(), True
+
+    @staticmethod
+    def is_read(sql: str) -> bool:
+        """Whether a statement only reads, so a read-only connection can run it"""
+        match = ConnectionPool.LEADING_KEYWORD.match(sql)
+        if not match:
+            return False
+
+        keyword = match.group(1).upper()
+        if keyword in ConnectionPool.READ_KEYWORDS:
+            return True
+        if keyword == "WITH":
+            # A common table expression can lead into INSERT, UPDATE or DELETE
+            return not ConnectionPool.DATA_CHANGE.search(sql)
+        if keyword == "PRAGMA":
+            # Reading a pragma is safe anywhere; setting one, or running a maintenance pragma, is not
+            return "=" not in sql and not any(name in sql.lower() for name in ConnectionPool.WRITE_PRAGMAS)
+        return False
+
+    def release(self) -> None:
+        """Close the calling thread's reader and free its slot, rolling back anything it left on the writer"""
+        writer = self.owned_writer()
+        if writer is not None:
+            try:
+                writer.rollback()
+            finally:
+                self.release_writer()
+
+        self._local.reader = None
+        with self._condition:
+            entry = self._connections.pop(threading.get_ident(), None)
+            self._condition.notify_all()
+        if entry:
+            ConnectionPool._close_quietly(entry[1])
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            conns = [conn for _, conn in self._connections.values()]
+            self._connections.clear()
+            self._condition.notify_all()
+        with self._writer_condition:
+            if self._writer is not None:
+                conns.append(self._writer)
+            self._writer = None
+            self._writer_owner = None
+            self._writer_condition.notify_all()
+        with self._checkpoint_lock:
+            if self._checkpointer is not None:
+                conns.append(self._checkpointer)
+            self._checkpointer = None
+        for conn in conns:
+            ConnectionPool._close_quietly(conn)
+
+    def size(self) -> int:
+        """Number of open readers; the writer is not counted"""
+        with self._condition:
+            return len(self._connections)
+
+    def _open_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        # check_same_thread=False: the writer serves whichever thread owns it, the checkpointer
+        # whichever thread checkpoints, and close() can run from any thread; a reader is only
+        # used by the thread that opened it
+        # PARSE_DECLTYPES runs convert_timestamp on every column declared TIMESTAMP
+        conn = sqlite3.connect(self.db_path, timeout=ConnectionPool.BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            conn.execute(f"PRAGMA cache_size = -{ConnectionPool.CACHE_SIZE_KIB};")
+            conn.execute(f"PRAGMA mmap_size = {ConnectionPool.MMAP_SIZE};")
+            conn.execute(f"PRAGMA busy_timeout = {ConnectionPool.BUSY_TIMEOUT_MS};")
+            conn.execute("PRAGMA foreign_keys = ON;")
+            if read_only:
+                # A statement misrouted to a reader fails instead of writing outside the writer
+                conn.execute("PRAGMA query_only = ON;")
+            else:
+                # An automatic checkpoint would run inside commit() while the writer is owned; see checkpoint()
+                conn.execute("PRAGMA wal_autocheckpoint = 0;")
+            # Triggers and queries decode compressed text columns with it
+            TextCompression.register(conn)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    @staticmethod
+    def convert_timestamp(value: bytes) -> Any:
+        """'YYYY-MM-DD HH:MM:SS' as stored by CURRENT_TIMESTAMP and the datetime adapter, as a datetime"""
+        text = value.decode("utf-8")
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            # Hand back anything else unchanged rather than fail the whole read
+            return text
+
+    def _reap_dead_threads(self) -> bool:
+        """Close connections of finished threads; returns whether a slot was freed"""
+        dead = [ident for ident, (thread, _) in self._connections.items() if not thread.is_alive()]
+        for ident in dead:
+            _, conn = self._connections.pop(ident)
+            ConnectionPool._close_quietly(conn)
+        return bool(dead)
+
+    @staticmethod
+    def _close_quietly(conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except Exception:
+            logging.error(f"Error closing pooled connection: {traceback.format_exc()}")
+
+
+# Replaces sqlite3's deprecated default "timestamp" converter (names are case-insensitive)
+sqlite3.register_converter("TIMESTAMP", ConnectionPool.convert_timestamp)
+
+
+class PooledConnection:
+    """sqlite3.Connection stand-in that routes every statement to the calling thread's reader or to the writer"""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        # Per-thread nesting depth of transaction() blocks
+        self._local = threading.local()
+
+    @contextmanager
+    def transaction(self) -> Iterator["PooledConnection"]:
+        """
+        Unit of work: everything the calling thread writes inside the block is committed once
+        at the end, or rolled back if the block raises.
+
+        Repositories join the unit without changes: their commit() calls become no-ops while
+        a unit is open. Nested blocks join the outermost one.
+        """
+        depth = getattr(self._local, "depth", 0)
+        # The block owns the writer throughout, so its reads see its own writes
+        conn = self.pool.acquire_writer()
+        if depth == 0:
+            try:
+                if conn.in_transaction:
+                    conn.commit()
+                # IMMEDIATE takes the write lock now instead of failing to upgrade a read lock later
+                conn.execute("BEGIN IMMEDIATE;")
+            except BaseException:
+                self.pool.settle_writer()
+                raise
+
+        if depth == 0:
+            self._local.on_commit = []
+        self._local.depth = depth + 1
+        try:
+            yield self
+        except BaseException:
+            self._local.depth = depth
+            if depth == 0:
+                self._local.on_commit = []
+                try:
+                    conn.rollback()
+                finally:
+                    self.pool.release_writer()
+            raise
+
+        self._local.depth = depth
+        if depth == 0:
+            conn.commit()
+            self.pool.release_writer()
+            callbacks, self._local.on_commit = self._local.on_commit, []
+            for callback in callbacks:
+                callback()
+
+    @contextmanager
+    def snapshot(self) -> Iterator["PooledConnection"]:
+        """
+        Read block: every read of the calling thread inside sees the same WAL snapshot, while
+        writers keep committing. Within a write the thread already reads one state, the writer's.
+        """
+        if self.pool.owned_writer() is not None:
+            yield self
+            return
+
+        reader = self.pool.get_reader()
+        if reader.in_transaction:
+            # Nested in another snapshot
+            yield self
+            return
+
+        # The read transaction pins the snapshot from its first read until commit
+        reader.execute("BEGIN;")
+        try:
+            yield self
+        finally:
+            reader.commit()
+
+    def in_transaction_block(self) -> bool:
+        return getattr(self._local, "depth", 0) > 0
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """Run callback once the calling thread's writes are committed: now, or when its unit of work commits (never if it rolls back)"""
+        if self.in_transaction_block():
+            self._local.on_commit.append(callback)
+        else:
+            callback()
+
+    def cursor(self) -> "PooledCursor":
+        return PooledCursor(self.pool, self)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        conn, _ = self.pool.route(sql)
+        try:
+            return conn.execute(sql, parameters)
+        except BaseException:
+            self.discard_failed_writes()
+            raise
+        finally:
+            self.pool.settle_writer()
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        conn, _ = self.pool.route(sql)
+        try:
+            return conn.executemany(sql, seq_of_parameters)
+        except BaseException:
+            self.discard_failed_writes()
+            raise
+        finally:
+            self.pool.settle_writer()
+
+    def discard_failed_writes(self) -> None:
+        """
+        After a statement fails outside transaction(): roll back everything the calling thread
+        wrote since its last commit and release the writer, so a repository that fails halfway
+        neither keeps other writers waiting nor slips its partial writes into the thread's next
+        commit. Inside a block, transaction() rolls back when the block raises.
+        """
+        if self.in_transaction_block():
+            return
+        try:
+            self.rollback()
+        except sqlite3.Error:
+            # Keep the statement's own error; rollback() has released the writer either way
+            logging.error(f"Rollback after a failed statement failed: {traceback.format_exc()}")
+
+    def commit(self) -> None:
+        if self.in_transaction_block():
+            # Joined a unit of work; the outermost transaction() commits
+            return
+        # Readers never hold changes, so only a thread that owns the writer has anything to commit
+        writer = self.pool.owned_writer()
+        if writer is not None:
+            writer.commit()
+            self.pool.release_writer()
+
+    def rollback(self) -> None:
+        writer = self.pool.owned_writer()
+        if writer is not None:
+            try:
+                writer.rollback()
+            finally:
+                self.pool.release_writer()
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool.get_connection(), name)
+
+
+class PooledCursor:
+    """
+    sqlite3.Cursor stand-in, so a repository can be shared across threads. Each thread holds
+    one real cursor on its reader and one on the writer; every statement runs on the one
+    ConnectionPool.route picks, and results are read from the cursor that ran last.
+    """
+
+    def __init__(self, pool: ConnectionPool, connection: PooledConnection):
+        self.pool = pool
+        self.connection = connection
+        self._local = threading.local()
+
+    def _cursor_for(self, conn: sqlite3.Connection, writer: bool) -> sqlite3.Cursor:
+        slot = "writer" if writer else "reader"
+        entry = getattr(self._local, slot, None)
+        if entry is None or entry[0] is not conn:
+            # First use on this thread, or the connection was replaced
+            entry = (conn, conn.cursor())
+            setattr(self._local, slot, entry)
+        self._local.cursor = entry[1]
+        return entry[1]
+
+    def _cursor(self) -> sqlite3.Cursor:
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            # Nothing executed yet on this thread
+            cursor = self._cursor_for(self.pool.get_reader(), False)
+        return cursor
+
+    def _run(self, sql: str, run: Callable[[sqlite3.Cursor], Any]) -> "PooledCursor":
+        conn, writer = self.pool.route(sql)
+        try:
+            run(self._cursor_for(conn, writer))
+        except BaseException:
+            self.connection.discard_failed_writes()
+            raise
+        finally:
+            self.pool.settle_writer()
+        return self
+
+    def execute(self, sql: str, parameters: Any = ()) -> "PooledCursor":
+        return self._run(sql, lambda cursor: cursor.execute(sql, parameters))
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "PooledCursor":
+        return self._run(sql, lambda cursor: cursor.executemany(sql, seq_of_parameters))
+
+    def executescript(self, sql_script: str) -> "PooledCursor":
+        # Scripts can hold any statement, so they always run on the writer
+        return self._run("", lambda cursor: cursor.executescript(sql_script))
+
+    def fetchone(self) -> Any:
+        return self._cursor().fetchone()
+
+    def fetchmany(self, size: int = 1) -> list:
+        return self._cursor().fetchmany(size)
+
+    def fetchall(self) -> list:
+        return self._cursor().fetchall()
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cursor().lastrowid
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor().rowcount
+
+    @property
+    def description(self) -> Any:
+        return self._cursor().description
+
+    def close(self) -> None:
+        for slot in ("reader", "writer"):
+            entry = getattr(self._local, slot, None)
+            if entry is not None:
+                entry[1].close()
+                setattr(self._local, slot, None)
+        self._local.cursor = None
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._cursor())
+
+
+def read_snapshot(conn: Any) -> ContextManager[Any]:
+    """PooledConnection.snapshot, or no-op for connections that read one state anyway"""
+    snapshot = getattr(conn, "snapshot", None)
+    return snapshot() if snapshot else nullcontext(conn)
+
+
+def unit_of_work(conn: Any) -> ContextManager[Any]:
+    """PooledConnection.transaction, or no-op for connections without units of work"""
+    transaction = getattr(conn, "transaction", None)
+    return transaction() if transaction else nullcontext(conn)
+
+
+def after_commit(conn: Any, callback: Callable[[], None]) -> None:
+    """PooledConnection.on_commit, or an immediate call for connections without units of work"""
+    on_commit = getattr(conn, "on_commit", None)
+    if on_commit:
+        on_commit(callback)
+    else:
+        callback()
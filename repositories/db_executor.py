@@ -0,0 +1,57 @@
+import asyncio
+import functools
+import logging
+import sqlite3
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class DBExecutor:
+    """
+    Dedicated thread that runs repository calls for async code, so the event loop never
+    waits on SQLite.
+
+    Calls run one at a time in submission order, on a thread of their own: it gets a reader
+    and the writer from the connection pool like any other thread. A call that fails
+    with writes still uncommitted has them rolled back before the next call, so one bad
+    call cannot hold the writer or slip its writes into the next commit. Awaiting
+    coroutines can be cancelled, but a call that has started runs to completion.
+    """
+
+    THREAD_NAME = "back-note-db"
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=DBExecutor.THREAD_NAME)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """fn(*args, **kwargs) on the DB thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._call, fn, args, kwargs))
+
+    async def transaction(self, work: Callable[[], T]) -> T:
+        """
+        work() as one unit of work on the DB thread: its repository writes commit together,
+        or not at all if it raises. work is synchronous, so no other call can interleave.
+        """
+        def run_in_transaction() -> T:
+            with self.conn.transaction():
+                return work()
+
+        return await self.run(run_in_transaction)
+
+    def close(self) -> None:
+        """Finish the calls already submitted and stop the thread"""
+        self._executor.shutdown(wait=True)
+
+    def _call(self, fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            if self.conn.in_transaction:
+                logging.error(f"Rolling back writes left by a failed DB call: {traceback.format_exc()}")
+                self.conn.rollback()
+            raise
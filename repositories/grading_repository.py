@@ -1,9 +1,21 @@
 import sqlite3
 from datetime import datetime
+from typing import Iterable, Optional
 import logging
 import traceback
+from repositories.projection import Projection
+from repositories.rows import GradingRow
+from repositories.text_compression import TextCompression
 
 class GradingRepository:
+    # Rows per multi-row INSERT, well below SQLite's bound parameter limit
+    BATCH_SIZE = 500
+    COLUMNS = ("grading_id", "question_id", "user_answer", "real_answer", "score",
+               "correction_and_explanation", "additional_context", "created_at")
+    # Stored through TextCompression; COMPRESSED_COLUMNS are their positions in full rows
+    COMPRESSED_NAMES = ("correction_and_explanation", "additional_context")
+    COMPRESSED_COLUMNS = (5, 6)
+
     def __init__(self, conn: sqlite3.Connection):
         try:
             self.conn = conn
@@ -12,7 +24,8 @@ class GradingRepository:
             logging.error(f"Failed to initialize GradingRepository: {traceback.format_exc()}")
             raise Exception(f"Failed to initialize GradingRepository: {str(e)}")
 
-    def get_all_gradings(self, question_ids: list[int]) -> list[tuple[int, int, str, str, str, str, datetime]]:
+    def get_all_gradings(self, question_ids: list[int], columns: Optional[Iterable[str]] = None) -> list[GradingRow]:
+        """columns: names from COLUMNS to fetch, in the order wanted; all of them by default"""
         try:
             if not question_ids:
                 return []
@@ -20,9 +33,14 @@ class GradingRepository:
             if not all(isinstance(qid, int) and qid > 0 for qid in question_ids):
                 raise ValueError("All question IDs must be positive integers")
             
+            selected = Projection.resolve(columns, self.COLUMNS)
+            compressed = Projection.positions(selected, self.COMPRESSED_NAMES)
             placeholders = ','.join('?' * len(question_ids))
-            self.cursor.execute(f"SELECT * FROM grading WHERE question_id IN ({placeholders})", question_ids)
-            return self.cursor.fetchall()
+            self.cursor.execute(f"SELECT {Projection.select_list(selected)} FROM grading WHERE question_id IN ({placeholders})", question_ids)
+            return [
+                Projection.typed(TextCompression.decode_row(row, compressed), selected, self.COLUMNS, GradingRow)
+                for row in self.cursor
+            ]
         except sqlite3.Error as e:
             logging.error(f"Database error in get_all_gradings: {traceback.format_exc()}")
             raise Exception(f"Failed to retrieve gradings: {str(e)}")
@@ -30,13 +48,17 @@ class GradingRepository:
             logging.error(f"Unexpected error in get_all_gradings: {traceback.format_exc()}")
             raise Exception(f"Unexpected error retrieving gradings: {str(e)}")
     
-    def get_grading_by_question_id(self, question_id: int) -> tuple[int, int, str, str, str, str, datetime]:
+    def get_grading_by_question_id(self, question_id: int, columns: Optional[Iterable[str]] = None) -> Optional[GradingRow]:
         try:
             if not isinstance(question_id, int) or question_id <= 0:
                 raise ValueError("Invalid question ID")
             
-            self.cursor.execute("SELECT * FROM grading WHERE question_id = ?", (question_id,))
-            result = self.cursor.fetchone()
+            selected = Projection.resolve(columns, self.COLUMNS)
+            self.cursor.execute(f"SELECT {Projection.select_list(selected)} FROM grading WHERE question_id = ?", (question_id,))
+            result = Projection.typed(
+                TextCompression.decode_row(self.cursor.fetchone(), Projection.positions(selected, self.COMPRESSED_NAMES)),
+                selected, self.COLUMNS, GradingRow
+            )
             
             return result
         except sqlite3.Error as e:
@@ -66,7 +88,8 @@ class GradingRepository:
             
             self.cursor.execute(
                 "INSERT INTO grading (question_id, user_answer, real_answer, score, correction_and_explanation, additional_context) VALUES (?, ?, ?, ?, ?, ?)", 
-                (question_id, user_answer, real_answer, score, correction_and_explanation, additional_context)
+                (question_id, user_answer, real_answer, score,
+                 TextCompression.encode(correction_and_explanation), TextCompression.encode(additional_context))
             )
             self.conn.commit()
             return self.cursor.lastrowid
@@ -80,6 +103,66 @@ class GradingRepository:
             logging.error(f"Unexpected error in insert_grading: {traceback.format_exc()}")
             raise Exception(f"Unexpected error inserting grading: {str(e)}")
     
+    @staticmethod
+    def _encode_row(row: tuple[int, str, str, str, str, str]) -> tuple:
+        question_id, user_answer, real_answer, score, correction_and_explanation, additional_context = row
+        return (question_id, user_answer, real_answer, score,
+                TextCompression.encode(correction_and_explanation), TextCompression.encode(additional_context))
+    
+    def upsert_gradings(self, gradings: list[tuple[int, str, str, str, str, str]]) -> dict[int, int]:
+        """Insert or replace the current grading of each question in one statement per batch; returns question ID -> grading ID"""
+        try:
+            # Input validation
+            if not isinstance(gradings, list):
+                raise ValueError("Gradings must be a list")
+            
+            for question_id, user_answer, real_answer, score, correction_and_explanation, additional_context in gradings:
+                if not isinstance(question_id, int) or question_id <= 0:
+                    raise ValueError("Invalid question ID")
+                
+                if not real_answer or not real_answer.strip():
+                    raise ValueError("Real answer cannot be empty")
+                
+                if not score or not score.strip():
+                    raise ValueError("Score cannot be empty")
+                
+                if not correction_and_explanation or not correction_and_explanation.strip():
+                    raise ValueError("Correction and explanation cannot be empty")
+                
+                if not additional_context or not additional_context.strip():
+                    raise ValueError("Additional context cannot be empty")
+            
+            grading_ids = {}
+            for start in range(0, len(gradings), self.BATCH_SIZE):
+                batch = gradings[start:start + self.BATCH_SIZE]
+                self.cursor.execute(
+                    "INSERT INTO grading (question_id, user_answer, real_answer, score, correction_and_explanation, additional_context) VALUES "
+                    + ", ".join(["(?, ?, ?, ?, ?, ?)"] * len(batch))
+                    + """
+                    ON CONFLICT (question_id) DO UPDATE SET
+                        user_answer = excluded.user_answer,
+                        real_answer = excluded.real_answer,
+                        score = excluded.score,
+                        correction_and_explanation = excluded.correction_and_explanation,
+                        additional_context = excluded.additional_context
+                    RETURNING question_id, grading_id
+                    """,
+                    [value for row in batch for value in self._encode_row(row)]
+                )
+                grading_ids.update(self.cursor.fetchall())
+            
+            self.conn.commit()
+            return grading_ids
+        except sqlite3.IntegrityError as e:
+            logging.error(f"Integrity error in upsert_gradings: {traceback.format_exc()}")
+            raise Exception(f"Gradings violate database constraints: {str(e)}")
+        except sqlite3.Error as e:
+            logging.error(f"Database error in upsert_gradings: {traceback.format_exc()}")
+            raise Exception(f"Failed to upsert gradings: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in upsert_gradings: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error upserting gradings: {str(e)}")
+    
     def update_grading(self, grading_id: int, user_answer: str, real_answer: str, score: str, correction_and_explanation: str, additional_context: str):
         try:
             # Input validation
@@ -100,7 +183,8 @@ class GradingRepository:
             
             self.cursor.execute(
                 "UPDATE grading SET user_answer = ?, real_answer = ?, score = ?, correction_and_explanation = ?, additional_context = ? WHERE grading_id = ?", 
-                (user_answer, real_answer, score, correction_and_explanation, additional_context, grading_id)
+                (user_answer, real_answer, score,
+                 TextCompression.encode(correction_and_explanation), TextCompression.encode(additional_context), grading_id)
             )
             self.conn.commit()
             
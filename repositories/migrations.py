@@ -0,0 +1,599 @@
+"""
+Versioned schema migrations. The applied version is stored in PRAGMA user_version.
+
+    python -m repositories.migrations                 # dry run: report pending migrations
+    python -m repositories.migrations --apply         # apply them
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import logging
+import traceback
+from typing import Any, Callable, Dict, List
+from repositories.text_compression import TextCompression
+
+
+# (table, primary key, column) of the text columns TextCompression applies to
+COMPRESSED_COLUMNS = [
+    ("note", "note_id", "note_content"),
+    ("summary", "summary_id", "summary"),
+    ("grading", "grading_id", "correction_and_explanation"),
+    ("grading", "grading_id", "additional_context"),
+]
+
+# Full-text index triggers that read compressed columns, rewritten to index the decoded text
+DECODING_SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER note_search_note_insert AFTER INSERT ON note BEGIN
+        INSERT INTO note_search (rowid, note_id, title, body)
+        VALUES (new.note_id * 4, new.note_id, new.note_name, decompress_text(new.note_content));
+    END
+    """,
+    """
+    CREATE TRIGGER note_search_note_update AFTER UPDATE OF note_name, note_content ON note BEGIN
+        UPDATE note_search SET title = new.note_name, body = decompress_text(new.note_content) WHERE rowid = new.note_id * 4;
+    END
+    """,
+    """
+    CREATE TRIGGER note_search_summary_insert AFTER INSERT ON summary BEGIN
+        INSERT INTO note_search (rowid, note_id, body) VALUES (new.summary_id * 4 + 1, new.note_id, decompress_text(new.summary));
+    END
+    """,
+    """
+    CREATE TRIGGER note_search_summary_update AFTER UPDATE OF summary ON summary BEGIN
+        UPDATE note_search SET body = decompress_text(new.summary) WHERE rowid = new.summary_id * 4 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER note_search_grading_insert AFTER INSERT ON grading BEGIN
+        INSERT INTO note_search (rowid, note_id, body)
+        SELECT new.grading_id * 4 + 3, note_id, decompress_text(new.correction_and_explanation)
+        FROM question WHERE question_id = new.question_id;
+    END
+    """,
+    """
+    CREATE TRIGGER note_search_grading_update AFTER UPDATE OF correction_and_explanation ON grading BEGIN
+        UPDATE note_search SET body = decompress_text(new.correction_and_explanation) WHERE rowid = new.grading_id * 4 + 3;
+    END
+    """,
+]
+
+
+def compress_text_columns(cursor: sqlite3.Cursor, batch_size: int = 500) -> None:
+    """Compress the existing rows of COMPRESSED_COLUMNS and make the search triggers decode them"""
+    # Dropped first so compressing a row does not re-index text that has not changed
+    for statement in DECODING_SEARCH_TRIGGERS:
+        trigger_name = statement.split("TRIGGER ")[1].split()[0]
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+
+    for table, key, column in COMPRESSED_COLUMNS:
+        last_id = 0
+        while True:
+            cursor.execute(
+                f"SELECT {key}, {column} FROM {table} WHERE {key} > ? AND typeof({column}) = 'text' ORDER BY {key} LIMIT ?",
+                (last_id, batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for row_id, text in rows:
+                encoded = TextCompression.encode(text)
+                # Short or incompressible values come back unchanged and stay TEXT
+                if encoded is not text:
+                    cursor.execute(f"UPDATE {table} SET {column} = ? WHERE {key} = ?", (encoded, row_id))
+            last_id = rows[-1][0]
+
+    for statement in DECODING_SEARCH_TRIGGERS:
+        cursor.execute(statement)
+
+
+# Note search triggers that read the body from note_body; notes written without one keep it inline
+NOTE_BODY_SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER note_search_note_insert AFTER INSERT ON note BEGIN
+        INSERT INTO note_search (rowid, note_id, title, body)
+        VALUES (new.note_id * 4, new.note_id, new.note_name, COALESCE(
+            (SELECT decompress_text(content) FROM note_body WHERE note_body_id = new.note_body_id),
+            decompress_text(new.note_content)
+        ));
+    END
+    """,
+    """
+    CREATE TRIGGER note_search_note_update AFTER UPDATE OF note_name, note_content, note_body_id ON note BEGIN
+        UPDATE note_search SET title = new.note_name, body = COALESCE(
+            (SELECT decompress_text(content) FROM note_body WHERE note_body_id = new.note_body_id),
+            decompress_text(new.note_content)
+        ) WHERE rowid = new.note_id * 4;
+    END
+    """,
+]
+
+
+def move_note_bodies(cursor: sqlite3.Cursor, batch_size: int = 500) -> None:
+    """Move every note's content into note_body, one row per distinct content hash"""
+    # Dropped first so emptying note_content does not empty the indexed body
+    for statement in NOTE_BODY_SEARCH_TRIGGERS:
+        trigger_name = statement.split("TRIGGER ")[1].split()[0]
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+
+    last_id = 0
+    while True:
+        cursor.execute(
+            "SELECT note_id, note_content FROM note WHERE note_id > ? AND note_body_id IS NULL ORDER BY note_id LIMIT ?",
+            (last_id, batch_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        for note_id, stored in rows:
+            text = TextCompression.decode(stored)
+            body_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            # The stored value is kept as it is, compressed or not
+            cursor.execute(
+                "INSERT INTO note_body (body_hash, content, content_bytes) VALUES (?, ?, ?) ON CONFLICT (body_hash) DO NOTHING",
+                (body_hash, stored, len(text.encode("utf-8")))
+            )
+            cursor.execute("SELECT note_body_id FROM note_body WHERE body_hash = ?", (body_hash,))
+            cursor.execute(
+                "UPDATE note SET note_body_id = ?, note_content = '' WHERE note_id = ?", (cursor.fetchone()[0], note_id)
+            )
+        last_id = rows[-1][0]
+
+    for statement in NOTE_BODY_SEARCH_TRIGGERS:
+        cursor.execute(statement)
+
+
+# Append only: never edit or reorder a migration that has shipped.
+# Each migration has a version, a description and "statements" (SQL run in order),
+# "apply" (a callable taking the cursor) for data migrations, or both; apply runs last.
+MIGRATIONS: List[Dict[str, Any]] = [
+    {
+        "version": 1,
+        "description": "Initial schema",
+        # IF NOT EXISTS so databases created before versioning are adopted as version 1
+        "statements": [
+            """
+            CREATE TABLE IF NOT EXISTS api_key (
+                api_key_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                api_key TEXT NOT NULL,
+                last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS note (
+                note_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                note_name TEXT NOT NULL,
+                note_content TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS note_hashtag (
+                note_hashtag_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hashtag TEXT NOT NULL UNIQUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS note_note_hashtags (
+                note_id INTEGER NOT NULL,
+                note_hashtag_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                deleted_at TIMESTAMP DEFAULT NULL,
+                FOREIGN KEY (note_id) REFERENCES note (note_id) ON DELETE CASCADE,
+                FOREIGN KEY (note_hashtag_id) REFERENCES note_hashtag (note_hashtag_id) ON DELETE CASCADE,
+                PRIMARY KEY (note_id, note_hashtag_id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS summary (
+                summary_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                note_id INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (note_id) REFERENCES note (note_id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS question (
+                question_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                note_id INTEGER NOT NULL,
+                question TEXT NOT NULL,
+                question_type TEXT NOT NULL,
+                preview_answer TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (note_id) REFERENCES note (note_id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS option (
+                option_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                question_id INTEGER NOT NULL,
+                option TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (question_id) REFERENCES question (question_id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS grading (
+                grading_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                question_id INTEGER NOT NULL,
+                user_answer TEXT,
+                real_answer TEXT NOT NULL,
+                score TEXT NOT NULL,
+                correction_and_explanation TEXT NOT NULL,
+                additional_context TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (question_id) REFERENCES question (question_id) ON DELETE CASCADE
+            )
+            """,
+        ],
+    },
+    {
+        "version": 2,
+        "description": "Secondary indexes on foreign-key and sort columns",
+        "statements": [
+            "CREATE INDEX IF NOT EXISTS idx_question_note_id ON question (note_id)",
+            "CREATE INDEX IF NOT EXISTS idx_option_question_id ON option (question_id)",
+            "CREATE INDEX IF NOT EXISTS idx_grading_question_id ON grading (question_id)",
+            "CREATE INDEX IF NOT EXISTS idx_summary_note_id ON summary (note_id)",
+            "CREATE INDEX IF NOT EXISTS idx_note_created_at ON note (created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_note_note_hashtags_note_hashtag_id ON note_note_hashtags (note_hashtag_id)",
+        ],
+    },
+    {
+        "version": 3,
+        "description": "One current grading per question",
+        "statements": [
+            # Keep the most recent grading of each question
+            "DELETE FROM grading WHERE grading_id NOT IN (SELECT MAX(grading_id) FROM grading GROUP BY question_id)",
+            # The unique index also serves the question_id lookups
+            "DROP INDEX IF EXISTS idx_grading_question_id",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_grading_question_id_unique ON grading (question_id)",
+        ],
+    },
+    {
+        "version": 4,
+        "description": "Case-insensitive indexes for note search",
+        "statements": [
+            "CREATE INDEX IF NOT EXISTS idx_note_name_nocase ON note (note_name COLLATE NOCASE)",
+            "CREATE INDEX IF NOT EXISTS idx_note_hashtag_hashtag_nocase ON note_hashtag (hashtag COLLATE NOCASE)",
+        ],
+    },
+    {
+        "version": 5,
+        "description": "Full-text index over notes, summaries, questions and grading feedback",
+        # One FTS row per source row; rowid = source id * 4 + kind (0 note, 1 summary, 2 question, 3 grading),
+        # so the triggers update and delete by rowid without scanning the index
+        "statements": [
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS note_search USING fts5 (
+                note_id UNINDEXED,
+                title,
+                body,
+                tokenize = 'porter unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            """,
+            "INSERT INTO note_search (rowid, note_id, title, body) SELECT note_id * 4, note_id, note_name, note_content FROM note",
+            "INSERT INTO note_search (rowid, note_id, body) SELECT summary_id * 4 + 1, note_id, summary FROM summary",
+            "INSERT INTO note_search (rowid, note_id, body) SELECT question_id * 4 + 2, note_id, question FROM question",
+            """
+            INSERT INTO note_search (rowid, note_id, body)
+            SELECT g.grading_id * 4 + 3, q.note_id, g.correction_and_explanation
+            FROM grading g JOIN question q ON q.question_id = g.question_id
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_note_insert AFTER INSERT ON note BEGIN
+                INSERT INTO note_search (rowid, note_id, title, body) VALUES (new.note_id * 4, new.note_id, new.note_name, new.note_content);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_note_update AFTER UPDATE OF note_name, note_content ON note BEGIN
+                UPDATE note_search SET title = new.note_name, body = new.note_content WHERE rowid = new.note_id * 4;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_note_delete AFTER DELETE ON note BEGIN
+                DELETE FROM note_search WHERE rowid = old.note_id * 4;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_summary_insert AFTER INSERT ON summary BEGIN
+                INSERT INTO note_search (rowid, note_id, body) VALUES (new.summary_id * 4 + 1, new.note_id, new.summary);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_summary_update AFTER UPDATE OF summary ON summary BEGIN
+                UPDATE note_search SET body = new.summary WHERE rowid = new.summary_id * 4 + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_summary_delete AFTER DELETE ON summary BEGIN
+                DELETE FROM note_search WHERE rowid = old.summary_id * 4 + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_question_insert AFTER INSERT ON question BEGIN
+                INSERT INTO note_search (rowid, note_id, body) VALUES (new.question_id * 4 + 2, new.note_id, new.question);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_question_update AFTER UPDATE OF question ON question BEGIN
+                UPDATE note_search SET body = new.question WHERE rowid = new.question_id * 4 + 2;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_question_delete AFTER DELETE ON question BEGIN
+                DELETE FROM note_search WHERE rowid = old.question_id * 4 + 2;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_grading_insert AFTER INSERT ON grading BEGIN
+                INSERT INTO note_search (rowid, note_id, body)
+                SELECT new.grading_id * 4 + 3, note_id, new.correction_and_explanation FROM question WHERE question_id = new.question_id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_grading_update AFTER UPDATE OF correction_and_explanation ON grading BEGIN
+                UPDATE note_search SET body = new.correction_and_explanation WHERE rowid = new.grading_id * 4 + 3;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_grading_delete AFTER DELETE ON grading BEGIN
+                DELETE FROM note_search WHERE rowid = old.grading_id * 4 + 3;
+            END
+            """,
+        ],
+    },
+    {
+        "version": 6,
+        "description": "Trigram index over note names for fuzzy title suggestions",
+        # External content: the index stores only trigrams and reads names back from note
+        "statements": [
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS note_title_trigram USING fts5 (
+                note_name,
+                content = 'note',
+                content_rowid = 'note_id',
+                tokenize = 'trigram'
+            )
+            """,
+            "INSERT INTO note_title_trigram (note_title_trigram) VALUES ('rebuild')",
+            """
+            CREATE TRIGGER IF NOT EXISTS note_title_trigram_insert AFTER INSERT ON note BEGIN
+                INSERT INTO note_title_trigram (rowid, note_name) VALUES (new.note_id, new.note_name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_title_trigram_update AFTER UPDATE OF note_name ON note BEGIN
+                INSERT INTO note_title_trigram (note_title_trigram, rowid, note_name) VALUES ('delete', old.note_id, old.note_name);
+                INSERT INTO note_title_trigram (rowid, note_name) VALUES (new.note_id, new.note_name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_title_trigram_delete AFTER DELETE ON note BEGIN
+                INSERT INTO note_title_trigram (note_title_trigram, rowid, note_name) VALUES ('delete', old.note_id, old.note_name);
+            END
+            """,
+        ],
+    },
+    {
+        "version": 7,
+        "description": "Live usage counts on hashtags",
+        # usage_count = links to the tag that are not soft-deleted; note deletes cascade to the links
+        "statements": [
+            "ALTER TABLE note_hashtag ADD COLUMN usage_count INTEGER NOT NULL DEFAULT 0",
+            """
+            UPDATE note_hashtag SET usage_count = (
+                SELECT COUNT(*) FROM note_note_hashtags nnh
+                WHERE nnh.note_hashtag_id = note_hashtag.note_hashtag_id AND nnh.deleted_at IS NULL
+            )
+            """,
+            # Only live tags are indexed, already in listing order
+            """
+            CREATE INDEX IF NOT EXISTS idx_note_hashtag_usage ON note_hashtag (usage_count DESC, hashtag)
+            WHERE usage_count > 0
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_hashtag_usage_insert AFTER INSERT ON note_note_hashtags
+            WHEN new.deleted_at IS NULL BEGIN
+                UPDATE note_hashtag SET usage_count = usage_count + 1 WHERE note_hashtag_id = new.note_hashtag_id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_hashtag_usage_update AFTER UPDATE OF note_hashtag_id, deleted_at ON note_note_hashtags BEGIN
+                UPDATE note_hashtag SET usage_count = usage_count - 1
+                WHERE note_hashtag_id = old.note_hashtag_id AND old.deleted_at IS NULL;
+                UPDATE note_hashtag SET usage_count = usage_count + 1
+                WHERE note_hashtag_id = new.note_hashtag_id AND new.deleted_at IS NULL;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_hashtag_usage_delete AFTER DELETE ON note_note_hashtags
+            WHEN old.deleted_at IS NULL BEGIN
+                UPDATE note_hashtag SET usage_count = usage_count - 1 WHERE note_hashtag_id = old.note_hashtag_id;
+            END
+            """,
+        ],
+    },
+    {
+        "version": 8,
+        "description": "Compress long note content, summaries and grading feedback",
+        # Needs the decompress_text SQL function (TextCompression.register) on every writing connection
+        "apply": compress_text_columns,
+    },
+    {
+        "version": 9,
+        "description": "Content-addressed note bodies and shared analyses",
+        # note.note_body_id points at the note's content, stored once per SHA-256 of the text; note_content
+        # is left empty. note.analysis_note_id points at the note whose summary and questions this one shows.
+        "statements": [
+            """
+            CREATE TABLE IF NOT EXISTS note_body (
+                note_body_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                body_hash TEXT NOT NULL UNIQUE,
+                content TEXT NOT NULL,
+                content_bytes INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            "ALTER TABLE note ADD COLUMN note_body_id INTEGER REFERENCES note_body (note_body_id)",
+            "ALTER TABLE note ADD COLUMN analysis_note_id INTEGER REFERENCES note (note_id) ON DELETE SET NULL",
+            "CREATE INDEX IF NOT EXISTS idx_note_note_body_id ON note (note_body_id)",
+            "CREATE INDEX IF NOT EXISTS idx_note_analysis_note_id ON note (analysis_note_id) WHERE analysis_note_id IS NOT NULL",
+            # A body goes with the last note using it
+            """
+            CREATE TRIGGER IF NOT EXISTS note_body_release AFTER DELETE ON note
+            WHEN old.note_body_id IS NOT NULL BEGIN
+                DELETE FROM note_body
+                WHERE note_body_id = old.note_body_id
+                AND NOT EXISTS (SELECT 1 FROM note WHERE note_body_id = old.note_body_id);
+            END
+            """,
+            # Deleting a note whose analysis is shared hands the summary and questions (with their
+            # options and gradings) to the oldest linked note, which the others then point at
+            """
+            CREATE TRIGGER IF NOT EXISTS note_analysis_handover BEFORE DELETE ON note
+            WHEN EXISTS (SELECT 1 FROM note WHERE analysis_note_id = old.note_id) BEGIN
+                UPDATE summary SET note_id = (SELECT MIN(note_id) FROM note WHERE analysis_note_id = old.note_id)
+                WHERE note_id = old.note_id;
+                UPDATE question SET note_id = (SELECT MIN(note_id) FROM note WHERE analysis_note_id = old.note_id)
+                WHERE note_id = old.note_id;
+                UPDATE note SET analysis_note_id = (SELECT MIN(note_id) FROM note WHERE analysis_note_id = old.note_id)
+                WHERE analysis_note_id = old.note_id
+                AND note_id <> (SELECT MIN(note_id) FROM note WHERE analysis_note_id = old.note_id);
+                UPDATE note SET analysis_note_id = NULL WHERE analysis_note_id = old.note_id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_summary_move AFTER UPDATE OF note_id ON summary BEGIN
+                UPDATE note_search SET note_id = new.note_id WHERE rowid = new.summary_id * 4 + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS note_search_question_move AFTER UPDATE OF note_id ON question BEGIN
+                UPDATE note_search SET note_id = new.note_id
+                WHERE rowid = new.question_id * 4 + 2
+                OR rowid IN (SELECT grading_id * 4 + 3 FROM grading WHERE question_id = new.question_id);
+            END
+            """,
+        ],
+        "apply": move_note_bodies,
+    },
+]
+
+
+class SchemaMigrator:
+
+    @staticmethod
+    def latest_version() -> int:
+        return MIGRATIONS[-1]["version"] if MIGRATIONS else 0
+
+    @staticmethod
+    def get_version(cursor: sqlite3.Cursor) -> int:
+        cursor.execute("PRAGMA user_version;")
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def get_pending(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+        current_version = SchemaMigrator.get_version(cursor)
+        return [migration for migration in MIGRATIONS if migration["version"] > current_version]
+
+    @staticmethod
+    def migrate(conn: sqlite3.Connection, cursor: sqlite3.Cursor) -> List[int]:
+        """
+        Apply pending migrations, each in its own transaction
+
+        Returns:
+            Versions that were applied; empty when the database is current, in which case
+            the only statement executed is the user_version lookup
+        """
+        if not SchemaMigrator.get_pending(cursor):
+            return []
+
+        # Migrations manage their own transactions
+        if conn.in_transaction:
+            conn.commit()
+
+        applied = []
+        for migration in MIGRATIONS:
+            # IMMEDIATE takes the write lock up front, so a second process migrating the
+            # same file waits here and then sees the version already bumped
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                if SchemaMigrator.get_version(cursor) >= migration["version"]:
+                    cursor.execute("COMMIT;")
+                    continue
+
+                SchemaMigrator._apply(cursor, migration)
+                cursor.execute(f"PRAGMA user_version = {int(migration['version'])};")
+                cursor.execute("COMMIT;")
+            except Exception:
+                logging.error(f"Migration {migration['version']} failed: {traceback.format_exc()}")
+                try:
+                    cursor.execute("ROLLBACK;")
+                except sqlite3.Error:
+                    pass
+                raise
+
+            logging.info(f"Applied migration {migration['version']}: {migration['description']}")
+            applied.append(migration["version"])
+
+        return applied
+
+    @staticmethod
+    def dry_run_report(cursor: sqlite3.Cursor) -> str:
+        current_version = SchemaMigrator.get_version(cursor)
+        pending = [migration for migration in MIGRATIONS if migration["version"] > current_version]
+
+        lines = [f"Schema version {current_version}, latest {SchemaMigrator.latest_version()}"]
+        if not pending:
+            lines.append("Database is up to date")
+        for migration in pending:
+            lines.append(f"  pending {migration['version']}: {migration['description']}")
+            for statement in migration.get("statements", []):
+                lines.append("    " + " ".join(statement.split()))
+            if "apply" in migration:
+                lines.append(f"    data migration {migration['apply'].__name__}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _apply(cursor: sqlite3.Cursor, migration: Dict[str, Any]) -> None:
+        for statement in migration.get("statements", []):
+            cursor.execute(statement)
+
+        apply: Callable[[sqlite3.Cursor], None] = migration.get("apply")
+        if apply:
+            apply(cursor)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join("data", "my_app_database.db"))
+    parser.add_argument("--apply", action="store_true", help="Apply pending migrations instead of reporting them")
+    args = parser.parse_args()
+
+    if not args.apply:
+        # Read-only, so a dry run can never create or modify the file
+        conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        TextCompression.register(conn)
+        try:
+            print(SchemaMigrator.dry_run_report(conn.cursor()))
+        finally:
+            conn.close()
+        return
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    TextCompression.register(conn)
+    try:
+        applied = SchemaMigrator.migrate(conn, conn.cursor())
+        print(f"Applied migrations: {applied}" if applied else "Database is up to date")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import logging
 import traceback
 import os
 from datetime import datetime
+from .connection_pool import ConnectionPool, PooledConnection
+from .migrations import SchemaMigrator
 
 # Register a custom adapter to serialize datetime objects to ISO-8601 strings.
 # This avoids the deprecated default datetime adapter warning in Python 3.12+.
@@ -14,7 +16,7 @@ except Exception:
     pass
 
 class MyDB:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, pool_size: int = None):
         if db_path is None:
             # Use data directory if it exists, otherwise use current directory
             data_dir = "data"
@@ -23,13 +25,20 @@ class MyDB:
             else:
                 self.db_path = "my_app_database.db"
         else:
+            # Fails now rather than on the first read of a database the readers cannot see
+            ConnectionPool.check_db_path(db_path)
             self.db_path = db_path
+        # Bounds the read connections; None falls back to BACK_NOTE_DB_POOL_SIZE, then the pool default
+        self.pool_size = pool_size
+        self.pool = None
         self.conn = None
         self.cursor = None
 
     def connect(self):
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            # Reads run on per-thread read-only WAL connections, writes on one shared writer; conn and cursor route each statement
+            self.pool = ConnectionPool(self.db_path, self.pool_size)
+            self.conn = PooledConnection(self.pool)
             self.cursor = self.conn.cursor()
             self.cursor.execute("PRAGMA foreign_keys = ON;")
             self._initialize_schema()
@@ -42,99 +51,10 @@ class MyDB:
 
     def _initialize_schema(self):
         try:
-            # Create api_key table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS api_key (
-                    api_key_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    api_key TEXT NOT NULL,
-                    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Create note table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS note (
-                    note_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    note_name TEXT NOT NULL,
-                    note_content TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Create note_hashtag table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS note_hashtag (
-                    note_hashtag_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    hashtag TEXT NOT NULL UNIQUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Create note_note_hashtags junction table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS note_note_hashtags (
-                    note_id INTEGER NOT NULL,
-                    note_hashtag_id INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    deleted_at TIMESTAMP DEFAULT NULL,
-                    FOREIGN KEY (note_id) REFERENCES note (note_id) ON DELETE CASCADE,
-                    FOREIGN KEY (note_hashtag_id) REFERENCES note_hashtag (note_hashtag_id) ON DELETE CASCADE,
-                    PRIMARY KEY (note_id, note_hashtag_id)
-                )
-            """)
-            
-            # Create summary table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS summary (
-                    summary_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    note_id INTEGER NOT NULL,
-                    summary TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (note_id) REFERENCES note (note_id) ON DELETE CASCADE
-                )
-            """)
-
-            # Create question table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS question (
-                    question_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    note_id INTEGER NOT NULL,
-                    question TEXT NOT NULL,
-                    question_type TEXT NOT NULL,
-                    preview_answer TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (note_id) REFERENCES note (note_id) ON DELETE CASCADE
-                )
-            """)
-
-            # Create option table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS option (
-                    option_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    question_id INTEGER NOT NULL,
-                    option TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (question_id) REFERENCES question (question_id) ON DELETE CASCADE
-                )
-            """)
-
-            # Create grading table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS grading (
-                    grading_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    question_id INTEGER NOT NULL,
-                    user_answer TEXT,
-                    real_answer TEXT NOT NULL,
-                    score TEXT NOT NULL,
-                    correction_and_explanation TEXT NOT NULL,
-                    additional_context TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (question_id) REFERENCES question (question_id) ON DELETE CASCADE
-                )
-            """)
-            
-            self.conn.commit()
+            # Versioned migrations; a current database only costs the user_version lookup
+            applied = SchemaMigrator.migrate(self.conn, self.cursor)
+            if applied:
+                logging.info(f"Database migrated to schema version {applied[-1]}")
             
         except sqlite3.Error as e:
             logging.error(f"Database schema initialization error: {traceback.format_exc()}")
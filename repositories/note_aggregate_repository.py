@@ -0,0 +1,110 @@
+import sqlite3
+from datetime import datetime
+from typing import Any, Optional
+import logging
+import traceback
+from repositories.connection_pool import read_snapshot
+from repositories.grading_repository import GradingRepository
+from repositories.note_repository import NoteRepository
+from repositories.rows import GradingRow, NoteDetailRow
+from repositories.text_compression import TextCompression
+
+class NoteAggregateRepository:
+    """Loads everything the note detail screen shows in a fixed number of queries"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        try:
+            self.conn = conn
+            self.cursor = self.conn.cursor()
+        except Exception as e:
+            logging.error(f"Failed to initialize NoteAggregateRepository: {traceback.format_exc()}")
+            raise Exception(f"Failed to initialize NoteAggregateRepository: {str(e)}")
+
+    def get_note_aggregate(self, note_id: int) -> Optional[dict[str, Any]]:
+        """
+        Returns None when the note does not exist, otherwise:
+            {"note": NoteDetailRow,
+             "hashtags": [hashtag, ...],
+             "analysis_note_id": note the summary and questions belong to when shared, else None,
+             "summary": latest summary text or None,
+             "questions": [{"question_id", "question", "question_type", "preview_answer", "created_at",
+                            "options": [option, ...], "grading": GradingRow or None}, ...]}
+        """
+        try:
+            if not isinstance(note_id, int) or note_id <= 0:
+                raise ValueError("Invalid note ID")
+
+            # One snapshot, so a concurrent delete or regrade cannot tear the aggregate
+            with read_snapshot(self.conn):
+                self.cursor.execute(f"""
+                    SELECT n.note_id, n.note_name, {NoteRepository.CONTENT_COLUMN}, n.created_at, n.analysis_note_id
+                    FROM {NoteRepository.CONTENT_SOURCE} WHERE n.note_id = ?
+                """, (note_id,))
+                row = TextCompression.decode_row(self.cursor.fetchone(), (2,))
+                if not row:
+                    return None
+                note = NoteDetailRow._make(row[:4])
+                analysis_note_id: Optional[int] = row[4]
+                # Summary, questions, options and gradings are read from the note that owns them
+                owner_id = analysis_note_id or note_id
+
+                self.cursor.execute("""
+                    SELECT nh.hashtag
+                    FROM note_hashtag nh
+                    JOIN note_note_hashtags nnh ON nh.note_hashtag_id = nnh.note_hashtag_id
+                    WHERE nnh.note_id = ? AND nnh.deleted_at IS NULL
+                """, (note_id,))
+                hashtags = [row[0] for row in self.cursor.fetchall()]
+
+                self.cursor.execute(
+                    "SELECT summary FROM summary WHERE note_id = ? ORDER BY summary_id DESC LIMIT 1", (owner_id,)
+                )
+                summary_row = self.cursor.fetchone()
+
+                self.cursor.execute("""
+                    SELECT question_id, question, question_type, preview_answer, created_at
+                    FROM question WHERE note_id = ? ORDER BY question_id
+                """, (owner_id,))
+                questions = {
+                    row[0]: {
+                        "question_id": row[0],
+                        "question": row[1],
+                        "question_type": row[2],
+                        "preview_answer": row[3],
+                        "created_at": row[4],
+                        "options": [],
+                        "grading": None
+                    }
+                    for row in self.cursor.fetchall()
+                }
+
+                self.cursor.execute("""
+                    SELECT o.question_id, o.option
+                    FROM option o JOIN question q ON q.question_id = o.question_id
+                    WHERE q.note_id = ? ORDER BY o.option_id
+                """, (owner_id,))
+                for question_id, option in self.cursor.fetchall():
+                    questions[question_id]["options"].append(option)
+
+                self.cursor.execute(f"""
+                    SELECT {", ".join("g." + column for column in GradingRepository.COLUMNS)}
+                    FROM grading g JOIN question q ON q.question_id = g.question_id
+                    WHERE q.note_id = ? ORDER BY g.grading_id
+                """, (owner_id,))
+                for grading in self.cursor.fetchall():
+                    # Ordered by ID, so the latest grading of a question wins
+                    questions[grading[1]]["grading"] = GradingRow._make(TextCompression.decode_row(grading, GradingRepository.COMPRESSED_COLUMNS))
+
+                return {
+                    "note": note,
+                    "hashtags": hashtags,
+                    "analysis_note_id": analysis_note_id,
+                    "summary": TextCompression.decode(summary_row[0]) if summary_row else None,
+                    "questions": list(questions.values())
+                }
+        except sqlite3.Error as e:
+            logging.error(f"Database error in get_note_aggregate: {traceback.format_exc()}")
+            raise Exception(f"Failed to retrieve note aggregate: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in get_note_aggregate: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error retrieving note aggregate: {str(e)}")
@@ -1,13 +1,18 @@
 import sqlite3
 from datetime import datetime
+from typing import Optional
 import logging
 import traceback
+from repositories.connection_pool import after_commit, unit_of_work
+from repositories.prefix_index import PrefixIndex
 
 class NoteHashtagRepository:
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(self, conn: sqlite3.Connection, hashtag_index: Optional[PrefixIndex] = None):
+        """hashtag_index: shared in-memory index of hashtags, kept current by the insert methods"""
         try:
             self.conn = conn
             self.cursor = self.conn.cursor()
+            self.hashtag_index = hashtag_index
         except Exception as e:
             logging.error(f"Failed to initialize NoteHashtagRepository: {traceback.format_exc()}")
             raise Exception(f"Failed to initialize NoteHashtagRepository: {str(e)}")
@@ -26,38 +31,43 @@ class NoteHashtagRepository:
                 logging.info(f"No hashtags to insert for note ID {note_id}")
                 return
             
-            for hashtag in hashtags:
-                if not isinstance(hashtag, str) or not hashtag.strip():
-                    logging.warning(f"Skipping invalid hashtag: {hashtag}")
-                    continue
+            stored_hashtags = []
+            # One unit of work: a hashtag skipped on a DB error does not roll back the ones before it
+            with unit_of_work(self.conn):
+                for hashtag in hashtags:
+                    if not isinstance(hashtag, str) or not hashtag.strip():
+                        logging.warning(f"Skipping invalid hashtag: {hashtag}")
+                        continue
                 
-                # 먼저 해시태그가 존재하는지 확인하고, 없으면 생성
-                try:
-                    self.cursor.execute("SELECT note_hashtag_id FROM note_hashtag WHERE hashtag = ?", (hashtag,))
-                    result = self.cursor.fetchone()
+                    # 먼저 해시태그가 존재하는지 확인하고, 없으면 생성
+                    try:
+                        self.cursor.execute("SELECT note_hashtag_id FROM note_hashtag WHERE hashtag = ?", (hashtag,))
+                        result = self.cursor.fetchone()
                     
-                    if result:
-                        note_hashtag_id = result[0]
-                    else:
-                        self.cursor.execute("INSERT INTO note_hashtag (hashtag) VALUES (?)", (hashtag,))
-                        note_hashtag_id = self.cursor.lastrowid
+                        if result:
+                            note_hashtag_id = result[0]
+                        else:
+                            self.cursor.execute("INSERT INTO note_hashtag (hashtag) VALUES (?)", (hashtag,))
+                            note_hashtag_id = self.cursor.lastrowid
                     
-                    # 노트와 해시태그 연결
-                    try:
-                        self.cursor.execute(
-                            "INSERT INTO note_note_hashtags (note_id, note_hashtag_id) VALUES (?, ?)", 
-                            (note_id, note_hashtag_id)
-                        )
-                    except sqlite3.IntegrityError:
-                        # 이미 연결되어 있는 경우 무시
-                        logging.info(f"Hashtag '{hashtag}' already linked to note ID {note_id}")
-                        pass
+                        # 노트와 해시태그 연결
+                        try:
+                            self.cursor.execute(
+                                "INSERT INTO note_note_hashtags (note_id, note_hashtag_id) VALUES (?, ?)", 
+                                (note_id, note_hashtag_id)
+                            )
+                        except sqlite3.IntegrityError:
+                            # 이미 연결되어 있는 경우 무시
+                            logging.info(f"Hashtag '{hashtag}' already linked to note ID {note_id}")
+                            pass
+                        stored_hashtags.append(hashtag)
                         
-                except sqlite3.Error as e:
-                    logging.error(f"Database error processing hashtag '{hashtag}': {str(e)}")
-                    continue
+                    except sqlite3.Error as e:
+                        logging.error(f"Database error processing hashtag '{hashtag}': {str(e)}")
+                        continue
             
-            self.conn.commit()
+                self.conn.commit()
+                self._index_hashtags(stored_hashtags)
         except sqlite3.Error as e:
             logging.error(f"Database error in insert_note_hashtags: {traceback.format_exc()}")
             raise Exception(f"Failed to insert note hashtags: {str(e)}")
@@ -65,6 +75,71 @@ class NoteHashtagRepository:
             logging.error(f"Unexpected error in insert_note_hashtags: {traceback.format_exc()}")
             raise Exception(f"Unexpected error inserting note hashtags: {str(e)}")
 
+    def insert_hashtags(self, hashtags: list[str], note_id: int = None) -> dict[str, int]:
+        """Create missing hashtags in bulk and optionally link them all to a note; returns hashtag -> ID"""
+        try:
+            # Input validation
+            if note_id is not None and (not isinstance(note_id, int) or note_id <= 0):
+                raise ValueError("Invalid note ID")
+            
+            if not isinstance(hashtags, list):
+                raise ValueError("Hashtags must be a list")
+            
+            valid_hashtags = []
+            for hashtag in hashtags:
+                if not isinstance(hashtag, str) or not hashtag.strip():
+                    logging.warning(f"Skipping invalid hashtag: {hashtag}")
+                    continue
+                if hashtag not in valid_hashtags:
+                    valid_hashtags.append(hashtag)
+            
+            if not valid_hashtags:
+                return {}
+            
+            self.cursor.executemany(
+                "INSERT OR IGNORE INTO note_hashtag (hashtag) VALUES (?)",
+                [(hashtag,) for hashtag in valid_hashtags]
+            )
+            placeholders = ','.join('?' * len(valid_hashtags))
+            self.cursor.execute(
+                f"SELECT hashtag, note_hashtag_id FROM note_hashtag WHERE hashtag IN ({placeholders})",
+                valid_hashtags
+            )
+            hashtag_ids = dict(self.cursor.fetchall())
+            
+            if note_id is not None:
+                # Re-adding a tag that was removed from the note revives the link
+                self.cursor.executemany(
+                    """
+                    INSERT INTO note_note_hashtags (note_id, note_hashtag_id) VALUES (?, ?)
+                    ON CONFLICT (note_id, note_hashtag_id) DO UPDATE SET deleted_at = NULL
+                    """,
+                    [(note_id, hashtag_ids[hashtag]) for hashtag in valid_hashtags]
+                )
+            
+            self.conn.commit()
+            self._index_hashtags(list(hashtag_ids))
+            return hashtag_ids
+        except sqlite3.IntegrityError as e:
+            logging.error(f"Integrity error in insert_hashtags: {traceback.format_exc()}")
+            raise Exception(f"Hashtags violate database constraints: {str(e)}")
+        except sqlite3.Error as e:
+            logging.error(f"Database error in insert_hashtags: {traceback.format_exc()}")
+            raise Exception(f"Failed to insert hashtags: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in insert_hashtags: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error inserting hashtags: {str(e)}")
+
+    def _index_hashtags(self, hashtags: list[str]) -> None:
+        if self.hashtag_index is None or not hashtags:
+            return
+        
+        def add_hashtags() -> None:
+            for hashtag in hashtags:
+                self.hashtag_index.add(hashtag, hashtag)
+        
+        after_commit(self.conn, add_hashtags)
+
     def get_hashtags_by_note_id(self, note_id: int) -> list[str]:
         try:
             if not isinstance(note_id, int) or note_id <= 0:
@@ -95,6 +170,32 @@ class NoteHashtagRepository:
             logging.error(f"Unexpected error in get_all_hashtags: {traceback.format_exc()}")
             raise Exception(f"Unexpected error retrieving all hashtags: {str(e)}")
     
+    def get_live_hashtags(self, limit: int = None) -> list[tuple[str, int]]:
+        """(hashtag, usage_count) for tags linked to at least one note, most used first"""
+        try:
+            if limit is not None and (not isinstance(limit, int) or limit <= 0):
+                raise ValueError("Limit must be a positive integer")
+            
+            # Counts are kept by triggers on note_note_hashtags; this reads idx_note_hashtag_usage in order
+            query = """
+                SELECT hashtag, usage_count FROM note_hashtag
+                WHERE usage_count > 0
+                ORDER BY usage_count DESC, hashtag
+            """
+            params = ()
+            if limit is not None:
+                query += " LIMIT ?"
+                params = (limit,)
+            
+            self.cursor.execute(query, params)
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Database error in get_live_hashtags: {traceback.format_exc()}")
+            raise Exception(f"Failed to retrieve live hashtags: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in get_live_hashtags: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error retrieving live hashtags: {str(e)}")
+    
     def search_hashtags(self, search_term: str) -> list[str]:
         """Search hashtags by partial match for autocomplete"""
         try:
@@ -113,6 +214,35 @@ class NoteHashtagRepository:
             logging.error(f"Unexpected error in search_hashtags: {traceback.format_exc()}")
             raise Exception(f"Unexpected error searching hashtags: {str(e)}")
 
+    def suggest_hashtags(self, prefix: str, limit: int = 10) -> list[str]:
+        """Hashtags starting with prefix, ignoring case; served from hashtag_index when there is one"""
+        try:
+            if not isinstance(prefix, str):
+                raise ValueError("Search term must be a string")
+            
+            if not isinstance(limit, int) or limit <= 0:
+                raise ValueError("Limit must be a positive integer")
+            
+            prefix = prefix.strip()
+            if not prefix:
+                return []
+            
+            if self.hashtag_index is not None:
+                return self.hashtag_index.search(prefix, limit)
+            
+            escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            self.cursor.execute(
+                "SELECT hashtag FROM note_hashtag WHERE hashtag LIKE ? ESCAPE '\\' ORDER BY hashtag COLLATE NOCASE LIMIT ?",
+                (f"{escaped}%", limit)
+            )
+            return [row[0] for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error(f"Database error in suggest_hashtags: {traceback.format_exc()}")
+            raise Exception(f"Failed to suggest hashtags: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in suggest_hashtags: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error suggesting hashtags: {str(e)}")
+
     def delete_hashtag_from_note(self, note_id: int, hashtag: str) -> bool:
         """노트에서 특정 해시태그를 삭제합니다."""
         try:
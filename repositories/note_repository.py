@@ -1,21 +1,48 @@
 from datetime import datetime
+from typing import Any, Iterator, Optional
+import hashlib
 import sqlite3
 import logging
 import traceback
+from repositories.connection_pool import after_commit
+from repositories.prefix_index import PrefixIndex
+from repositories.rows import NoteDetailRow, NoteRow
+from repositories.text_compression import TextCompression
 
 class NoteRepository:
-    def __init__(self, conn: sqlite3.Connection):
+    SEARCH_ORDERS = {
+        "newest": "n.created_at DESC, n.note_id DESC",
+        "oldest": "n.created_at ASC, n.note_id ASC"
+    }
+    # Row-value comparison that continues each order after a (created_at, note_id) cursor
+    KEYSET_CONDITIONS = {
+        "newest": "(n.created_at, n.note_id) < (?, ?)",
+        "oldest": "(n.created_at, n.note_id) > (?, ?)"
+    }
+    DEFAULT_PAGE_SIZE = 20
+    # Trigram-matched names re-ranked in Python for each suggestion list
+    SUGGESTION_CANDIDATES = 200
+    MIN_TRIGRAM_OVERLAP = 0.3
+    # Note contents decoded and held in memory at a time by iter_note_content
+    CONTENT_BATCH_SIZE = 50
+    # Content lives in note_body (schema migration 9); notes without a body keep it in note_content
+    CONTENT_SOURCE = "note n LEFT JOIN note_body b ON b.note_body_id = n.note_body_id"
+    CONTENT_COLUMN = "COALESCE(b.content, n.note_content)"
+
+    def __init__(self, conn: sqlite3.Connection, name_index: Optional[PrefixIndex] = None):
+        """name_index: shared in-memory index of note names, kept current by insert_note and delete_note"""
         try:
             self.conn = conn
             self.cursor = self.conn.cursor()
+            self.name_index = name_index
         except Exception as e:
             logging.error(f"Failed to initialize NoteRepository: {traceback.format_exc()}")
             raise Exception(f"Failed to initialize NoteRepository: {str(e)}")
 
-    def get_all_notes(self) -> list[tuple[int, int, str, str, datetime]]:
+    def get_all_notes(self) -> list[NoteRow]:
         try:
             self.cursor.execute("SELECT note_id, note_name, created_at FROM note")
-            return self.cursor.fetchall()
+            return [NoteRow._make(row) for row in self.cursor]
         except sqlite3.Error as e:
             logging.error(f"Database error in get_all_notes: {traceback.format_exc()}")
             raise Exception(f"Failed to retrieve notes: {str(e)}")
@@ -27,7 +54,7 @@ class NoteRepository:
         """Get all note names for autocomplete"""
         try:
             self.cursor.execute("SELECT note_name FROM note")
-            return [row[0] for row in self.cursor.fetchall()]
+            return [row[0] for row in self.cursor]
         except sqlite3.Error as e:
             logging.error(f"Database error in get_all_note_names: {traceback.format_exc()}")
             raise Exception(f"Failed to retrieve note names: {str(e)}")
@@ -36,16 +63,42 @@ class NoteRepository:
             raise Exception(f"Unexpected error retrieving note names: {str(e)}")
     
     def get_all_note_content(self) -> list[str]:
-        """Get all note content for autocomplete"""
+        """
+        Get all note content for autocomplete.
+        Holds every transcript in memory at once; prefer iter_note_content to walk them.
+        """
         try:
-            self.cursor.execute("SELECT note_content FROM note")
-            return [row[0] for row in self.cursor.fetchall()]
-        except sqlite3.Error as e:
-            logging.error(f"Database error in get_all_note_content: {traceback.format_exc()}")
-            raise Exception(f"Failed to retrieve note content: {str(e)}")
+            return [note_content for _, note_content in self.iter_note_content()]
         except Exception as e:
-            logging.error(f"Unexpected error in get_all_note_content: {traceback.format_exc()}")
-            raise Exception(f"Unexpected error retrieving note content: {str(e)}")
+            logging.error(f"Error in get_all_note_content: {traceback.format_exc()}")
+            raise Exception(f"Failed to retrieve note content: {str(e)}")
+    
+    def iter_note_content(self, batch_size: int = CONTENT_BATCH_SIZE) -> Iterator[tuple[int, str]]:
+        """
+        (note_id, note_content) of every note in note_id order, read batch_size notes at a time.
+        Each batch is a keyset query of its own, so other reads on this repository between
+        items do not disturb the walk.
+        """
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError("Batch size must be a positive integer")
+        
+        last_id = 0
+        while True:
+            try:
+                self.cursor.execute(f"""
+                    SELECT n.note_id, {self.CONTENT_COLUMN} FROM {self.CONTENT_SOURCE}
+                    WHERE n.note_id > ? ORDER BY n.note_id LIMIT ?
+                """, (last_id, batch_size))
+                rows = self.cursor.fetchall()
+            except sqlite3.Error as e:
+                logging.error(f"Database error in iter_note_content: {traceback.format_exc()}")
+                raise Exception(f"Failed to retrieve note content: {str(e)}")
+            
+            if not rows:
+                return
+            for note_id, stored in rows:
+                yield note_id, TextCompression.decode(stored)
+            last_id = rows[-1][0]
     
     def search_note_names(self, search_term: str) -> list[str]:
         """Search note names by partial match for autocomplete"""
@@ -56,8 +109,9 @@ class NoteRepository:
             if not search_term.strip():
                 return []
             
-            self.cursor.execute("SELECT note_name FROM note WHERE note_name LIKE ? LIMIT 10", (f"%{search_term}%",))
-            return [row[0] for row in self.cursor.fetchall()]
+            # The trigram index (schema migration 6) serves substring LIKE for terms of 3+ characters
+            self.cursor.execute("SELECT note_name FROM note_title_trigram WHERE note_name LIKE ? LIMIT 10", (f"%{search_term}%",))
+            return [row[0] for row in self.cursor]
         except sqlite3.Error as e:
             logging.error(f"Database error in search_note_names: {traceback.format_exc()}")
             raise Exception(f"Failed to search note names: {str(e)}")
@@ -65,6 +119,65 @@ class NoteRepository:
             logging.error(f"Unexpected error in search_note_names: {traceback.format_exc()}")
             raise Exception(f"Unexpected error searching note names: {str(e)}")
     
+    @staticmethod
+    def _trigrams(text: str) -> set[str]:
+        text = " ".join(text.lower().split())
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    def suggest_note_names(self, partial: str, limit: int = 10) -> list[str]:
+        """
+        Up to limit distinct note names closest to a partial, possibly misspelled title.
+        Names starting with the input come first, from name_index when there is one. The rest
+        share trigrams with the input, come from the trigram index and are ranked by the share
+        of the input's trigrams they contain, prefix matches first on ties.
+        Inputs shorter than 3 characters only get prefix matches.
+        """
+        try:
+            if not isinstance(partial, str):
+                raise ValueError("Search term must be a string")
+            
+            if not isinstance(limit, int) or limit <= 0:
+                raise ValueError("Limit must be a positive integer")
+            
+            query = " ".join(partial.lower().split())
+            if not query:
+                return []
+            
+            # Names starting with the input come from the in-memory index without touching the database
+            prefix_matches = self.name_index.search(query, limit) if self.name_index is not None else []
+            if len(prefix_matches) >= limit:
+                return prefix_matches
+            
+            query_trigrams = self._trigrams(query)
+            if not query_trigrams:
+                names = prefix_matches or [name for _, name, _ in self.search_notes(title=query, limit=limit * 2)]
+                return list(dict.fromkeys(names))[:limit]
+            
+            # Each trigram is quoted, so the input is never read as FTS5 syntax
+            match_query = " OR ".join('"' + trigram.replace('"', '""') + '"' for trigram in sorted(query_trigrams))
+            self.cursor.execute(
+                "SELECT note_name FROM note_title_trigram WHERE note_title_trigram MATCH ? ORDER BY rank LIMIT ?",
+                (match_query, self.SUGGESTION_CANDIDATES)
+            )
+            
+            ranked = []
+            for name in dict.fromkeys(row[0] for row in self.cursor.fetchall()):
+                name_trigrams = self._trigrams(name)
+                overlap = len(query_trigrams & name_trigrams) / len(query_trigrams)
+                if overlap < self.MIN_TRIGRAM_OVERLAP:
+                    continue
+                similarity = len(query_trigrams & name_trigrams) / len(query_trigrams | name_trigrams)
+                ranked.append((-overlap, not name.lower().startswith(query), -similarity, name))
+            ranked.sort()
+            fuzzy_matches = [name for *_, name in ranked if name not in prefix_matches]
+            return (prefix_matches + fuzzy_matches)[:limit]
+        except sqlite3.Error as e:
+            logging.error(f"Database error in suggest_note_names: {traceback.format_exc()}")
+            raise Exception(f"Failed to suggest note names: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in suggest_note_names: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error suggesting note names: {str(e)}")
+    
     def search_note_content(self, search_term: str) -> list[str]:
         """Search note content by partial match for autocomplete"""
         try:
@@ -74,8 +187,11 @@ class NoteRepository:
             if not search_term.strip():
                 return []
             
-            self.cursor.execute("SELECT note_content FROM note WHERE note_content LIKE ? LIMIT 10", (f"%{search_term}%",))
-            return [row[0] for row in self.cursor.fetchall()]
+            self.cursor.execute(
+                f"SELECT {self.CONTENT_COLUMN} FROM {self.CONTENT_SOURCE} WHERE decompress_text({self.CONTENT_COLUMN}) LIKE ? LIMIT 10",
+                (f"%{search_term}%",)
+            )
+            return [TextCompression.decode(row[0]) for row in self.cursor]
         except sqlite3.Error as e:
             logging.error(f"Database error in search_note_content: {traceback.format_exc()}")
             raise Exception(f"Failed to search note content: {str(e)}")
@@ -83,15 +199,105 @@ class NoteRepository:
             logging.error(f"Unexpected error in search_note_content: {traceback.format_exc()}")
             raise Exception(f"Unexpected error searching note content: {str(e)}")
     
-    def get_note(self, note_id: int) -> tuple[int, int, str, str, datetime]:
+    def search_notes(self, title: str = None, hashtag: str = None, order: str = "newest",
+                     limit: int = None, after: tuple = None) -> list[NoteRow]:
+        """
+        Notes whose name starts with title and that carry hashtag, both case-insensitive.
+        Matching, joining and sorting run in SQL on the NOCASE indexes.
+        after is a (created_at, note_id) keyset cursor: only notes past it in the given order are returned.
+        """
+        try:
+            if title is not None and not isinstance(title, str):
+                raise ValueError("Title must be a string")
+            
+            if hashtag is not None and not isinstance(hashtag, str):
+                raise ValueError("Hashtag must be a string")
+            
+            if order not in self.SEARCH_ORDERS:
+                raise ValueError(f"Invalid order. Must be one of: {list(self.SEARCH_ORDERS)}")
+            
+            if limit is not None and (not isinstance(limit, int) or limit <= 0):
+                raise ValueError("Limit must be a positive integer")
+            
+            if after is not None and (
+                not isinstance(after, (tuple, list)) or len(after) != 2
+                or not isinstance(after[1], int) or after[1] <= 0
+            ):
+                raise ValueError("Cursor must be a (created_at, note_id) pair")
+            
+            conditions, params = [], []
+            if title and title.strip():
+                # Prefix LIKE can use idx_note_name_nocase; escape the LIKE wildcards in user input
+                escaped = title.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                conditions.append("n.note_name LIKE ? ESCAPE '\\'")
+                params.append(f"{escaped}%")
+            
+            if hashtag and hashtag.strip():
+                conditions.append("""
+                    n.note_id IN (
+                        SELECT nnh.note_id
+                        FROM note_hashtag nh
+                        JOIN note_note_hashtags nnh ON nh.note_hashtag_id = nnh.note_hashtag_id
+                        WHERE nh.hashtag = ? COLLATE NOCASE AND nnh.deleted_at IS NULL
+                    )
+                """)
+                params.append(hashtag.strip())
+            
+            if after is not None:
+                # Seeks on idx_note_created_at (which carries note_id as the rowid) instead of skipping OFFSET rows
+                conditions.append(self.KEYSET_CONDITIONS[order])
+                params.extend(after)
+            
+            query = "SELECT n.note_id, n.note_name, n.created_at FROM note n"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += f" ORDER BY {self.SEARCH_ORDERS[order]}"
+            if limit is not None:
+                query += " LIMIT ?"
+                params.append(limit)
+            
+            self.cursor.execute(query, params)
+            return [NoteRow._make(row) for row in self.cursor]
+        except sqlite3.Error as e:
+            logging.error(f"Database error in search_notes: {traceback.format_exc()}")
+            raise Exception(f"Failed to search notes: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in search_notes: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error searching notes: {str(e)}")
+    
+    def get_notes_page(self, page_size: int = DEFAULT_PAGE_SIZE, after: tuple = None, title: str = None,
+                       hashtag: str = None, order: str = "newest") -> tuple[list[NoteRow], Optional[tuple]]:
+        """
+        One page of search_notes
+
+        Returns:
+            The page's notes and the cursor to pass as after for the next page, or None on the last page
+        """
+        try:
+            if not isinstance(page_size, int) or page_size <= 0:
+                raise ValueError("Page size must be a positive integer")
+            
+            # One extra row tells whether another page follows
+            notes = self.search_notes(title=title, hashtag=hashtag, order=order, limit=page_size + 1, after=after)
+            if len(notes) <= page_size:
+                return notes, None
+            
+            last_note_id, _, last_created_at = notes[page_size - 1]
+            return notes[:page_size], (last_created_at, last_note_id)
+        except Exception as e:
+            logging.error(f"Error in get_notes_page: {traceback.format_exc()}")
+            raise Exception(f"Failed to retrieve notes page: {str(e)}")
+    
+    def get_note(self, note_id: int) -> Optional[NoteDetailRow]:
         try:
             if not isinstance(note_id, int) or note_id <= 0:
                 raise ValueError("Invalid note ID")
             
-            self.cursor.execute("""
-                SELECT note_id, note_name, note_content, created_at FROM note WHERE note_id = ?
+            self.cursor.execute(f"""
+                SELECT n.note_id, n.note_name, {self.CONTENT_COLUMN}, n.created_at FROM {self.CONTENT_SOURCE} WHERE n.note_id = ?
             """, (note_id,))
-            result = self.cursor.fetchone()
+            row = TextCompression.decode_row(self.cursor.fetchone(), (2,))
+            result = NoteDetailRow._make(row) if row else None
             
             if not result:
                 logging.warning(f"No note found with ID {note_id}")
@@ -104,7 +310,45 @@ class NoteRepository:
             logging.error(f"Unexpected error in get_note: {traceback.format_exc()}")
             raise Exception(f"Unexpected error retrieving note: {str(e)}")
 
-    def insert_note(self, note_name: str, note_content: str) -> int:
+    @staticmethod
+    def hash_content(note_content: str) -> str:
+        """Key of a note body in note_body"""
+        return hashlib.sha256(note_content.encode("utf-8")).hexdigest()
+
+    def find_analyzed_duplicate(self, note_content: str) -> Optional[NoteRow]:
+        """
+        The oldest note with a summary or questions whose analysis covers this exact content:
+        a note with the same body, or the note such a note shares its analysis with.
+        """
+        try:
+            if not isinstance(note_content, str) or not note_content.strip():
+                raise ValueError("Note content cannot be empty")
+            
+            self.cursor.execute("""
+                SELECT o.note_id, o.note_name, o.created_at
+                FROM note_body b
+                JOIN note n ON n.note_body_id = b.note_body_id
+                JOIN note o ON o.note_id = COALESCE(n.analysis_note_id, n.note_id)
+                WHERE b.body_hash = ?
+                AND (EXISTS (SELECT 1 FROM summary WHERE note_id = o.note_id)
+                     OR EXISTS (SELECT 1 FROM question WHERE note_id = o.note_id))
+                ORDER BY o.note_id
+                LIMIT 1
+            """, (self.hash_content(note_content),))
+            row = self.cursor.fetchone()
+            return NoteRow._make(row) if row else None
+        except sqlite3.Error as e:
+            logging.error(f"Database error in find_analyzed_duplicate: {traceback.format_exc()}")
+            raise Exception(f"Failed to look up duplicate note: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in find_analyzed_duplicate: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error looking up duplicate note: {str(e)}")
+
+    def insert_note(self, note_name: str, note_content: str, analysis_note_id: Optional[int] = None) -> int:
+        """
+        Stores the content once per distinct text in note_body; an identical body is reused.
+        analysis_note_id: note whose summary and questions this note shows instead of its own
+        """
         try:
             # Input validation
             if not isinstance(note_name, str) or not note_name.strip():
@@ -113,9 +357,34 @@ class NoteRepository:
             if not isinstance(note_content, str) or not note_content.strip():
                 raise ValueError("Note content cannot be empty")
             
-            self.cursor.execute("INSERT INTO note (note_name, note_content) VALUES (?, ?)", (note_name, note_content))
+            if analysis_note_id is not None:
+                if not isinstance(analysis_note_id, int) or analysis_note_id <= 0:
+                    raise ValueError("Invalid analysis note ID")
+                
+                # A link always points at the note that owns the analysis
+                self.cursor.execute("SELECT COALESCE(analysis_note_id, note_id) FROM note WHERE note_id = ?", (analysis_note_id,))
+                owner = self.cursor.fetchone()
+                if not owner:
+                    raise ValueError(f"No note found with ID {analysis_note_id} to share the analysis of")
+                analysis_note_id = owner[0]
+            
+            body_hash = self.hash_content(note_content)
+            self.cursor.execute(
+                "INSERT INTO note_body (body_hash, content, content_bytes) VALUES (?, ?, ?) ON CONFLICT (body_hash) DO NOTHING",
+                (body_hash, TextCompression.encode(note_content), len(note_content.encode("utf-8")))
+            )
+            self.cursor.execute("SELECT note_body_id FROM note_body WHERE body_hash = ?", (body_hash,))
+            note_body_id = self.cursor.fetchone()[0]
+            
+            self.cursor.execute(
+                "INSERT INTO note (note_name, note_content, note_body_id, analysis_note_id) VALUES (?, '', ?, ?)",
+                (note_name, note_body_id, analysis_note_id)
+            )
+            note_id = self.cursor.lastrowid
             self.conn.commit()
-            return self.cursor.lastrowid
+            if self.name_index is not None:
+                after_commit(self.conn, lambda: self.name_index.add(note_name, note_id))
+            return note_id
         except sqlite3.IntegrityError as e:
             logging.error(f"Integrity error in insert_note: {traceback.format_exc()}")
             raise Exception(f"Note violates database constraints: {str(e)}")
@@ -132,15 +401,74 @@ class NoteRepository:
                 raise ValueError("Invalid note ID")
             
             self.cursor.execute("DELETE FROM note WHERE note_id = ?", (note_id,))
+            deleted = self.cursor.rowcount
             self.conn.commit()
             
-            if self.cursor.rowcount == 0:
+            if deleted == 0:
                 logging.warning(f"No note found with ID {note_id} for deletion")
+            elif self.name_index is not None:
+                after_commit(self.conn, lambda: self.name_index.remove(note_id))
             
-            return self.cursor.rowcount
+            return deleted
         except sqlite3.Error as e:
             logging.error(f"Database error in delete_note: {traceback.format_exc()}")
             raise Exception(f"Failed to delete note: {str(e)}")
         except Exception as e:
             logging.error(f"Unexpected error in delete_note: {traceback.format_exc()}")
-            raise Exception(f"Unexpected error deleting note: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Unexpected error deleting note: {str(e)}")
+
+    def get_storage_stats(self) -> dict[str, Any]:
+        """
+        Note content and analysis storage, in bytes of UTF-8 text unless noted:
+            notes, bodies (distinct contents), linked_notes (notes sharing another note's analysis),
+            content_bytes (every note's content), unique_bytes (each distinct content once),
+            stored_bytes (note_body as stored, after compression),
+            dedup_saved_bytes, compression_saved_bytes,
+            analysis_saved_bytes (stored summary, question and option text linked notes did not copy)
+        """
+        try:
+            self.cursor.execute("""
+                SELECT COUNT(*), COUNT(DISTINCT n.note_body_id), COUNT(n.analysis_note_id),
+                       COALESCE(SUM(COALESCE(b.content_bytes, length(CAST(n.note_content AS BLOB)))), 0)
+                FROM note n LEFT JOIN note_body b ON b.note_body_id = n.note_body_id
+            """)
+            notes, bodies, linked_notes, content_bytes = self.cursor.fetchone()
+            
+            self.cursor.execute("""
+                SELECT COALESCE(SUM(content_bytes), 0), COALESCE(SUM(length(CAST(content AS BLOB))), 0) FROM note_body
+            """)
+            unique_bytes, stored_bytes = self.cursor.fetchone()
+            
+            # Notes whose content is still inline are neither deduplicated nor counted in note_body
+            self.cursor.execute("SELECT COALESCE(SUM(length(CAST(note_content AS BLOB))), 0) FROM note WHERE note_body_id IS NULL")
+            inline_bytes = self.cursor.fetchone()[0]
+            
+            self.cursor.execute("""
+                SELECT COALESCE(SUM(
+                    (SELECT COALESCE(SUM(length(CAST(s.summary AS BLOB))), 0) FROM summary s WHERE s.note_id = n.analysis_note_id)
+                    + (SELECT COALESCE(SUM(length(CAST(q.question AS BLOB)) + length(CAST(q.preview_answer AS BLOB))), 0)
+                       FROM question q WHERE q.note_id = n.analysis_note_id)
+                    + (SELECT COALESCE(SUM(length(CAST(o.option AS BLOB))), 0)
+                       FROM option o JOIN question q ON q.question_id = o.question_id WHERE q.note_id = n.analysis_note_id)
+                ), 0)
+                FROM note n WHERE n.analysis_note_id IS NOT NULL
+            """)
+            analysis_saved_bytes = self.cursor.fetchone()[0]
+            
+            return {
+                "notes": notes,
+                "bodies": bodies,
+                "linked_notes": linked_notes,
+                "content_bytes": content_bytes,
+                "unique_bytes": unique_bytes + inline_bytes,
+                "stored_bytes": stored_bytes + inline_bytes,
+                "dedup_saved_bytes": content_bytes - unique_bytes - inline_bytes,
+                "compression_saved_bytes": unique_bytes - stored_bytes,
+                "analysis_saved_bytes": analysis_saved_bytes
+            }
+        except sqlite3.Error as e:
+            logging.error(f"Database error in get_storage_stats: {traceback.format_exc()}")
+            raise Exception(f"Failed to retrieve storage stats: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in get_storage_stats: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error retrieving storage stats: {str(e)}")
@@ -0,0 +1,98 @@
+import sqlite3
+from datetime import datetime
+from typing import Any
+import logging
+import traceback
+
+class NoteSearchRepository:
+    """Ranked full-text search over the note_search FTS5 index (schema migration 5)"""
+
+    # Kind encoded in the low bits of a note_search rowid
+    SOURCES = {0: "note", 1: "summary", 2: "question", 3: "grading"}
+    # bm25 column weights: note_id (unindexed), title, body
+    RANK_WEIGHTS = (0.0, 10.0, 1.0)
+    SNIPPET_TOKENS = 16
+
+    def __init__(self, conn: sqlite3.Connection):
+        try:
+            self.conn = conn
+            self.cursor = self.conn.cursor()
+        except Exception as e:
+            logging.error(f"Failed to initialize NoteSearchRepository: {traceback.format_exc()}")
+            raise Exception(f"Failed to initialize NoteSearchRepository: {str(e)}")
+
+    @staticmethod
+    def build_match_query(text: str) -> str:
+        """
+        FTS5 query for free text: every word must match, the last one as a prefix.
+        Words are quoted, so FTS5 operators and punctuation in the input are taken literally.
+        """
+        terms = ['"' + term.replace('"', '""') + '"' for term in text.split()]
+        if not terms:
+            return ""
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    def search(self, text: str, limit: int = 20, highlight: tuple[str, str] = ("**", "**")) -> list[dict[str, Any]]:
+        """
+        Notes matching text, best first, one result per note
+
+        Returns:
+            [{"note_id", "note_name", "created_at", "source", "snippet", "score"}, ...] where source is the
+            part of the note ("note", "summary", "question" or "grading") whose best match gave the snippet
+        """
+        try:
+            if not isinstance(text, str):
+                raise ValueError("Search text must be a string")
+
+            if not isinstance(limit, int) or limit <= 0:
+                raise ValueError("Limit must be a positive integer")
+
+            match_query = self.build_match_query(text)
+            if not match_query:
+                return []
+
+            # Best-ranked row per note; SQLite takes the bare rowid from the row holding MIN(score)
+            # (MATERIALIZED keeps bm25 in the FTS scan rather than letting the planner flatten it away)
+            self.cursor.execute("""
+                WITH hits AS MATERIALIZED (
+                    SELECT note_id, rowid, bm25(note_search, ?, ?, ?) AS score
+                    FROM note_search WHERE note_search MATCH ?
+                )
+                SELECT hits.note_id, hits.rowid, MIN(hits.score) AS best_score, n.note_name, n.created_at
+                FROM hits
+                JOIN note n ON n.note_id = hits.note_id
+                GROUP BY hits.note_id
+                ORDER BY best_score
+                LIMIT ?
+            """, (*self.RANK_WEIGHTS, match_query, limit))
+            hits = self.cursor.fetchall()
+            if not hits:
+                return []
+
+            # Snippets only for the rows that made the cut
+            rowids = [hit[1] for hit in hits]
+            placeholders = ",".join("?" * len(rowids))
+            self.cursor.execute(f"""
+                SELECT rowid, snippet(note_search, -1, ?, ?, '…', ?)
+                FROM note_search WHERE note_search MATCH ? AND rowid IN ({placeholders})
+            """, (highlight[0], highlight[1], self.SNIPPET_TOKENS, match_query, *rowids))
+            snippets = dict(self.cursor.fetchall())
+
+            return [
+                {
+                    "note_id": note_id,
+                    "note_name": note_name,
+                    "created_at": created_at,
+                    "source": self.SOURCES[rowid % 4],
+                    "snippet": snippets.get(rowid, ""),
+                    "score": score
+                }
+                for note_id, rowid, score, note_name, created_at in hits
+            ]
+        except sqlite3.Error as e:
+            logging.error(f"Database error in search: {traceback.format_exc()}")
+            raise Exception(f"Failed to search notes: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in search: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error searching notes: {str(e)}")
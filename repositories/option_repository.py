@@ -1,9 +1,14 @@
 import sqlite3
 from datetime import datetime
+from typing import Iterable, Optional
 import logging
 import traceback
+from repositories.projection import Projection
+from repositories.rows import OptionRow
 
 class OptionRepository:
+    COLUMNS = ("option_id", "question_id", "option", "created_at")
+
     def __init__(self, conn: sqlite3.Connection):
         try:
             self.conn = conn
@@ -12,7 +17,8 @@ class OptionRepository:
             logging.error(f"Failed to initialize OptionRepository: {traceback.format_exc()}")
             raise Exception(f"Failed to initialize OptionRepository: {str(e)}")
 
-    def get_all_options(self, question_ids: list[int]) -> list[tuple[int, int, str, datetime]]:
+    def get_all_options(self, question_ids: list[int], columns: Optional[Iterable[str]] = None) -> list[OptionRow]:
+        """columns: names from COLUMNS to fetch, in the order wanted; all of them by default"""
         try:
             if not question_ids:
                 return []
@@ -20,9 +26,10 @@ class OptionRepository:
             if not all(isinstance(qid, int) and qid > 0 for qid in question_ids):
                 raise ValueError("All question IDs must be positive integers")
             
+            selected = Projection.resolve(columns, self.COLUMNS)
             placeholders = ','.join('?' * len(question_ids))
-            self.cursor.execute(f"SELECT * FROM option WHERE question_id IN ({placeholders})", question_ids)
-            return self.cursor.fetchall()
+            self.cursor.execute(f"SELECT {Projection.select_list(selected)} FROM option WHERE question_id IN ({placeholders})", question_ids)
+            return [Projection.typed(row, selected, self.COLUMNS, OptionRow) for row in self.cursor]
         except sqlite3.Error as e:
             logging.error(f"Database error in get_all_options: {traceback.format_exc()}")
             raise Exception(f"Failed to retrieve options: {str(e)}")
@@ -30,14 +37,15 @@ class OptionRepository:
             logging.error(f"Unexpected error in get_all_options: {traceback.format_exc()}")
             raise Exception(f"Unexpected error retrieving options: {str(e)}")
     
-    def get_options_by_question_id(self, question_id: int) -> list[tuple[int, int, str, datetime]]:
+    def get_options_by_question_id(self, question_id: int, columns: Optional[Iterable[str]] = None) -> list[OptionRow]:
         """Get options for a specific question"""
         try:
             if not isinstance(question_id, int) or question_id <= 0:
                 raise ValueError("Invalid question ID")
             
-            self.cursor.execute("SELECT * FROM option WHERE question_id = ?", (question_id,))
-            return self.cursor.fetchall()
+            selected = Projection.resolve(columns, self.COLUMNS)
+            self.cursor.execute(f"SELECT {Projection.select_list(selected)} FROM option WHERE question_id = ?", (question_id,))
+            return [Projection.typed(row, selected, self.COLUMNS, OptionRow) for row in self.cursor]
         except sqlite3.Error as e:
             logging.error(f"Database error in get_options_by_question_id: {traceback.format_exc()}")
             raise Exception(f"Failed to retrieve options for question: {str(e)}")
@@ -83,4 +91,41 @@ class OptionRepository:
             raise Exception(f"Failed to insert options: {str(e)}")
         except Exception as e:
             logging.error(f"Unexpected error in insert_options: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error inserting options: {str(e)}")
+    
+    def insert_options_for_questions(self, options_by_question: dict[int, list[str]]) -> None:
+        """Insert the options of several questions with one executemany"""
+        try:
+            # Input validation
+            if not isinstance(options_by_question, dict):
+                raise ValueError("Options must be a dictionary keyed by question ID")
+            
+            rows = []
+            for question_id, options in options_by_question.items():
+                if not isinstance(question_id, int) or question_id <= 0:
+                    raise ValueError("Invalid question ID")
+                
+                if not isinstance(options, list):
+                    raise ValueError("Options must be a list")
+                
+                for option in options:
+                    if isinstance(option, str) and option.strip():
+                        rows.append((question_id, option.strip()))
+                    else:
+                        logging.warning(f"Skipping invalid option: {option}")
+            
+            if not rows:
+                logging.info("No options to insert")
+                return
+            
+            self.cursor.executemany("INSERT INTO option (question_id, option) VALUES (?, ?)", rows)
+            self.conn.commit()
+        except sqlite3.IntegrityError as e:
+            logging.error(f"Integrity error in insert_options_for_questions: {traceback.format_exc()}")
+            raise Exception(f"Options violate database constraints: {str(e)}")
+        except sqlite3.Error as e:
+            logging.error(f"Database error in insert_options_for_questions: {traceback.format_exc()}")
+            raise Exception(f"Failed to insert options: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in insert_options_for_questions: {traceback.format_exc()}")
             raise Exception(f"Unexpected error inserting options: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,77 @@
+import sys
+import bisect
+import threading
+from typing import Hashable, Iterable
+
+
+class PrefixIndex:
+    """
+    Case-insensitive prefix lookup over short strings (note names, hashtags), kept in memory.
+
+    Entries live in one sorted list of (casefolded value, value, entry id) tuples, so a lookup
+    is a bisect to the first key with the prefix plus a walk over the matches. Entries are
+    added and removed one at a time as the database changes; the index is shared by every
+    session of the process, so all access goes through a lock.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, Hashable]] = ()):
+        """entries: (value, entry id) pairs, e.g. (note_name, note_id) or (hashtag, hashtag)"""
+        self._lock = threading.Lock()
+        self._entries_by_id: dict[Hashable, tuple[str, str, Hashable]] = {}
+        for value, entry_id in entries:
+            self._entries_by_id[entry_id] = (value.casefold(), value, entry_id)
+        self._keys: list[tuple[str, str, Hashable]] = sorted(self._entries_by_id.values())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, value: str, entry_id: Hashable) -> None:
+        """Add or replace the entry with this id"""
+        entry = (value.casefold(), value, entry_id)
+        with self._lock:
+            old_entry = self._entries_by_id.get(entry_id)
+            if old_entry == entry:
+                return
+            if old_entry is not None:
+                self._remove_key(old_entry)
+            self._entries_by_id[entry_id] = entry
+            bisect.insort(self._keys, entry)
+
+    def remove(self, entry_id: Hashable) -> None:
+        with self._lock:
+            entry = self._entries_by_id.pop(entry_id, None)
+            if entry is not None:
+                self._remove_key(entry)
+
+    def _remove_key(self, entry: tuple[str, str, Hashable]) -> None:
+        position = bisect.bisect_left(self._keys, entry)
+        if position < len(self._keys) and self._keys[position] == entry:
+            del self._keys[position]
+
+    def search(self, prefix: str, limit: int = 10) -> list[str]:
+        """Distinct values starting with prefix (ignoring case), in alphabetical order"""
+        key = prefix.casefold()
+        results: list[str] = []
+        with self._lock:
+            position = bisect.bisect_left(self._keys, (key,))
+            while position < len(self._keys) and len(results) < limit:
+                folded, value, _ = self._keys[position]
+                if not folded.startswith(key):
+                    break
+                if not results or results[-1] != value:
+                    results.append(value)
+                position += 1
+        return results
+
+    def memory_footprint(self) -> int:
+        """Approximate bytes held by the index: its containers, entry tuples and strings"""
+        with self._lock:
+            total = sys.getsizeof(self._keys) + sys.getsizeof(self._entries_by_id)
+            for folded, value, entry_id in self._keys:
+                total += sys.getsizeof((folded, value, entry_id)) + sys.getsizeof(value)
+                # Casefolding usually returns an equal but separate string
+                if folded is not value:
+                    total += sys.getsizeof(folded)
+                if not isinstance(entry_id, str) or entry_id is not value:
+                    total += sys.getsizeof(entry_id)
+            return total
@@ -0,0 +1,50 @@
+from typing import Any, Iterable, Optional
+
+
+class Projection:
+    """
+    Column lists for repository reads, so callers fetch only the columns they use.
+
+    Each repository declares its table's COLUMNS in row order; None selects all of them,
+    which keeps the row shape of the former SELECT *. A subset comes back in the caller's order.
+    Full rows are typed (repositories.rows); projected ones stay plain tuples.
+    """
+
+    @staticmethod
+    def resolve(columns: Optional[Iterable[str]], available: tuple[str, ...]) -> tuple[str, ...]:
+        if columns is None:
+            return available
+
+        if isinstance(columns, str):
+            raise ValueError("Columns must be a list of column names")
+
+        selected = tuple(columns)
+        if not selected:
+            raise ValueError("Columns cannot be empty")
+
+        unknown = [column for column in selected if column not in available]
+        if unknown:
+            raise ValueError(f"Unknown columns {unknown}. Must be among: {list(available)}")
+
+        if len(set(selected)) != len(selected):
+            raise ValueError("Columns must not repeat")
+
+        return selected
+
+    @staticmethod
+    def select_list(selected: tuple[str, ...]) -> str:
+        # Names were checked against COLUMNS, so they are safe to format into SQL
+        return ", ".join(selected)
+
+    @staticmethod
+    def typed(row: Optional[tuple], selected: tuple[str, ...], available: tuple[str, ...], row_type: type) -> Any:
+        """row as row_type when it holds every column, else unchanged"""
+        if row is None or selected != available:
+            return row
+        return row_type._make(row)
+
+    @staticmethod
+    def positions(selected: tuple[str, ...], names: Iterable[str]) -> tuple[int, ...]:
+        """Positions of the given columns in a projected row, e.g. to decode compressed ones"""
+        names = set(names)
+        return tuple(i for i, column in enumerate(selected) if column in names)
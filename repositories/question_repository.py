@@ -1,9 +1,16 @@
 from datetime import datetime
+from typing import Iterable, Optional
 import sqlite3
 import logging
 import traceback
+from repositories.projection import Projection
+from repositories.rows import QuestionRow
 
 class QuestionRepository:
+    # Rows per multi-row INSERT, well below SQLite's bound parameter limit
+    BATCH_SIZE = 500
+    COLUMNS = ("question_id", "note_id", "question", "question_type", "preview_answer", "created_at")
+
     def __init__(self, conn: sqlite3.Connection):
         try:
             self.conn = conn
@@ -12,13 +19,15 @@ class QuestionRepository:
             logging.error(f"Failed to initialize QuestionRepository: {traceback.format_exc()}")
             raise Exception(f"Failed to initialize QuestionRepository: {str(e)}")
 
-    def get_all_questions(self, note_id: int) -> list[tuple[int, int, datetime]]:
+    def get_all_questions(self, note_id: int, columns: Optional[Iterable[str]] = None) -> list[QuestionRow]:
+        """columns: names from COLUMNS to fetch, in the order wanted; all of them by default"""
         try:
             if not isinstance(note_id, int) or note_id <= 0:
                 raise ValueError("Invalid note ID")
             
-            self.cursor.execute("SELECT * FROM question WHERE note_id = ?", (note_id,))
-            return self.cursor.fetchall()
+            selected = Projection.resolve(columns, self.COLUMNS)
+            self.cursor.execute(f"SELECT {Projection.select_list(selected)} FROM question WHERE note_id = ?", (note_id,))
+            return [Projection.typed(row, selected, self.COLUMNS, QuestionRow) for row in self.cursor]
         except sqlite3.Error as e:
             logging.error(f"Database error in get_all_questions: {traceback.format_exc()}")
             raise Exception(f"Failed to retrieve questions: {str(e)}")
@@ -26,13 +35,14 @@ class QuestionRepository:
             logging.error(f"Unexpected error in get_all_questions: {traceback.format_exc()}")
             raise Exception(f"Unexpected error retrieving questions: {str(e)}")
     
-    def get_question_by_id(self, question_id: int) -> tuple[int, int, str, str, str, datetime]:
+    def get_question_by_id(self, question_id: int, columns: Optional[Iterable[str]] = None) -> Optional[QuestionRow]:
         try:
             if not isinstance(question_id, int) or question_id <= 0:
                 raise ValueError("Invalid question ID")
             
-            self.cursor.execute("SELECT * FROM question WHERE question_id = ?", (question_id,))
-            result = self.cursor.fetchone()
+            selected = Projection.resolve(columns, self.COLUMNS)
+            self.cursor.execute(f"SELECT {Projection.select_list(selected)} FROM question WHERE question_id = ?", (question_id,))
+            result = Projection.typed(self.cursor.fetchone(), selected, self.COLUMNS, QuestionRow)
             
             if not result:
                 logging.warning(f"No question found with ID {question_id}")
@@ -79,4 +89,49 @@ class QuestionRepository:
             raise Exception(f"Failed to insert question: {str(e)}")
         except Exception as e:
             logging.error(f"Unexpected error in insert_question: {traceback.format_exc()}")
-            raise Exception(f"Unexpected error inserting question: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Unexpected error inserting question: {str(e)}")
+
+    def insert_questions(self, note_id: int, questions: list[tuple[str, str, str]]) -> list[int]:
+        """Insert (question, question_type, preview_answer) rows; returns their IDs in input order"""
+        try:
+            # Input validation
+            if not isinstance(note_id, int) or note_id <= 0:
+                raise ValueError("Invalid note ID")
+            
+            if not isinstance(questions, list):
+                raise ValueError("Questions must be a list")
+            
+            valid_types = ["multiple_choice", "short_answer", "long_answer"]
+            for question, question_type, preview_answer in questions:
+                if not isinstance(question, str) or not question.strip():
+                    raise ValueError("Question cannot be empty")
+                
+                if question_type not in valid_types:
+                    raise ValueError(f"Invalid question type. Must be one of: {valid_types}")
+                
+                if not isinstance(preview_answer, str) or not preview_answer.strip():
+                    raise ValueError("Preview answer cannot be empty")
+            
+            question_ids = []
+            for start in range(0, len(questions), self.BATCH_SIZE):
+                batch = questions[start:start + self.BATCH_SIZE]
+                self.cursor.execute(
+                    "INSERT INTO question (note_id, question, question_type, preview_answer) VALUES "
+                    + ", ".join(["(?, ?, ?, ?)"] * len(batch))
+                    + " RETURNING question_id",
+                    [value for row in batch for value in (note_id, *row)]
+                )
+                # One statement assigns increasing AUTOINCREMENT IDs in VALUES order
+                question_ids.extend(sorted(row[0] for row in self.cursor.fetchall()))
+            
+            self.conn.commit()
+            return question_ids
+        except sqlite3.IntegrityError as e:
+            logging.error(f"Integrity error in insert_questions: {traceback.format_exc()}")
+            raise Exception(f"Questions violate database constraints: {str(e)}")
+        except sqlite3.Error as e:
+            logging.error(f"Database error in insert_questions: {traceback.format_exc()}")
+            raise Exception(f"Failed to insert questions: {str(e)}")
+        except Exception as e:
+            logging.error(f"Unexpected error in insert_questions: {traceback.format_exc()}")
+            raise Exception(f"Unexpected error inserting questions: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+
+# Typed rows returned by the repositories. NamedTuple classes declare empty __slots__,
+# so a row is exactly as large as the tuple sqlite3 produced, and they still index,
+# unpack and compare like the plain tuples callers used before.
+# TIMESTAMP columns arrive as datetime, decoded once by the connection's converter.
+
+class ApiKeyRow(NamedTuple):
+    api_key_id: int
+    api_key: str
+    last_used_at: datetime
+
+
+class NoteRow(NamedTuple):
+    """A note in lists and search results, without its content"""
+    note_id: int
+    note_name: str
+    created_at: datetime
+
+
+class NoteDetailRow(NamedTuple):
+    note_id: int
+    note_name: str
+    note_content: str
+    created_at: datetime
+
+
+class QuestionRow(NamedTuple):
+    question_id: int
+    note_id: int
+    question: str
+    question_type: str
+    preview_answer: str
+    created_at: datetime
+
+
+class OptionRow(NamedTuple):
+    option_id: int
+    question_id: int
+    option: str
+    created_at: datetime
+
+
+class GradingRow(NamedTuple):
+    grading_id: int
+    question_id: int
+    user_answer: Optional[str]
+    real_answer: str
+    score: str
+    correction_and_explanation: str
+    additional_context: str
+    created_at: datetime
+
+
+class SummaryRow(NamedTuple):
+    summary_id: int
+    note_id: int
+    summary: str
+    created_at: datetime
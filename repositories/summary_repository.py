@@ -1,9 +1,15 @@
 import sqlite3
 from datetime import datetime
+from typing import Iterable, Optional
 import logging
 import traceback
+from repositories.projection import Projection
+from repositories.rows import SummaryRow
+from repositories.text_compression import TextCompression
 
 class SummaryRepository:
+    COLUMNS = ("summary_id", "note_id", "summary", "created_at")
+
     def __init__(self, conn: sqlite3.Connection):
         try:
             self.conn = conn
@@ -12,18 +18,28 @@ class SummaryRepository:
             logging.error(f"Failed to initialize SummaryRepository: {traceback.format_exc()}")
             raise Exception(f"Failed to initialize SummaryRepository: {str(e)}")
 
-    def get_summary_by_id(self, summary_id: int) -> tuple[int, int, str, datetime]:
+    def get_summary_by_id(self, summary_id: int, columns: Optional[Iterable[str]] = None) -> Optional[SummaryRow]:
+        """columns: names from COLUMNS to fetch, in the order wanted; all of them by default"""
         try:
-            self.cursor.execute("SELECT * FROM summary WHERE summary_id = ?", (summary_id,))
-            return self.cursor.fetchone()
+            selected = Projection.resolve(columns, self.COLUMNS)
+            self.cursor.execute(f"SELECT {Projection.select_list(selected)} FROM summary WHERE summary_id = ?", (summary_id,))
+            return Projection.typed(
+                TextCompression.decode_row(self.cursor.fetchone(), Projection.positions(selected, ("summary",))),
+                selected, self.COLUMNS, SummaryRow
+            )
         except sqlite3.Error as e:
             logging.error(f"Database error in get_summary_by_id: {traceback.format_exc()}")
             raise Exception(f"Failed to retrieve summary: {str(e)}")
 
-    def get_summary_by_note_id(self, note_id: int) -> list[tuple[int, int, str, datetime]]:
+    def get_summary_by_note_id(self, note_id: int, columns: Optional[Iterable[str]] = None) -> list[SummaryRow]:
         try:
-            self.cursor.execute("SELECT * FROM summary WHERE note_id = ?", (note_id,))
-            return self.cursor.fetchall()
+            selected = Projection.resolve(columns, self.COLUMNS)
+            compressed = Projection.positions(selected, ("summary",))
+            self.cursor.execute(f"SELECT {Projection.select_list(selected)} FROM summary WHERE note_id = ?", (note_id,))
+            return [
+                Projection.typed(TextCompression.decode_row(row, compressed), selected, self.COLUMNS, SummaryRow)
+                for row in self.cursor
+            ]
         except sqlite3.Error as e:
             logging.error(f"Database error in get_summary_by_note_id: {traceback.format_exc()}")
             raise Exception(f"Failed to retrieve summary: {str(e)}")
@@ -36,7 +52,7 @@ class SummaryRepository:
             if not isinstance(summary, str) or not summary.strip():
                 raise ValueError("Summary cannot be empty")
             
-            self.cursor.execute("INSERT INTO summary (note_id, summary) VALUES (?, ?)", (note_id, summary))
+            self.cursor.execute("INSERT INTO summary (note_id, summary) VALUES (?, ?)", (note_id, TextCompression.encode(summary)))
             self.conn.commit()
             return self.cursor.lastrowid
         except sqlite3.IntegrityError as e:
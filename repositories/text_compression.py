@@ -0,0 +1,57 @@
+import os
+import zlib
+import sqlite3
+from typing import Any, Iterable, Optional, Union
+
+
+class TextCompression:
+    """
+    Transparent zlib compression of long text columns (note content, summaries, grading feedback).
+
+    Values of at least MIN_BYTES UTF-8 bytes are stored as a BLOB: MARKER followed by the zlib
+    stream. Anything else, including every row written before compression existed, stays TEXT,
+    and decode() passes it through, so both forms can live in the same column.
+
+    BACK_NOTE_COMPRESS_TEXT=0 turns compression off for new writes; reads always decode.
+    """
+
+    MARKER = b"BNZ1"
+    MIN_BYTES = int(os.getenv("BACK_NOTE_COMPRESS_MIN_BYTES", "512"))
+    LEVEL = 6
+    ENABLED = os.getenv("BACK_NOTE_COMPRESS_TEXT", "1") != "0"
+
+    # SQL name of decode(), registered on every connection for triggers and queries
+    SQL_FUNCTION = "decompress_text"
+
+    @staticmethod
+    def encode(text: Optional[str]) -> Union[str, bytes, None]:
+        if not TextCompression.ENABLED or not isinstance(text, str):
+            return text
+
+        data = text.encode("utf-8")
+        if len(data) < TextCompression.MIN_BYTES:
+            return text
+
+        compressed = TextCompression.MARKER + zlib.compress(data, TextCompression.LEVEL)
+        # Incompressible text is not worth the decode cost
+        return compressed if len(compressed) < len(data) else text
+
+    @staticmethod
+    def decode(value: Any) -> Any:
+        if isinstance(value, bytes) and value.startswith(TextCompression.MARKER):
+            return zlib.decompress(value[len(TextCompression.MARKER):]).decode("utf-8")
+        return value
+
+    @staticmethod
+    def decode_row(row: Optional[tuple], columns: Iterable[int]) -> Optional[tuple]:
+        """Row with the values at the given positions decoded"""
+        if row is None:
+            return None
+        values = list(row)
+        for column in columns:
+            values[column] = TextCompression.decode(values[column])
+        return tuple(values)
+
+    @staticmethod
+    def register(conn: sqlite3.Connection) -> None:
+        conn.create_function(TextCompression.SQL_FUNCTION, 1, TextCompression.decode, deterministic=True)
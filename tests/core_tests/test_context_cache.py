@@ -0,0 +1,102 @@
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from google.genai import errors
+from core import context_cache
+from core.context_cache import ContextCache
+from core.gemini_metrics import GeminiMetrics
+
+
+class FakeCaches:
+    def __init__(self, fail=False, lifetime=3600):
+        self.created = []
+        # False, or the exception the next create raises
+        self.fail = fail
+        self.lifetime = lifetime
+
+    def create(self, model, config):
+        if self.fail is True:
+            raise errors.ClientError(400, {"error": {"code": 400, "status": "INVALID_ARGUMENT",
+                                                     "message": "Cached content is too small"}})
+        if self.fail:
+            raise self.fail
+        self.created.append((model, config.system_instruction))
+
+        class Cached:
+            pass
+
+        cached = Cached()
+        cached.name = f"cachedContents/{len(self.created)}"
+        cached.expire_time = datetime.now(timezone.utc) + timedelta(seconds=self.lifetime)
+        return cached
+
+
+class FakeClient:
+    def __init__(self, **kwargs):
+        self.caches = FakeCaches(**kwargs)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    ContextCache.clear()
+    GeminiMetrics.clear()
+    yield
+    ContextCache.clear()
+    GeminiMetrics.clear()
+
+
+def test_cache_created_once_per_model_and_reused():
+    client = FakeClient()
+    name1 = ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix")
+    name2 = ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix")
+    name3 = ContextCache.get_cached_content_name(client, "KEY", "model-b", "static prefix")
+    assert name1 == name2 == "cachedContents/1"
+    assert name3 == "cachedContents/2"
+    assert len(client.caches.created) == 2
+
+
+def test_cache_refreshed_when_expiring():
+    client = FakeClient(lifetime=ContextCache.REFRESH_MARGIN_SECONDS - 1)
+    name1 = ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix")
+    name2 = ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix")
+    assert name1 != name2
+    assert len(client.caches.created) == 2
+
+
+def test_cache_failure_falls_back_and_is_remembered():
+    client = FakeClient(fail=True)
+    assert ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix") is None
+    client.caches.fail = False
+    # Refusal is remembered until the entry expires or is invalidated
+    assert ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix") is None
+    ContextCache.invalidate("KEY", "model-a", "static prefix")
+    assert ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix") == "cachedContents/1"
+
+
+def test_transient_failure_is_retried_after_backoff(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(context_cache, "time", type("Clock", (), {"time": staticmethod(lambda: clock[0])}))
+    client = FakeClient(fail=TimeoutError("deadline exceeded"))
+    assert ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix") is None
+
+    client.caches.fail = errors.ServerError(503, {"error": {"code": 503, "status": "UNAVAILABLE"}})
+    clock[0] += ContextCache.FAILURE_BACKOFF_SECONDS + 1
+    assert ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix") is None
+
+    client.caches.fail = False
+    # Within the backoff the failure is still remembered, after it the cache is created
+    clock[0] += ContextCache.FAILURE_BACKOFF_SECONDS - 1
+    assert ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix") is None
+    clock[0] += 2
+    assert ContextCache.get_cached_content_name(client, "KEY", "model-a", "static prefix") == "cachedContents/1"
+
+
+def test_metrics_summary_reports_cache_savings():
+    GeminiMetrics.record({"operation": "submit_note", "cached_context": False, "latency": 4.0,
+                          "time_to_first_token": 2.0, "prompt_tokens": 1000, "cached_tokens": 0})
+    GeminiMetrics.record({"operation": "submit_note", "cached_context": True, "latency": 3.0,
+                          "time_to_first_token": 1.0, "prompt_tokens": 1000, "cached_tokens": 800})
+    summary = {row["cached_context"]: row for row in GeminiMetrics.summary()}
+    assert summary[True]["cached_token_ratio"] == pytest.approx(0.8)
+    assert summary[False]["cached_token_ratio"] == 0.0
+    assert summary[True]["mean_time_to_first_token"] < summary[False]["mean_time_to_first_token"]
@@ -0,0 +1,74 @@
+import json
+import pytest
+from google.genai import types
+from core import gemini_work
+from core.gemini_work import GeminiWork
+from core.context_cache import ContextCache
+from core.gemini_metrics import GeminiMetrics
+
+
+class FakeChunk:
+    def __init__(self, text, finish_reason=None):
+        self.text = text
+        self.usage_metadata = None
+        self.candidates = [types.Candidate(finish_reason=finish_reason)] if finish_reason else None
+
+
+class FakeModels:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def generate_content_stream(self, model, contents, config):
+        self.requests.append(contents)
+        text, finish_reason = self.responses.pop(0)
+        half = len(text) // 2
+        yield FakeChunk(text[:half])
+        yield FakeChunk(text[half:], finish_reason)
+
+
+def install_fake_client(monkeypatch, responses):
+    models = FakeModels(responses)
+
+    class FakeClient:
+        def __init__(self, api_key):
+            self.models = models
+
+    monkeypatch.setattr(gemini_work.genai, "Client", FakeClient)
+    monkeypatch.setattr("time.sleep", lambda *_args, **_kwargs: None)
+    return models
+
+
+@pytest.fixture(autouse=True)
+def clear_state():
+    ContextCache.clear()
+    GeminiMetrics.clear()
+    yield
+    GeminiMetrics.clear()
+
+
+def test_call_gemini_continues_after_max_tokens(monkeypatch):
+    full = json.dumps({"summary": "The quick brown fox jumps over the lazy dog, then naps.", "quiz": [{"question": "Q1"}]})
+    cut = 40
+    models = install_fake_client(monkeypatch, [
+        ("```json\n" + full[:cut], types.FinishReason.MAX_TOKENS),
+        # the model repeats the tail of what it already wrote before continuing
+        (full[cut - 25:] + "\n```", types.FinishReason.STOP),
+    ])
+    result = GeminiWork.call_gemini("KEY1234567890", "prompt", "gemini-2.5-flash", profile="fast")
+    assert json.loads(result) == json.loads(full)
+    assert len(models.requests) == 2
+    # the continuation request replays the partial answer as a model turn
+    assert [content.role for content in models.requests[1]] == ["user", "model", "user"]
+    assert GeminiMetrics.get_records()[0]["continuations"] == 1
+
+
+def test_call_gemini_restarts_when_continuations_exhausted(monkeypatch):
+    full = json.dumps({"quiz": ["x" * 50]})
+    truncated = [('{"quiz": ["' + "y" * i, types.FinishReason.MAX_TOKENS) for i in range(1, 5)]
+    models = install_fake_client(monkeypatch, truncated + [(full, types.FinishReason.STOP)])
+    result = GeminiWork.call_gemini("KEY1234567890", "prompt", "gemini-2.5-flash", profile="fast")
+    assert json.loads(result) == json.loads(full)
+    # one request plus MAX_CONTINUATIONS continuations, then a full restart
+    assert len(models.requests) == GeminiWork.MAX_CONTINUATIONS + 2
+    assert len(models.requests[-1]) == 1
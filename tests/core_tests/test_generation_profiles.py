@@ -0,0 +1,34 @@
+import pytest
+from core.generation_profiles import GenerationProfiles
+from core.gemini_metrics import GeminiMetrics
+
+
+def test_get_profile_returns_copy_and_validates():
+    fast = GenerationProfiles.get_profile("fast")
+    assert fast["use_search"] is False
+    fast["use_search"] = True
+    assert GenerationProfiles.get_profile("fast")["use_search"] is False
+    with pytest.raises(ValueError):
+        GenerationProfiles.get_profile("instant")
+
+
+def test_thinking_budget_respects_model_minimum():
+    fast = GenerationProfiles.get_profile("fast")
+    thorough = GenerationProfiles.get_profile("thorough")
+    assert GenerationProfiles.thinking_budget_for(fast, "gemini-2.5-flash") == 0
+    assert GenerationProfiles.thinking_budget_for(fast, "gemini-2.5-pro") == 128
+    assert GenerationProfiles.thinking_budget_for(thorough, "gemini-2.5-pro") == -1
+
+
+def test_latency_report_groups_by_profile():
+    GeminiMetrics.clear()
+    try:
+        GeminiMetrics.record({"operation": "submit_quiz", "profile": "fast", "model": "m", "latency": 1.0})
+        GeminiMetrics.record({"operation": "submit_quiz", "profile": "fast", "model": "m", "latency": 3.0})
+        GeminiMetrics.record({"operation": "submit_note", "profile": "thorough", "model": "m", "latency": 9.0})
+        report = {row["profile"]: row for row in GenerationProfiles.latency_report()}
+        assert report["fast"]["calls"] == 2
+        assert report["fast"]["mean_latency"] == pytest.approx(2.0)
+        assert report["thorough"]["p95_latency"] == 9.0
+    finally:
+        GeminiMetrics.clear()
@@ -26,8 +26,9 @@ class FakeRepo:
         return 7
 
     # NoteHashtagRepository-like
-    def insert_note_hashtags(self, note_id, tags):
-        self.calls.append(("insert_note_hashtags", note_id, tuple(tags)))
+    def insert_hashtags(self, tags, note_id=None):
+        self.calls.append(("insert_hashtags", note_id, tuple(tags)))
+        return {tag: i + 1 for i, tag in enumerate(tags)}
 
     # SummaryRepository-like
     def insert_summary(self, note_id, summary):
@@ -40,10 +41,17 @@ class FakeRepo:
         self.storage[qid] = {"question": question}
         return qid
 
+    def insert_questions(self, note_id, questions):
+        self.calls.append(("insert_questions", len(questions)))
+        return [self.insert_question(note_id, *question) for question in questions]
+
     # OptionRepository-like
     def insert_options(self, question_id, options):
         self.calls.append(("insert_options", question_id, tuple(options)))
 
+    def insert_options_for_questions(self, options_by_question):
+        self.calls.append(("insert_options_for_questions", tuple(options_by_question)))
+
 
 def build_repos():
     api = FakeRepo()
@@ -87,7 +95,7 @@ def test_process_note_and_tags():
     note_id = p.process_note("title", "content", ["t1", "t2"])
     assert note_id == 7
     assert ("insert_note", "title") in repos["note_repository"].calls
-    assert any(call[0] == "insert_note_hashtags" for call in repos["note_hashtag_repository"].calls)
+    assert ("insert_hashtags", 7, ("t1", "t2")) in repos["note_hashtag_repository"].calls
 
 
 def test_process_summary():
@@ -107,8 +115,20 @@ def test_process_quiz_questions():
     mapping = p.process_quiz_questions(7, quiz)
     assert mapping["Q1"] == 1
     assert mapping["Q2"] == 2
-    # options inserted for first only
-    assert any(call[0] == "insert_options" for call in repos["option_repository"].calls)
+    # one batch of questions; options inserted for first only
+    assert ("insert_questions", 2) in repos["question_repository"].calls
+    assert ("insert_options_for_questions", (1,)) in repos["option_repository"].calls
+
+
+def test_process_quiz_questions_skips_invalid_items():
+    repos = build_repos()
+    p = NoteDataProcessor(repos)
+    quiz = [
+        {"question": "Q1", "question_type": "short_answer", "answer": "A"},
+        {"question": "Q2", "question_type": "essay", "answer": "A"},
+        {"question": "Q3", "question_type": "short_answer"},
+    ]
+    assert p.process_quiz_questions(7, quiz) == {"Q1": 1}
 
 
 def test_validate_inputs_errors():
@@ -126,3 +146,90 @@ def test_validate_inputs_errors():
         p.validate_inputs("k", "n", [], "c", "not-dict", "m")
     with pytest.raises(ValueError):
         p.validate_inputs("k", "n", [], "c", {}, " ")
+
+
+def _real_repos(db):
+    from repositories.note_repository import NoteRepository
+    from repositories.note_hashtag_repository import NoteHashtagRepository
+    from repositories.question_repository import QuestionRepository
+    from repositories.option_repository import OptionRepository
+    from repositories.summary_repository import SummaryRepository
+    return {
+        "note_repository": NoteRepository(db.conn),
+        "note_hashtag_repository": NoteHashtagRepository(db.conn),
+        "question_repository": QuestionRepository(db.conn),
+        "option_repository": OptionRepository(db.conn),
+        "summary_repository": SummaryRepository(db.conn),
+    }
+
+
+def test_process_submission_commits_once(tmp_path):
+    from repositories.my_db import MyDB
+
+    with MyDB(db_path=str(tmp_path / "uow.db")) as db:
+        statements = []
+        db.pool.get_writer().set_trace_callback(statements.append)
+        p = NoteDataProcessor(_real_repos(db))
+        quiz = [
+            {"question": "Q1", "question_type": "multiple_choice", "answer": "A", "options": ["A", "B"]},
+            {"question": "Q2", "question_type": "short_answer", "answer": "X"},
+        ]
+        note_id, mapping = p.process_submission("title", "content", ["t1", "t2"], "sum", quiz)
+
+        assert statements.count("COMMIT") == 1
+        assert set(mapping) == {"Q1", "Q2"}
+        assert db.cursor.execute("SELECT COUNT(*) FROM option").fetchone()[0] == 2
+        assert db.cursor.execute("SELECT COUNT(*) FROM summary WHERE note_id = ?", (note_id,)).fetchone()[0] == 1
+
+
+def test_process_submission_rolls_back_on_failure(tmp_path):
+    from repositories.my_db import MyDB
+
+    with MyDB(db_path=str(tmp_path / "uow_fail.db")) as db:
+        repos = _real_repos(db)
+
+        def failing_insert_summary(note_id, summary):
+            raise Exception("disk full")
+
+        repos["summary_repository"].insert_summary = failing_insert_summary
+        p = NoteDataProcessor(repos)
+        with pytest.raises(Exception):
+            p.process_submission("title", "content", ["t1"], "sum", [])
+
+        assert db.cursor.execute("SELECT COUNT(*) FROM note").fetchone()[0] == 0
+        assert db.cursor.execute("SELECT COUNT(*) FROM note_note_hashtags").fetchone()[0] == 0
+
+
+def test_process_submission_without_transaction_support():
+    repos = build_repos()
+    p = NoteDataProcessor(repos)
+    note_id, mapping = p.process_submission("title", "content", [], "sum", [{"question": "Q1", "question_type": "short_answer", "answer": "X"}])
+    assert note_id == 7 and mapping == {"Q1": 1}
+    assert ("insert_summary", 7) in repos["summary_repository"].calls
+
+
+def test_linked_submission_reuses_stored_analysis(tmp_path):
+    from repositories.my_db import MyDB
+    from repositories.api_key_repository import ApiKeyRepository
+    from repositories.note_aggregate_repository import NoteAggregateRepository
+    from core.submit_note import SubmitNote
+
+    with MyDB(db_path=str(tmp_path / "linked.db")) as db:
+        repos = _real_repos(db)
+        repos["api_key_repository"] = ApiKeyRepository(db.conn)
+        repos["note_aggregate_repository"] = NoteAggregateRepository(db.conn)
+        p = NoteDataProcessor(repos)
+        quiz = [{"question": "Q1", "question_type": "multiple_choice", "answer": "A", "options": ["A", "B"]}]
+        source_id, mapping = p.process_submission("title", "same content", [], "sum", quiz)
+
+        submit_note = SubmitNote(repos)
+        assert submit_note.find_existing_analysis("same content")[0] == source_id
+        assert submit_note.find_existing_analysis("other content") is None
+
+        result_json, linked_mapping, note_id = submit_note.link_note("copy", ["t1"], "same content", source_id)
+        assert note_id != source_id
+        assert linked_mapping == mapping
+        assert result_json == {"summary": "sum", "quiz": [{"question": "Q1", "question_type": "multiple_choice", "answer": "A", "options": ["A", "B"]}]}
+        # Nothing was copied
+        assert db.cursor.execute("SELECT COUNT(*) FROM question").fetchone()[0] == 1
+        assert db.cursor.execute("SELECT COUNT(*) FROM summary").fetchone()[0] == 1
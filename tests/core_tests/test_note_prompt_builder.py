@@ -22,3 +22,48 @@ def test_create_submit_note_prompt_validation_errors():
         NotePromptBuilder.create_submit_note_prompt("x", {"multiple_choice": -1, "short_answer": 0, "long_answer": 0})
     with pytest.raises(Exception):
         NotePromptBuilder.create_submit_note_prompt("x", {"short_answer": 0, "long_answer": 0})
+
+
+def test_create_submit_note_prompt_compact_mode():
+    note = 'Line "one"\nLine two with \\ backslash'
+    quiz_structure = {"multiple_choice": 2, "short_answer": 1, "long_answer": 0}
+    pretty = NotePromptBuilder.create_submit_note_prompt(note, quiz_structure)
+    compact = NotePromptBuilder.create_submit_note_prompt(note, quiz_structure, mode="compact")
+    assert len(compact) < len(pretty)
+    # transcript is sent verbatim, not JSON-escaped
+    assert note in compact
+    data = NotePromptBuilder.parse_prompt(compact)
+    assert data["user_input"]["note_transcript"] == note
+    assert NotePromptBuilder.COMPACT_OUTPUT_RULE in data["core_tasks"]
+    assert NotePromptBuilder.CITATION_RULE not in data["core_tasks"]
+    assert NotePromptBuilder.parse_prompt(pretty)["user_input"]["note_transcript"] == note
+    with pytest.raises(Exception):
+        NotePromptBuilder.create_submit_note_prompt(note, quiz_structure, mode="tiny")
+
+
+def test_system_instruction_split():
+    quiz_structure = {"multiple_choice": 2, "short_answer": 1, "long_answer": 0}
+    for mode in NotePromptBuilder.PROMPT_MODES:
+        instruction = json.loads(NotePromptBuilder.get_system_instruction(mode=mode))
+        assert instruction["role"] == NotePromptBuilder.ROLE
+        # the static prefix must not depend on the note or the quiz structure
+        assert not any("Generate Practice Questions" in task for task in instruction["core_tasks"])
+        prompt = NotePromptBuilder.create_submit_note_prompt("Hello", quiz_structure, mode=mode, include_instructions=False)
+        data = NotePromptBuilder.parse_prompt(prompt)
+        assert "role" not in data
+        assert data["core_tasks"] == [NotePromptBuilder._get_question_task(2, 1, 0)]
+        assert data["user_input"]["note_transcript"] == "Hello"
+
+
+def test_question_page_prompt_excludes_existing_questions():
+    qs = {"multiple_choice": 2, "short_answer": 0, "long_answer": 1}
+    for mode in NotePromptBuilder.PROMPT_MODES:
+        prompt = NotePromptBuilder.create_submit_note_prompt(
+            "note", qs, mode=mode, include_instructions=False, exclude_questions=["What is X?"]
+        )
+        assert "What is X?" in prompt
+        assert "follow-up" in prompt
+    first_page = NotePromptBuilder.create_submit_note_prompt("note", qs)
+    assert "follow-up" not in first_page
+    with pytest.raises(Exception):
+        NotePromptBuilder.create_submit_note_prompt("note", qs, exclude_questions="What is X?")
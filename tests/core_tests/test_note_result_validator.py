@@ -31,3 +31,12 @@ def test_save_result_to_file(tmp_path):
     file_path = tmp_path / "note_result.json"
     NoteResultValidator.save_result_to_file({"a": 1}, str(file_path))
     assert file_path.exists()
+
+
+def test_validate_question_page():
+    page = {"quiz": [{"question_type": "short_answer", "question": "Q", "answer": "A"}]}
+    assert NoteResultValidator.validate_question_page(json.dumps(page))["quiz"][0]["question"] == "Q"
+    with pytest.raises(Exception):
+        NoteResultValidator.validate_question_page(json.dumps({"summary": "s"}))
+    with pytest.raises(Exception):
+        NoteResultValidator.validate_question_page(json.dumps({"quiz": [{"question": "Q"}]}))
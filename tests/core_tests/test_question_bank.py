@@ -0,0 +1,55 @@
+import pytest
+from core.question_bank import QuestionBank, QuestionBankJob
+
+
+def test_plan_pages_splits_and_mixes_types():
+    pages = QuestionBank.plan_pages({"multiple_choice": 12, "short_answer": 9, "long_answer": 6}, page_size=10)
+    assert [sum(page.values()) for page in pages] == [10, 10, 7]
+    assert sum(page["multiple_choice"] for page in pages) == 12
+    assert sum(page["long_answer"] for page in pages) == 6
+    assert all(page["long_answer"] >= 2 for page in pages)
+
+
+def test_plan_pages_validation():
+    assert QuestionBank.plan_pages({"multiple_choice": 3, "short_answer": 0, "long_answer": 0}) == [
+        {"multiple_choice": 3, "short_answer": 0, "long_answer": 0}
+    ]
+    with pytest.raises(ValueError):
+        QuestionBank.plan_pages({"multiple_choice": 3}, page_size=0)
+    with pytest.raises(ValueError):
+        QuestionBank.plan_pages({"multiple_choice": -1})
+
+
+def test_job_generates_remaining_pages_with_exclusions():
+    seen_exclusions = []
+
+    def generate_page(page, exclude_questions):
+        seen_exclusions.append(exclude_questions)
+        start = len(exclude_questions)
+        # Repeats the last known question once, which the job drops
+        repeated = [{"question": exclude_questions[-1]}]
+        return repeated + [{"question": f"Q{start + i}"} for i in range(page["short_answer"])]
+
+    pages = [{"multiple_choice": 0, "short_answer": 2, "long_answer": 0}] * 2
+    job = QuestionBankJob(pages, generate_page, exclude_questions=["Q0"]).start()
+    job.join(timeout=5)
+
+    ready = job.take_ready_pages()
+    assert [[item["question"] for item in quiz] for quiz in ready] == [["Q1", "Q2"], ["Q3", "Q4"]]
+    assert seen_exclusions == [["Q0"], ["Q0", "Q1", "Q2"]]
+    assert job.completed_pages == 2 and job.error is None
+    assert job.take_ready_pages() == []
+
+
+def test_job_records_error_and_stops():
+    calls = []
+
+    def generate_page(page, exclude_questions):
+        calls.append(page)
+        raise Exception("quota exceeded")
+
+    job = QuestionBankJob([{"short_answer": 1}] * 3, generate_page).start()
+    job.join(timeout=5)
+    assert not job.is_running()
+    assert job.error == "quota exceeded"
+    assert len(calls) == 1
@@ -22,3 +22,30 @@ def test_create_submit_quiz_prompt_validation_errors():
         QuizPromptBuilder.create_submit_quiz_prompt([{ "user_answer": "A" }])
     with pytest.raises(Exception):
         QuizPromptBuilder.create_submit_quiz_prompt([{ "question": "Q1", "user_answer": 123 }])
+
+
+def test_create_submit_quiz_prompt_compact_mode():
+    quiz = [
+        {"question": "Q1", "question_type": "multiple_choice", "options": ["A", "B"], "answer": "A", "user_answer": "A"},
+        {"question": "Q2", "question_type": "short_answer", "options": None, "answer": "X", "user_answer": ""},
+    ]
+    pretty = QuizPromptBuilder.create_submit_quiz_prompt(quiz)
+    compact = QuizPromptBuilder.create_submit_quiz_prompt(quiz, mode="compact")
+    assert len(compact) < len(pretty)
+    data = json.loads(compact)
+    items = data["user_input"]["quiz_with_answers"]
+    assert items[0]["options"] == ["A", "B"]
+    assert "options" not in items[1]
+    assert items[1]["user_answer"] == ""
+    assert QuizPromptBuilder.CITATION_RULE not in data["core_tasks"]
+    with pytest.raises(Exception):
+        QuizPromptBuilder.create_submit_quiz_prompt(quiz, mode="tiny")
+
+
+def test_system_instruction_split():
+    quiz = [{"question": "Q1", "user_answer": "A"}]
+    for mode in QuizPromptBuilder.PROMPT_MODES:
+        instruction = json.loads(QuizPromptBuilder.get_system_instruction(mode=mode))
+        assert "core_tasks" in instruction and "user_input" not in instruction
+        data = json.loads(QuizPromptBuilder.create_submit_quiz_prompt(quiz, mode=mode, include_instructions=False))
+        assert list(data) == ["user_input"]
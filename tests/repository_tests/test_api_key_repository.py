@@ -33,9 +33,10 @@ def test_api_key_crud_flow(tmp_path):
         repo.update_api_key(api_key_id, last_used_at=new_time)
         rows2 = repo.get_all_api_keys()
         assert len(rows2) == 1
-        # DB stores as 'YYYY-MM-DD HH:MM:SS' (no microseconds)
-        expected = new_time.replace(microsecond=0).isoformat(sep=' ')
+        # DB stores as 'YYYY-MM-DD HH:MM:SS' (no microseconds) and reads back a datetime
+        expected = new_time.replace(microsecond=0)
         assert rows2[0][2] == expected
+        assert rows2[0].last_used_at == expected
 
         # Delete
         deleted = repo.delete_api_key(api_key_id)
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+
+import pytest
+from repositories.my_db import MyDB
+from repositories.db_executor import DBExecutor
+from repositories.prefix_index import PrefixIndex
+from repositories.rows import NoteRow, GradingRow
+from repositories.async_repositories import create_async_repositories
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MyDB(db_path=str(tmp_path / "async.db"))
+    db.connect()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def executor(db):
+    executor = DBExecutor(db.conn)
+    yield executor
+    executor.close()
+
+
+def test_repositories_persist_and_read_through_the_executor(db, executor):
+    name_index = PrefixIndex()
+    repos = create_async_repositories(db.conn, executor, note_name_index=name_index)
+
+    async def pipeline():
+        note_id = await repos["note_repository"].insert_note("Cells", "The cell is the unit of life.")
+        await repos["note_hashtag_repository"].insert_note_hashtags(note_id, ["biology"])
+        await repos["summary_repository"].insert_summary(note_id, "Cells")
+        question_ids = await repos["question_repository"].insert_questions(note_id, [("What is a cell?", "multiple_choice", "A")])
+        await repos["option_repository"].insert_options(question_ids[0], ["A", "B"])
+        await repos["grading_repository"].upsert_gradings([(question_ids[0], "A", "A", "Correct", "Yes", "Context")])
+        await repos["api_key_repository"].insert_api_key("key-1234567890")
+
+        return (
+            await repos["note_repository"].get_all_notes(),
+            await repos["note_hashtag_repository"].get_hashtags_by_note_id(note_id),
+            await repos["option_repository"].get_options_by_question_id(question_ids[0], columns=["option"]),
+            await repos["grading_repository"].get_grading_by_question_id(question_ids[0]),
+            [item async for item in repos["note_repository"].iter_note_content(batch_size=1)],
+            len(await repos["api_key_repository"].get_all_api_keys()),
+        )
+
+    notes, hashtags, options, grading, contents, api_keys = asyncio.run(pipeline())
+    assert isinstance(notes[0], NoteRow) and notes[0].note_name == "Cells"
+    assert hashtags == ["biology"]
+    assert options == [("A",), ("B",)]
+    assert isinstance(grading, GradingRow) and grading.score == "Correct"
+    assert contents == [(notes[0].note_id, "The cell is the unit of life.")]
+    assert api_keys == 1
+    # The shared index sees writes made from async code once they commit
+    assert name_index.search("ce") == ["Cells"]
+
+
+def test_validation_and_errors_match_the_sync_repositories(db, executor):
+    repos = create_async_repositories(db.conn, executor)
+
+    async def failing_calls():
+        with pytest.raises(Exception, match="Invalid note ID"):
+            await repos["note_repository"].get_note(0)
+        with pytest.raises(Exception, match="Invalid question ID"):
+            await repos["grading_repository"].get_grading_by_question_id(-1)
+        with pytest.raises(ValueError):
+            [item async for item in repos["note_repository"].iter_note_content(batch_size=0)]
+
+    asyncio.run(failing_calls())
+
+
+def test_calls_run_on_the_db_thread_and_failed_writes_roll_back(db, executor):
+    async def calls():
+        thread_name = await executor.run(lambda: threading.current_thread().name)
+
+        def half_written():
+            db.cursor.execute("INSERT INTO note (note_name, note_content) VALUES ('partial', 'x')")
+            raise RuntimeError("model call failed")
+
+        with pytest.raises(RuntimeError):
+            await executor.run(half_written)
+        owns_writer = await executor.run(lambda: db.pool.owned_writer() is not None)
+        return thread_name, owns_writer
+
+    thread_name, owns_writer = asyncio.run(calls())
+    assert thread_name.startswith(DBExecutor.THREAD_NAME)
+    assert not owns_writer
+    assert db.cursor.execute("SELECT COUNT(*) FROM note").fetchone()[0] == 0
+
+
+def test_transaction_commits_work_together_or_not_at_all(db, executor):
+    repos = create_async_repositories(db.conn, executor)
+    notes = repos["note_repository"].repository
+
+    def failing_work():
+        notes.insert_note("A", "a")
+        raise RuntimeError("abort")
+
+    async def units():
+        with pytest.raises(RuntimeError):
+            await executor.transaction(failing_work)
+        await executor.transaction(lambda: [notes.insert_note("B", "b"), notes.insert_note("C", "c")])
+        return await repos["note_repository"].get_all_note_names()
+
+    assert sorted(asyncio.run(units())) == ["B", "C"]
@@ -96,3 +96,35 @@ def test_grading_db_errors(tmp_path, monkeypatch):
         assert "Failed to update grading" in str(exc4.value)
     finally:
         db.close()
+
+
+def _add_question(db):
+    note_id = db.cursor.execute("SELECT note_id FROM note").fetchone()[0]
+    db.cursor.execute(
+        "INSERT INTO question (note_id, question, question_type, preview_answer) VALUES (?, ?, ?, ?)",
+        (note_id, "Q2?", "short_answer", "B")
+    )
+    db.conn.commit()
+    return db.cursor.lastrowid
+
+
+def test_grading_is_unique_per_question_and_upserted(tmp_path):
+    db, qid = setup_db_with_question(tmp_path)
+    try:
+        repo = GradingRepository(db.conn)
+        qid2 = _add_question(db)
+        gid = repo.insert_grading(qid, "B", "A", "Incorrect", "Explain", "Ctx")
+        with pytest.raises(Exception) as exc:
+            repo.insert_grading(qid, "A", "A", "Correct", "Explain", "Ctx")
+        assert "Grading violates database constraints" in str(exc.value)
+
+        ids = repo.upsert_gradings([
+            (qid, "A", "A", "Correct", "Better", "Ctx"),
+            (qid2, "C", "B", "Incorrect", "Explain", "Ctx"),
+        ])
+        assert ids[qid] == gid
+        assert len(repo.get_all_gradings([qid, qid2])) == 2
+        row = repo.get_grading_by_question_id(qid)
+        assert row[4] == "Correct" and row[5] == "Better"
+    finally:
+        db.close()
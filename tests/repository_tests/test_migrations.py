@@ -0,0 +1,111 @@
+import sqlite3
+import pytest
+from repositories import migrations
+from repositories.migrations import SchemaMigrator
+from repositories.my_db import MyDB
+
+
+class RecordingCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.statements = []
+
+    def execute(self, sql, *args):
+        self.statements.append(" ".join(sql.split()))
+        self.cursor.execute(sql, *args)
+        return self
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+
+def test_connect_stamps_latest_version(tmp_path):
+    with MyDB(db_path=str(tmp_path / "v.db")) as db:
+        assert SchemaMigrator.get_version(db.cursor) == SchemaMigrator.latest_version()
+        assert SchemaMigrator.get_pending(db.cursor) == []
+
+
+def test_current_database_skips_all_ddl(tmp_path):
+    db_file = str(tmp_path / "current.db")
+    with MyDB(db_path=db_file):
+        pass
+
+    conn = sqlite3.connect(db_file)
+    cursor = RecordingCursor(conn.cursor())
+    try:
+        assert SchemaMigrator.migrate(conn, cursor) == []
+        assert cursor.statements == ["PRAGMA user_version;"]
+    finally:
+        conn.close()
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "rollback.db")
+    with MyDB(db_path=db_file):
+        pass
+
+    latest = SchemaMigrator.latest_version()
+    broken = {
+        "version": latest + 1,
+        "description": "Broken",
+        "statements": ["CREATE TABLE half_done (id INTEGER)", "CREATE TABLE broken ("],
+    }
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [broken])
+
+    conn = sqlite3.connect(db_file)
+    try:
+        with pytest.raises(sqlite3.Error):
+            SchemaMigrator.migrate(conn, conn.cursor())
+        assert SchemaMigrator.get_version(conn.cursor()) == latest
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        assert "half_done" not in tables
+    finally:
+        conn.close()
+
+
+def test_dry_run_report_lists_pending_without_applying(tmp_path):
+    db_file = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_file)
+    try:
+        report = SchemaMigrator.dry_run_report(conn.cursor())
+        assert "Schema version 0" in report
+        assert "pending 1: Initial schema" in report
+        assert SchemaMigrator.get_version(conn.cursor()) == 0
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_lookup_queries_use_secondary_indexes(tmp_path):
+    with MyDB(db_path=str(tmp_path / "indexes.db")) as db:
+        queries = {
+            "SELECT * FROM question WHERE note_id = 1": "idx_question_note_id",
+            "SELECT * FROM option WHERE question_id = 1": "idx_option_question_id",
+            "SELECT * FROM grading WHERE question_id = 1": "idx_grading_question_id_unique",
+            "SELECT * FROM summary WHERE note_id = 1": "idx_summary_note_id",
+            "SELECT note_id FROM note ORDER BY created_at DESC": "idx_note_created_at",
+            "SELECT note_id FROM note_note_hashtags WHERE note_hashtag_id = 1": "idx_note_note_hashtags_note_hashtag_id",
+        }
+        for query, index_name in queries.items():
+            plan = " ".join(row[-1] for row in db.cursor.execute(f"EXPLAIN QUERY PLAN {query}").fetchall())
+            assert index_name in plan, f"{query}: {plan}"
+
+
+def test_unique_grading_migration_keeps_latest_grading(tmp_path, monkeypatch):
+    db_file = str(tmp_path / "duplicates.db")
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m["version"] < 3])
+    with MyDB(db_path=db_file) as db:
+        c = db.cursor
+        c.execute("INSERT INTO note (note_name, note_content) VALUES ('n', 'c')")
+        c.execute("INSERT INTO question (note_id, question, question_type, preview_answer) VALUES (1, 'Q', 'short_answer', 'A')")
+        for score in ("Incorrect", "Correct"):
+            c.execute(
+                "INSERT INTO grading (question_id, user_answer, real_answer, score, correction_and_explanation, additional_context) "
+                "VALUES (1, 'A', 'A', ?, 'x', 'y')", (score,)
+            )
+        db.conn.commit()
+    monkeypatch.undo()
+
+    with MyDB(db_path=db_file) as db:
+        rows = db.cursor.execute("SELECT score FROM grading WHERE question_id = 1").fetchall()
+        assert rows == [("Correct",)]
@@ -1,4 +1,5 @@
 import os
+import time
 import sqlite3
 import pytest
 from typing import List
@@ -154,3 +155,209 @@ class TestMyDBContextManagerAndErrors:
             db.conn.close()
         except Exception:
             pass
+
+
+class TestMyDBConnectionPool:
+    def test_connections_use_wal_and_tuned_pragmas(self, tmp_path):
+        with MyDB(db_path=str(tmp_path / "wal.db")) as db:
+            c = db.cursor
+            assert c.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+            assert c.execute("PRAGMA synchronous;").fetchone()[0] == 1  # NORMAL
+            assert c.execute("PRAGMA foreign_keys;").fetchone()[0] == 1
+            assert c.execute("PRAGMA busy_timeout;").fetchone()[0] == 5000
+
+    def test_each_thread_gets_its_own_connection(self, tmp_path):
+        import threading
+        from repositories.note_repository import NoteRepository
+
+        with MyDB(db_path=str(tmp_path / "threads.db"), pool_size=4) as db:
+            repo = NoteRepository(db.conn)
+            main_conn = db.pool.get_connection()
+            seen, errors = [], []
+
+            def worker(i):
+                try:
+                    seen.append(db.pool.get_connection())
+                    repo.insert_note(f"Note {i}", "Content")
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(3)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            assert errors == []
+            assert len({id(conn) for conn in seen + [main_conn]}) == 4
+            assert len(repo.get_all_notes()) == 3
+
+    def test_pool_size_bounds_connections_and_reuses_dead_slots(self, tmp_path):
+        import threading
+
+        with MyDB(db_path=str(tmp_path / "bounded.db"), pool_size=2) as db:
+            for _ in range(5):
+                t = threading.Thread(target=lambda: db.cursor.execute("SELECT 1").fetchone())
+                t.start()
+                t.join()
+            assert db.pool.size() <= 2
+
+    def test_pool_size_from_environment(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("BACK_NOTE_DB_POOL_SIZE", "3")
+        with MyDB(db_path=str(tmp_path / "env.db")) as db:
+            assert db.pool.pool_size == 3
+
+    def test_transaction_joins_repository_commits_and_rolls_back(self, tmp_path):
+        from repositories.note_repository import NoteRepository
+
+        with MyDB(db_path=str(tmp_path / "tx.db")) as db:
+            repo = NoteRepository(db.conn)
+            with pytest.raises(RuntimeError):
+                with db.conn.transaction():
+                    repo.insert_note("A", "a")  # commits inside are deferred
+                    with db.conn.transaction():
+                        repo.insert_note("B", "b")
+                    raise RuntimeError("abort")
+            assert repo.get_all_notes() == []
+            assert not db.conn.in_transaction_block()
+
+            with db.conn.transaction():
+                repo.insert_note("A", "a")
+                repo.insert_note("B", "b")
+            assert len(repo.get_all_notes()) == 2
+
+
+class TestMyDBReadWriteSplit:
+    def test_statement_routing(self):
+        from repositories.connection_pool import ConnectionPool
+
+        for sql in ("SELECT 1", "  select * from note", "-- list\nSELECT 1", "(SELECT 1)", "EXPLAIN QUERY PLAN SELECT 1",
+                    "WITH t AS (SELECT 1) SELECT * FROM t", "PRAGMA user_version;", "PRAGMA table_info(note)"):
+            assert ConnectionPool.is_read(sql), sql
+        for sql in ("INSERT INTO note VALUES (1)", "UPDATE note SET note_name = 'x'", "DELETE FROM note",
+                    "WITH t AS (SELECT 1) DELETE FROM note", "BEGIN IMMEDIATE;", "COMMIT;", "CREATE TABLE t (x)",
+                    "PRAGMA foreign_keys = ON;", "PRAGMA wal_checkpoint(TRUNCATE);", ""):
+            assert not ConnectionPool.is_read(sql), sql
+
+    def test_reads_use_read_only_connections_and_writes_the_writer(self, tmp_path):
+        from repositories.note_repository import NoteRepository
+
+        with MyDB(db_path=str(tmp_path / "split.db")) as db:
+            repo = NoteRepository(db.conn)
+            note_id = repo.insert_note("Title", "Content")
+            assert db.pool.owned_writer() is None  # released on commit
+
+            reader = db.pool.get_reader()
+            assert reader is not db.pool.get_writer()
+            assert reader.execute("PRAGMA query_only;").fetchone()[0] == 1
+            with pytest.raises(sqlite3.OperationalError):
+                reader.execute("DELETE FROM note")
+            assert repo.get_note(note_id).note_name == "Title"
+
+    def test_reads_are_not_blocked_by_an_open_write(self, tmp_path):
+        import threading
+        from repositories.note_repository import NoteRepository
+
+        with MyDB(db_path=str(tmp_path / "snapshot.db")) as db:
+            repo = NoteRepository(db.conn)
+            repo.insert_note("Committed", "a")
+            written, finish, seen_inside = threading.Event(), threading.Event(), []
+
+            def long_write():
+                with db.conn.transaction():
+                    repo.insert_note("Pending", "b")
+                    seen_inside.extend(n.note_name for n in repo.get_all_notes())
+                    written.set()
+                    finish.wait(5)
+
+            writer = threading.Thread(target=long_write)
+            writer.start()
+            try:
+                assert written.wait(5)
+                # The snapshot read returns at once, without the uncommitted note
+                assert [n.note_name for n in repo.get_all_notes()] == ["Committed"]
+            finally:
+                finish.set()
+                writer.join()
+
+            assert sorted(seen_inside) == ["Committed", "Pending"]
+            assert len(repo.get_all_notes()) == 2
+
+    def test_writer_left_by_a_finished_thread_is_rolled_back(self, tmp_path):
+        import threading
+
+        with MyDB(db_path=str(tmp_path / "abandoned.db")) as db:
+            t = threading.Thread(target=lambda: db.cursor.execute("INSERT INTO note (note_name, note_content) VALUES ('x', 'y')"))
+            t.start()
+            t.join()
+
+            db.cursor.execute("INSERT INTO note (note_name, note_content) VALUES ('kept', 'y')")
+            db.conn.commit()
+            assert [row[0] for row in db.cursor.execute("SELECT note_name FROM note").fetchall()] == ["kept"]
+
+    def test_snapshot_reads_one_state_across_statements(self, tmp_path):
+        import threading
+        from repositories.note_repository import NoteRepository
+
+        with MyDB(db_path=str(tmp_path / "pinned.db")) as db:
+            repo = NoteRepository(db.conn)
+            repo.insert_note("First", "a")
+
+            with db.conn.snapshot():
+                assert len(repo.get_all_notes()) == 1
+                t = threading.Thread(target=lambda: repo.insert_note("Second", "b"))
+                t.start()
+                t.join()
+                assert len(repo.get_all_notes()) == 1
+            assert len(repo.get_all_notes()) == 2
+
+    def test_in_memory_database_is_rejected(self):
+        from repositories.connection_pool import ConnectionPool
+
+        # Every reader and the writer would open a database of its own
+        for path in (":memory:", ""):
+            with pytest.raises(ValueError, match="not supported"):
+                MyDB(db_path=path)
+            with pytest.raises(ValueError, match="not supported"):
+                ConnectionPool(path)
+
+    def test_failed_write_rolls_back_and_frees_the_writer(self, tmp_path):
+        import threading
+        from repositories.note_repository import NoteRepository
+
+        with MyDB(db_path=str(tmp_path / "failed.db")) as db:
+            db.cursor.execute("""
+                CREATE TRIGGER reject_note BEFORE INSERT ON note WHEN new.note_name = 'Broken'
+                BEGIN SELECT RAISE(ABORT, 'rejected'); END
+            """)
+            db.conn.commit()
+            repo = NoteRepository(db.conn)
+            failed, finish, errors = threading.Event(), threading.Event(), []
+
+            def failing_insert():
+                # insert_note stores the body, then the note insert fails; the thread stays alive
+                try:
+                    repo.insert_note("Broken", "Orphan body")
+                except Exception as e:
+                    errors.append(str(e))
+                errors.append(db.pool.owned_writer() is not None)
+                failed.set()
+                finish.wait(5)
+                db.conn.commit()
+
+            t = threading.Thread(target=failing_insert)
+            t.start()
+            try:
+                assert failed.wait(5)
+                started_at = time.perf_counter()
+                repo.insert_note("Fine", "Kept body")
+                assert time.perf_counter() - started_at < 1
+            finally:
+                finish.set()
+                t.join()
+
+            assert "rejected" in errors[0] and errors[1] is False
+            # The later commit on the failing thread had nothing of the failed insert left to commit
+            bodies = db.cursor.execute("SELECT COUNT(*) FROM note_body").fetchone()[0]
+            assert bodies == 1
+            assert [n.note_name for n in repo.get_all_notes()] == ["Fine"]
@@ -0,0 +1,67 @@
+import pytest
+from repositories.my_db import MyDB
+from repositories.note_aggregate_repository import NoteAggregateRepository
+from repositories.note_repository import NoteRepository
+from repositories.note_hashtag_repository import NoteHashtagRepository
+from repositories.question_repository import QuestionRepository
+from repositories.option_repository import OptionRepository
+from repositories.summary_repository import SummaryRepository
+from repositories.grading_repository import GradingRepository
+
+
+def setup_db_with_note(tmp_path):
+    db = MyDB(db_path=str(tmp_path / "aggregate.db"))
+    db.connect()
+    note_id = NoteRepository(db.conn).insert_note("Note", "Content")
+    NoteHashtagRepository(db.conn).insert_hashtags(["tag1", "tag2"], note_id=note_id)
+    SummaryRepository(db.conn).insert_summary(note_id, "Summary")
+    qids = QuestionRepository(db.conn).insert_questions(note_id, [
+        ("MC?", "multiple_choice", "A"),
+        ("SA?", "short_answer", "X"),
+    ])
+    OptionRepository(db.conn).insert_options_for_questions({qids[0]: ["A", "B"]})
+    GradingRepository(db.conn).upsert_gradings([(qids[0], "B", "A", "Incorrect", "Explain", "Ctx")])
+    return db, note_id, qids
+
+
+def test_get_note_aggregate_in_fixed_queries(tmp_path):
+    db, note_id, qids = setup_db_with_note(tmp_path)
+    try:
+        repo = NoteAggregateRepository(db.conn)
+        statements = []
+        db.pool.get_connection().set_trace_callback(statements.append)
+        aggregate = repo.get_note_aggregate(note_id)
+        db.pool.get_connection().set_trace_callback(None)
+
+        # Six queries, read in one snapshot
+        assert statements[0] == "BEGIN;" and statements[-1] == "COMMIT"
+        assert len(statements[1:-1]) == 6
+        assert aggregate["note"][1] == "Note"
+        assert set(aggregate["hashtags"]) == {"tag1", "tag2"}
+        assert aggregate["summary"] == "Summary"
+        mc, sa = aggregate["questions"]
+        assert (mc["question_id"], mc["options"], mc["grading"][4]) == (qids[0], ["A", "B"], "Incorrect")
+        assert (sa["question"], sa["options"], sa["grading"]) == ("SA?", [], None)
+    finally:
+        db.close()
+
+
+def test_get_note_aggregate_missing_and_invalid(tmp_path):
+    db, note_id, _ = setup_db_with_note(tmp_path)
+    try:
+        repo = NoteAggregateRepository(db.conn)
+        assert repo.get_note_aggregate(note_id + 1) is None
+        with pytest.raises(Exception):
+            repo.get_note_aggregate(0)
+
+        class FailingCursor:
+            def execute(self, *args, **kwargs):
+                import sqlite3
+                raise sqlite3.Error("boom")
+
+        repo.cursor = FailingCursor()
+        with pytest.raises(Exception) as exc:
+            repo.get_note_aggregate(note_id)
+        assert "Failed to retrieve note aggregate" in str(exc.value)
+    finally:
+        db.close()
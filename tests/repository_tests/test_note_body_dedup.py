@@ -0,0 +1,102 @@
+import pytest
+from repositories import migrations
+from repositories.my_db import MyDB
+from repositories.migrations import SchemaMigrator
+from repositories.note_repository import NoteRepository
+from repositories.summary_repository import SummaryRepository
+from repositories.question_repository import QuestionRepository
+from repositories.note_aggregate_repository import NoteAggregateRepository
+from repositories.note_search_repository import NoteSearchRepository
+
+TRANSCRIPT = "Photosynthesis converts light energy into chemical energy. " * 20
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MyDB(db_path=str(tmp_path / "dedup.db"))
+    db.connect()
+    yield db
+    db.close()
+
+
+def test_identical_bodies_are_stored_once(db):
+    notes = NoteRepository(db.conn)
+    first_id = notes.insert_note("Lecture", TRANSCRIPT)
+    second_id = notes.insert_note("Lecture again", TRANSCRIPT)
+    other_id = notes.insert_note("Other", "Different content")
+
+    assert db.cursor.execute("SELECT COUNT(*) FROM note_body").fetchone()[0] == 2
+    assert notes.get_note(second_id)[2] == TRANSCRIPT
+    assert sorted(notes.get_all_note_content()) == sorted([TRANSCRIPT, TRANSCRIPT, "Different content"])
+    assert sorted(r["note_id"] for r in NoteSearchRepository(db.conn).search("photosynthesis")) == [first_id, second_id]
+
+    stats = notes.get_storage_stats()
+    assert (stats["notes"], stats["bodies"], stats["linked_notes"]) == (3, 2, 0)
+    assert stats["dedup_saved_bytes"] == len(TRANSCRIPT.encode("utf-8"))
+    assert stats["content_bytes"] == stats["unique_bytes"] + stats["dedup_saved_bytes"]
+    assert stats["compression_saved_bytes"] > 0
+
+    # A body goes with the last note using it
+    notes.delete_note(first_id)
+    assert notes.get_note(second_id)[2] == TRANSCRIPT
+    notes.delete_note(second_id)
+    notes.delete_note(other_id)
+    assert db.cursor.execute("SELECT COUNT(*) FROM note_body").fetchone()[0] == 0
+
+
+def test_linked_note_shares_analysis_and_inherits_it(db):
+    notes = NoteRepository(db.conn)
+    source_id = notes.insert_note("Lecture", TRANSCRIPT)
+    assert notes.find_analyzed_duplicate(TRANSCRIPT) is None
+    SummaryRepository(db.conn).insert_summary(source_id, "Plants make sugar")
+    question_id = QuestionRepository(db.conn).insert_questions(source_id, [("What is photosynthesis?", "short_answer", "x")])[0]
+
+    assert notes.find_analyzed_duplicate(TRANSCRIPT)[:2] == (source_id, "Lecture")
+    assert notes.find_analyzed_duplicate(TRANSCRIPT + " ") is None
+
+    first_link = notes.insert_note("Copy 1", TRANSCRIPT, analysis_note_id=source_id)
+    # Linking to a linked note points at the note owning the analysis
+    second_link = notes.insert_note("Copy 2", TRANSCRIPT, analysis_note_id=first_link)
+    assert db.cursor.execute("SELECT analysis_note_id FROM note WHERE note_id = ?", (second_link,)).fetchone()[0] == source_id
+    with pytest.raises(Exception):
+        notes.insert_note("Dangling", TRANSCRIPT, analysis_note_id=999)
+
+    aggregate = NoteAggregateRepository(db.conn).get_note_aggregate(second_link)
+    assert aggregate["note"][:3] == (second_link, "Copy 2", TRANSCRIPT)
+    assert aggregate["analysis_note_id"] == source_id
+    assert aggregate["summary"] == "Plants make sugar"
+    assert [q["question_id"] for q in aggregate["questions"]] == [question_id]
+    assert notes.get_storage_stats()["analysis_saved_bytes"] > 0
+
+    # Deleting the owner hands the analysis to the oldest linked note
+    notes.delete_note(source_id)
+    assert db.cursor.execute("SELECT note_id FROM question WHERE question_id = ?", (question_id,)).fetchone()[0] == first_link
+    assert NoteAggregateRepository(db.conn).get_note_aggregate(first_link)["analysis_note_id"] is None
+    assert NoteAggregateRepository(db.conn).get_note_aggregate(second_link)["summary"] == "Plants make sugar"
+    results = NoteSearchRepository(db.conn).search("sugar")
+    assert [(r["note_id"], r["source"]) for r in results] == [(first_link, "summary")]
+
+
+def test_migration_moves_bodies_into_note_body(tmp_path, monkeypatch):
+    all_migrations = migrations.MIGRATIONS
+    monkeypatch.setattr(migrations, "MIGRATIONS", all_migrations[:8])
+    db = MyDB(db_path=str(tmp_path / "v8.db"))
+    db.connect()
+    try:
+        db.cursor.executemany(
+            "INSERT INTO note (note_name, note_content) VALUES (?, ?)",
+            [("A", TRANSCRIPT), ("B", TRANSCRIPT), ("C", "short")]
+        )
+        db.conn.commit()
+
+        monkeypatch.setattr(migrations, "MIGRATIONS", all_migrations)
+        assert SchemaMigrator.migrate(db.pool.get_connection(), db.cursor) == [9]
+        assert db.cursor.execute("SELECT COUNT(*) FROM note_body").fetchone()[0] == 2
+        assert db.cursor.execute("SELECT COUNT(*) FROM note WHERE note_content <> ''").fetchone()[0] == 0
+
+        notes = NoteRepository(db.conn)
+        assert [notes.get_note(note_id)[2] for note_id in (1, 2, 3)] == [TRANSCRIPT, TRANSCRIPT, "short"]
+        assert sorted(r["note_id"] for r in NoteSearchRepository(db.conn).search("photosynthesis")) == [1, 2]
+        assert [r["note_id"] for r in NoteSearchRepository(db.conn).search("short")] == [3]
+    finally:
+        db.close()
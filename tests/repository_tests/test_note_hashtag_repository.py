@@ -92,3 +92,62 @@ def test_note_hashtag_db_errors(tmp_path, monkeypatch):
         assert "Failed to delete hashtag from note" in str(exc5.value)
     finally:
         db.close()
+
+
+def test_insert_hashtags_bulk_and_relink(tmp_path):
+    db, note_id = setup_db_with_note(tmp_path)
+    try:
+        repo = NoteHashtagRepository(db.conn)
+        ids = repo.insert_hashtags(["tag1", "tag2", "tag1", ""])
+        assert set(ids) == {"tag1", "tag2"}
+        assert repo.get_hashtags_by_note_id(note_id) == []
+
+        again = repo.insert_hashtags(["tag1", "tag3"], note_id=note_id)
+        assert again["tag1"] == ids["tag1"]
+        assert set(repo.get_hashtags_by_note_id(note_id)) == {"tag1", "tag3"}
+
+        repo.delete_hashtag_from_note(note_id, "tag1")
+        repo.insert_hashtags(["tag1"], note_id=note_id)
+        assert "tag1" in repo.get_hashtags_by_note_id(note_id)
+
+        with pytest.raises(Exception):
+            repo.insert_hashtags("tag1")
+    finally:
+        db.close()
+
+
+def test_live_hashtags_follow_links(tmp_path):
+    db, note_id = setup_db_with_note(tmp_path)
+    try:
+        repo = NoteHashtagRepository(db.conn)
+        db.cursor.execute("INSERT INTO note (note_name, note_content) VALUES ('Second', 'Content')")
+        second_id = db.cursor.lastrowid
+        db.conn.commit()
+
+        repo.insert_hashtags(["python", "sql", "unused"])
+        repo.insert_hashtags(["python", "sql"], note_id=note_id)
+        repo.insert_note_hashtags(second_id, ["python"])
+        assert repo.get_live_hashtags() == [("python", 2), ("sql", 1)]
+        assert repo.get_live_hashtags(limit=1) == [("python", 2)]
+
+        # Soft delete, revive and note delete all adjust the counts
+        repo.delete_hashtag_from_note(note_id, "sql")
+        assert repo.get_live_hashtags() == [("python", 2)]
+        repo.insert_hashtags(["sql"], note_id=note_id)
+        assert repo.get_live_hashtags() == [("python", 2), ("sql", 1)]
+        db.cursor.execute("DELETE FROM note WHERE note_id = ?", (second_id,))
+        db.conn.commit()
+        assert repo.get_live_hashtags() == [("python", 1), ("sql", 1)]
+
+        # The listing reads the partial usage index in order, without a sort
+        plan = db.cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT hashtag, usage_count FROM note_hashtag "
+            "WHERE usage_count > 0 ORDER BY usage_count DESC, hashtag"
+        ).fetchall()
+        assert any("idx_note_hashtag_usage" in row[-1] for row in plan)
+        assert not any("TEMP B-TREE" in row[-1] for row in plan)
+
+        with pytest.raises(Exception):
+            repo.get_live_hashtags(limit=0)
+    finally:
+        db.close()
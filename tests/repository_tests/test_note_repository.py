@@ -61,6 +61,116 @@ def test_note_invalid_inputs(tmp_path):
         db.close()
 
 
+def test_search_notes_filters_and_orders_in_sql(tmp_path):
+    db = setup_db(tmp_path)
+    try:
+        from repositories.note_hashtag_repository import NoteHashtagRepository
+        repo = NoteRepository(db.conn)
+        first = repo.insert_note("Python basics", "a")
+        second = repo.insert_note("python advanced", "b")
+        third = repo.insert_note("100%_done", "c")
+        NoteHashtagRepository(db.conn).insert_note_hashtags(first, ["Study"])
+        NoteHashtagRepository(db.conn).insert_note_hashtags(second, ["work"])
+
+        # Ties on created_at fall back to note_id
+        assert [n[0] for n in repo.search_notes()] == [third, second, first]
+        assert [n[0] for n in repo.search_notes(order="oldest")] == [first, second, third]
+        assert [n[0] for n in repo.search_notes(title="PYTHON", order="oldest")] == [first, second]
+        assert [n[0] for n in repo.search_notes(hashtag="study")] == [first]
+        assert repo.search_notes(title="python", hashtag="STUDY")[0][1] == "Python basics"
+        assert [n[0] for n in repo.search_notes(limit=1)] == [third]
+
+        # LIKE wildcards in the input match literally
+        assert [n[0] for n in repo.search_notes(title="100%_")] == [third]
+        assert repo.search_notes(title="1_0") == []
+
+        plan = db.cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT note_id FROM note n WHERE n.note_name LIKE ? ESCAPE '\\'", ("py%",)
+        ).fetchall()
+        assert any("idx_note_name_nocase" in row[-1] for row in plan)
+
+        with pytest.raises(Exception):
+            repo.search_notes(title=123)
+        with pytest.raises(Exception):
+            repo.search_notes(order="random")
+        with pytest.raises(Exception):
+            repo.search_notes(limit=0)
+    finally:
+        db.close()
+
+
+def test_get_notes_page_walks_keyset_cursors(tmp_path):
+    db = setup_db(tmp_path)
+    try:
+        repo = NoteRepository(db.conn)
+        note_ids = [repo.insert_note(f"Note {i}", "body") for i in range(7)]
+        # Equal timestamps are ordered by note_id
+        db.cursor.execute("UPDATE note SET created_at = '2024-01-01 00:00:00' WHERE note_id IN (?, ?, ?)", note_ids[2:5])
+        db.conn.commit()
+
+        for order in ("newest", "oldest"):
+            seen, cursor = [], None
+            while True:
+                notes, cursor = repo.get_notes_page(page_size=3, after=cursor, order=order)
+                assert len(notes) <= 3
+                seen.extend(n[0] for n in notes)
+                if cursor is None:
+                    break
+            assert seen == [n[0] for n in repo.search_notes(order=order)]
+            assert sorted(seen) == note_ids
+
+        # An exact multiple of the page size ends without an empty page
+        notes, cursor = repo.get_notes_page(page_size=7)
+        assert len(notes) == 7 and cursor is None
+
+        plan = db.cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT n.note_id FROM note n WHERE (n.created_at, n.note_id) < (?, ?) "
+            f"ORDER BY {NoteRepository.SEARCH_ORDERS['newest']} LIMIT 4", ("2024-01-01 00:00:00", 3)
+        ).fetchall()
+        assert any("idx_note_created_at" in row[-1] for row in plan)
+        assert not any("TEMP B-TREE" in row[-1] for row in plan)
+
+        with pytest.raises(Exception):
+            repo.get_notes_page(page_size=0)
+        with pytest.raises(Exception):
+            repo.get_notes_page(after=("2024-01-01 00:00:00",))
+    finally:
+        db.close()
+
+
+def test_suggest_note_names_tolerates_typos(tmp_path):
+    db = setup_db(tmp_path)
+    try:
+        repo = NoteRepository(db.conn)
+        for name in ["Photosynthesis basics", "Python decorators", "Python generators", "Linear algebra", "python"]:
+            repo.insert_note(name, "content")
+
+        assert repo.suggest_note_names("photosynthsis") == ["Photosynthesis basics"]
+        assert repo.suggest_note_names("generater") == ["Python generators"]
+        assert repo.suggest_note_names("pyton")[0] == "python"
+        assert len(repo.suggest_note_names("python", limit=2)) == 2
+        # Too short for trigrams: prefix match
+        assert set(repo.suggest_note_names("py")) == {"Python decorators", "Python generators", "python"}
+        assert repo.suggest_note_names("xyz") == []
+        assert repo.suggest_note_names("  ") == []
+
+        # Triggers keep the trigram index in step with renames and deletes
+        note_id = repo.insert_note("Organic chemistry", "content")
+        assert repo.suggest_note_names("organik") == ["Organic chemistry"]
+        db.cursor.execute("UPDATE note SET note_name = 'Inorganic chemistry' WHERE note_id = ?", (note_id,))
+        db.conn.commit()
+        assert repo.suggest_note_names("inorganik") == ["Inorganic chemistry"]
+        repo.delete_note(note_id)
+        assert repo.suggest_note_names("inorganik") == []
+
+        with pytest.raises(Exception):
+            repo.suggest_note_names(123)
+        with pytest.raises(Exception):
+            repo.suggest_note_names("python", limit=0)
+    finally:
+        db.close()
+
+
 def test_note_repo_db_errors(tmp_path, monkeypatch):
     db = setup_db(tmp_path)
     try:
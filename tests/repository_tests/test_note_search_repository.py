@@ -0,0 +1,82 @@
+import pytest
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+from repositories.question_repository import QuestionRepository
+from repositories.grading_repository import GradingRepository
+from repositories.summary_repository import SummaryRepository
+from repositories.note_search_repository import NoteSearchRepository
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MyDB(db_path=str(tmp_path / "search.db"))
+    db.connect()
+    yield db
+    db.close()
+
+
+def test_search_ranks_notes_and_reports_matching_source(db):
+    notes = NoteRepository(db.conn)
+    biology = notes.insert_note("Photosynthesis", "Plants turn light into chemical energy.")
+    databases = notes.insert_note("Databases", "SQLite can index text for search.")
+    SummaryRepository(db.conn).insert_summary(databases, "Indexing makes lookups fast")
+    question_id = QuestionRepository(db.conn).insert_questions(biology, [("What do chloroplasts do?", "short_answer", "x")])[0]
+    GradingRepository(db.conn).upsert_gradings([(question_id, "u", "r", "Correct", "Chloroplasts capture sunlight", "ctx")])
+
+    repo = NoteSearchRepository(db.conn)
+    results = repo.search("sunlight")
+    assert [r["note_id"] for r in results] == [biology]
+    assert results[0]["source"] == "grading"
+    assert results[0]["snippet"] == "Chloroplasts capture **sunlight**"
+
+    # Every word must match; the last one is a prefix; one result per note
+    assert [r["note_id"] for r in repo.search("plants ligh")] == [biology]
+    assert [r["note_id"] for r in repo.search("index")] == [databases]
+    assert repo.search("plants sqlite") == []
+
+    # Name matches outrank body matches
+    other = notes.insert_note("Notes on chemistry", "Photosynthesis is mentioned here once.")
+    assert [r["note_id"] for r in repo.search("photosynthesis")] == [biology, other]
+
+    # FTS5 syntax in the input is taken literally
+    assert repo.search('"unbalanced OR (') == []
+    assert repo.search("   ") == []
+
+
+def test_triggers_keep_index_in_sync(db):
+    notes = NoteRepository(db.conn)
+    note_id = notes.insert_note("Old name", "content")
+    QuestionRepository(db.conn).insert_questions(note_id, [("Question about mitochondria?", "short_answer", "x")])
+    repo = NoteSearchRepository(db.conn)
+
+    db.cursor.execute("UPDATE note SET note_name = 'Renamed' WHERE note_id = ?", (note_id,))
+    db.conn.commit()
+    assert repo.search("old") == []
+    assert [r["note_id"] for r in repo.search("renamed")] == [note_id]
+
+    # Deleting the note cascades to its questions, whose triggers drop their index rows
+    notes.delete_note(note_id)
+    assert repo.search("mitochondria") == []
+    assert db.cursor.execute("SELECT COUNT(*) FROM note_search").fetchone()[0] == 0
+
+
+def test_search_invalid_inputs(db):
+    repo = NoteSearchRepository(db.conn)
+    with pytest.raises(Exception):
+        repo.search(123)
+    with pytest.raises(Exception):
+        repo.search("text", limit=0)
+
+
+def test_search_db_error(db, monkeypatch):
+    repo = NoteSearchRepository(db.conn)
+
+    class FailingCursor:
+        def execute(self, *args, **kwargs):
+            import sqlite3
+            raise sqlite3.Error("boom")
+
+    monkeypatch.setattr(repo, "cursor", FailingCursor())
+    with pytest.raises(Exception) as exc:
+        repo.search("anything")
+    assert "Failed to search notes" in str(exc.value)
@@ -79,3 +79,15 @@ def test_option_repo_db_errors(tmp_path, monkeypatch):
         assert ("Failed to insert options" in str(exc3.value)) or ("violates" in str(exc3.value))
     finally:
         db.close()
+
+
+def test_insert_options_for_questions(tmp_path):
+    db, qid = setup_db_with_question(tmp_path)
+    try:
+        repo = OptionRepository(db.conn)
+        repo.insert_options_for_questions({qid: ["A", " B ", ""]})
+        assert [row[2] for row in repo.get_options_by_question_id(qid)] == ["A", "B"]
+        with pytest.raises(Exception):
+            repo.insert_options_for_questions({0: ["A"]})
+    finally:
+        db.close()
@@ -0,0 +1,98 @@
+import pytest
+from repositories.my_db import MyDB
+from repositories.note_repository import NoteRepository
+from repositories.note_hashtag_repository import NoteHashtagRepository
+from repositories.prefix_index import PrefixIndex
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MyDB(db_path=str(tmp_path / "prefix.db"))
+    db.connect()
+    yield db
+    db.close()
+
+
+def test_prefix_index_search_add_remove():
+    index = PrefixIndex([("Python", 1), ("pytest", 2), ("Physics", 3), ("Python", 4)])
+    assert len(index) == 4
+    assert index.search("py") == ["pytest", "Python"]
+    assert index.search("PY", limit=1) == ["pytest"]
+    assert index.search("x") == []
+    # An empty prefix matches everything
+    assert index.search("", limit=10) == ["Physics", "pytest", "Python"]
+
+    index.add("Pyramids", 5)
+    assert index.search("pyr") == ["Pyramids"]
+    # Re-adding an id replaces its value
+    index.add("Chemistry", 5)
+    assert index.search("pyr") == []
+    assert index.search("chem") == ["Chemistry"]
+
+    # A shared value stays until its last entry is removed
+    index.remove(1)
+    assert index.search("python") == ["Python"]
+    index.remove(4)
+    assert index.search("python") == []
+    index.remove(99)
+    assert len(index) == 3
+
+    assert index.memory_footprint() > 0
+
+
+def test_repositories_keep_indexes_current(db):
+    name_index, hashtag_index = PrefixIndex(), PrefixIndex()
+    notes = NoteRepository(db.conn, name_index=name_index)
+    hashtags = NoteHashtagRepository(db.conn, hashtag_index=hashtag_index)
+
+    note_id = notes.insert_note("Organic chemistry", "content")
+    hashtags.insert_note_hashtags(note_id, ["chemistry", "Lab"])
+    hashtags.insert_hashtags(["labwork"], note_id=note_id)
+    assert name_index.search("org") == ["Organic chemistry"]
+    assert hashtags.suggest_hashtags("la") == ["Lab", "labwork"]
+    assert notes.suggest_note_names("organic") == ["Organic chemistry"]
+
+    notes.delete_note(note_id)
+    assert name_index.search("org") == []
+
+    # Writes rolled back with their unit of work never reach the index
+    with pytest.raises(RuntimeError):
+        with db.conn.transaction():
+            notes.insert_note("Phantom note", "content")
+            hashtags.insert_hashtags(["phantom"])
+            raise RuntimeError("abort")
+    assert name_index.search("phantom") == []
+    assert hashtag_index.search("phantom") == []
+
+    # Committed units update the index when they commit
+    with db.conn.transaction():
+        notes.insert_note("Committed note", "content")
+        assert name_index.search("committed") == []
+    assert name_index.search("committed") == ["Committed note"]
+
+
+def test_suggest_hashtags_without_index_uses_sql(db):
+    hashtags = NoteHashtagRepository(db.conn)
+    hashtags.insert_hashtags(["Python", "pytest", "100%_sure"])
+    assert hashtags.suggest_hashtags("PY") == ["pytest", "Python"]
+    assert hashtags.suggest_hashtags("100%_") == ["100%_sure"]
+    assert hashtags.suggest_hashtags("10_") == []
+    assert hashtags.suggest_hashtags(" ") == []
+    with pytest.raises(Exception):
+        hashtags.suggest_hashtags(1)
+
+
+def test_hashtag_suggestions_do_not_depend_on_process_age(db):
+    running_index = PrefixIndex()
+    hashtags = NoteHashtagRepository(db.conn, hashtag_index=running_index)
+    notes = NoteRepository(db.conn)
+    note_id = notes.insert_note("Genetics", "content")
+    hashtags.insert_note_hashtags(note_id, ["genes", "genome"])
+    hashtags.delete_hashtag_from_note(note_id, "genes")
+    notes.delete_note(note_id)
+
+    # An index built at startup the way the app builds it, and the SQL fallback, agree with the running index
+    restarted_index = PrefixIndex((hashtag, hashtag) for hashtag in hashtags.get_all_hashtags())
+    expected = hashtags.suggest_hashtags("gen")
+    assert restarted_index.search("gen") == expected == NoteHashtagRepository(db.conn).suggest_hashtags("gen")
+    assert expected == ["genes", "genome"]
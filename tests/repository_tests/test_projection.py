@@ -0,0 +1,73 @@
+import pytest
+from repositories.my_db import MyDB
+from repositories.projection import Projection
+from repositories.note_repository import NoteRepository
+from repositories.question_repository import QuestionRepository
+from repositories.option_repository import OptionRepository
+from repositories.grading_repository import GradingRepository
+from repositories.summary_repository import SummaryRepository
+
+LONG_TEXT = "The mitochondrion is the site of cellular respiration. " * 30
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MyDB(db_path=str(tmp_path / "projection.db"))
+    db.connect()
+    yield db
+    db.close()
+
+
+def test_resolve_validates_columns():
+    available = ("a_id", "name", "body")
+    assert Projection.resolve(None, available) == available
+    assert Projection.resolve(["body", "a_id"], available) == ("body", "a_id")
+    assert Projection.positions(("body", "a_id"), ["body"]) == (0,)
+    for columns in (["a_id; DROP TABLE note"], [], ["name", "name"], "name"):
+        with pytest.raises(ValueError):
+            Projection.resolve(columns, available)
+
+
+def test_repositories_fetch_only_requested_columns(db):
+    note_id = NoteRepository(db.conn).insert_note("Cells", LONG_TEXT)
+    summary_id = SummaryRepository(db.conn).insert_summary(note_id, LONG_TEXT)
+    questions = QuestionRepository(db.conn)
+    question_id = questions.insert_questions(note_id, [("Where does respiration happen?", "multiple_choice", "Mitochondria")])[0]
+    OptionRepository(db.conn).insert_options(question_id, ["Mitochondria", "Nucleus"])
+    gradings = GradingRepository(db.conn)
+    gradings.insert_grading(question_id, "Nucleus", "Mitochondria", "Incorrect", LONG_TEXT, "context")
+
+    # Default rows keep the full table shape
+    assert len(questions.get_all_questions(note_id)[0]) == len(QuestionRepository.COLUMNS)
+    assert questions.get_all_questions(note_id, columns=["question_id", "question"]) == [
+        (question_id, "Where does respiration happen?")
+    ]
+    assert questions.get_question_by_id(question_id, columns=("question_type",)) == ("multiple_choice",)
+    assert OptionRepository(db.conn).get_all_options([question_id], columns=["option"]) == [("Mitochondria",), ("Nucleus",)]
+    assert OptionRepository(db.conn).get_options_by_question_id(question_id, columns=["option_id"])[0][0] > 0
+
+    # Compressed columns are decoded wherever they land in a projected row
+    assert gradings.get_all_gradings([question_id], columns=["score", "question_id"]) == [("Incorrect", question_id)]
+    assert gradings.get_grading_by_question_id(question_id, columns=["correction_and_explanation", "score"]) == (LONG_TEXT, "Incorrect")
+    assert gradings.get_grading_by_question_id(question_id)[5] == LONG_TEXT
+    assert SummaryRepository(db.conn).get_summary_by_note_id(note_id, columns=["summary_id"]) == [(summary_id,)]
+    assert SummaryRepository(db.conn).get_summary_by_id(summary_id, columns=["summary"]) == (LONG_TEXT,)
+
+    with pytest.raises(Exception):
+        questions.get_all_questions(note_id, columns=["*"])
+
+
+def test_iter_note_content_walks_in_batches(db):
+    notes = NoteRepository(db.conn)
+    note_ids = [notes.insert_note(f"Note {i}", f"{LONG_TEXT} {i}") for i in range(5)]
+
+    walked = []
+    for note_id, content in notes.iter_note_content(batch_size=2):
+        # Other reads on the same repository between items do not disturb the walk
+        assert notes.get_note(note_id)[2] == content
+        walked.append(note_id)
+    assert walked == note_ids
+    assert notes.get_all_note_content() == [f"{LONG_TEXT} {i}" for i in range(5)]
+
+    with pytest.raises(ValueError):
+        next(notes.iter_note_content(batch_size=0))
@@ -76,3 +76,22 @@ def test_question_repo_db_errors(tmp_path, monkeypatch):
         assert ("Failed to insert question" in str(exc3.value)) or ("violates" in str(exc3.value))
     finally:
         db.close()
+
+
+def test_insert_questions_returns_ids_in_order(tmp_path, monkeypatch):
+    db, note_id = setup_db_with_note(tmp_path)
+    try:
+        repo = QuestionRepository(db.conn)
+        monkeypatch.setattr(QuestionRepository, "BATCH_SIZE", 2)
+        rows = [(f"Q{i}?", "short_answer", f"A{i}") for i in range(5)]
+        qids = repo.insert_questions(note_id, rows)
+        assert len(qids) == 5
+        assert [repo.get_question_by_id(qid)[2] for qid in qids] == [row[0] for row in rows]
+        assert repo.insert_questions(note_id, []) == []
+
+        with pytest.raises(Exception):
+            repo.insert_questions(note_id, [("Q?", "essay", "A")])
+        with pytest.raises(Exception):
+            repo.insert_questions(0, rows)
+    finally:
+        db.close()
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+from repositories.my_db import MyDB
+from repositories.connection_pool import ConnectionPool
+from repositories.rows import NoteRow, NoteDetailRow, QuestionRow, OptionRow, GradingRow, SummaryRow
+from repositories.note_repository import NoteRepository
+from repositories.question_repository import QuestionRepository
+from repositories.option_repository import OptionRepository
+from repositories.grading_repository import GradingRepository
+from repositories.summary_repository import SummaryRepository
+from repositories.note_aggregate_repository import NoteAggregateRepository
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MyDB(db_path=str(tmp_path / "rows.db"))
+    db.connect()
+    yield db
+    db.close()
+
+
+def test_convert_timestamp():
+    assert ConnectionPool.convert_timestamp(b"2024-05-01 09:30:00") == datetime(2024, 5, 1, 9, 30)
+    assert ConnectionPool.convert_timestamp(b"not a date") == "not a date"
+
+
+def test_repositories_return_typed_rows_with_datetimes(db):
+    notes = NoteRepository(db.conn)
+    note_id = notes.insert_note("Cells", "The cell is the unit of life.")
+    SummaryRepository(db.conn).insert_summary(note_id, "Cells")
+    question_id = QuestionRepository(db.conn).insert_questions(note_id, [("What is a cell?", "multiple_choice", "x")])[0]
+    OptionRepository(db.conn).insert_options(question_id, ["Unit of life", "Organ"])
+    GradingRepository(db.conn).insert_grading(question_id, "Organ", "Unit of life", "Incorrect", "No", "Context")
+
+    note = notes.get_all_notes()[0]
+    assert isinstance(note, NoteRow)
+    assert isinstance(note.created_at, datetime)
+    # Still a tuple: unpacking and indexing keep working, and there is no per-row __dict__
+    note_id_, note_name, created_at = note
+    assert (note_id_, note_name, note[2]) == (note_id, "Cells", created_at)
+    assert not hasattr(note, "__dict__")
+
+    detail = notes.get_note(note_id)
+    assert isinstance(detail, NoteDetailRow) and detail.note_content == "The cell is the unit of life."
+    assert isinstance(notes.search_notes(title="Ce")[0].created_at, datetime)
+
+    question = QuestionRepository(db.conn).get_question_by_id(question_id)
+    assert isinstance(question, QuestionRow) and question.question == "What is a cell?"
+    option = OptionRepository(db.conn).get_options_by_question_id(question_id)[0]
+    assert isinstance(option, OptionRow) and isinstance(option.created_at, datetime)
+    grading = GradingRepository(db.conn).get_grading_by_question_id(question_id)
+    assert isinstance(grading, GradingRow) and grading.score == "Incorrect"
+    summary = SummaryRepository(db.conn).get_summary_by_note_id(note_id)[0]
+    assert isinstance(summary, SummaryRow) and summary.summary == "Cells"
+
+    aggregate = NoteAggregateRepository(db.conn).get_note_aggregate(note_id)
+    assert isinstance(aggregate["note"].created_at, datetime)
+    assert aggregate["questions"][0]["grading"].user_answer == "Organ"
+
+    # Projections stay plain tuples
+    assert type(QuestionRepository(db.conn).get_question_by_id(question_id, columns=["question"])) is tuple
+
+
+def test_keyset_cursor_round_trips_datetime(db):
+    notes = NoteRepository(db.conn)
+    for i in range(5):
+        notes.insert_note(f"Note {i}", "content")
+    db.cursor.execute("UPDATE note SET created_at = datetime('2024-01-01', '+' || note_id || ' minutes')")
+    db.conn.commit()
+
+    first, cursor = notes.get_notes_page(page_size=2)
+    assert isinstance(cursor[0], datetime)
+    second, _ = notes.get_notes_page(page_size=2, after=cursor)
+    assert [n.note_name for n in first + second] == ["Note 4", "Note 3", "Note 2", "Note 1"]
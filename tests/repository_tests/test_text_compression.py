@@ -0,0 +1,88 @@
+import pytest
+from repositories import migrations
+from repositories.my_db import MyDB
+from repositories.migrations import SchemaMigrator
+from repositories.note_repository import NoteRepository
+from repositories.summary_repository import SummaryRepository
+from repositories.question_repository import QuestionRepository
+from repositories.grading_repository import GradingRepository
+from repositories.note_aggregate_repository import NoteAggregateRepository
+from repositories.note_search_repository import NoteSearchRepository
+from repositories.text_compression import TextCompression
+
+LONG_TEXT = "Mitochondria are the powerhouse of the cell. " * 40
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MyDB(db_path=str(tmp_path / "compression.db"))
+    db.connect()
+    yield db
+    db.close()
+
+
+def test_encode_decode_threshold_and_marker(monkeypatch):
+    encoded = TextCompression.encode(LONG_TEXT)
+    assert isinstance(encoded, bytes) and encoded.startswith(TextCompression.MARKER)
+    assert len(encoded) < len(LONG_TEXT)
+    assert TextCompression.decode(encoded) == LONG_TEXT
+
+    # Short text, plain TEXT values and other types pass through
+    assert TextCompression.encode("short") == "short"
+    assert TextCompression.decode("plain") == "plain"
+    assert TextCompression.decode(None) is None
+    assert TextCompression.decode(b"raw bytes") == b"raw bytes"
+    assert TextCompression.decode_row((1, encoded, "x"), (1,)) == (1, LONG_TEXT, "x")
+
+    monkeypatch.setattr(TextCompression, "ENABLED", False)
+    assert TextCompression.encode(LONG_TEXT) == LONG_TEXT
+
+
+def test_repositories_store_compressed_and_read_text(db):
+    note_id = NoteRepository(db.conn).insert_note("Cells", LONG_TEXT)
+    SummaryRepository(db.conn).insert_summary(note_id, LONG_TEXT)
+    question_id = QuestionRepository(db.conn).insert_questions(note_id, [("What are mitochondria?", "short_answer", "x")])[0]
+    GradingRepository(db.conn).upsert_gradings([(question_id, "u", "r", "Correct", LONG_TEXT, LONG_TEXT)])
+
+    stored = db.cursor.execute("""
+        SELECT typeof(b.content), typeof(s.summary), typeof(g.correction_and_explanation), typeof(g.additional_context)
+        FROM note n JOIN note_body b ON b.note_body_id = n.note_body_id
+        JOIN summary s ON s.note_id = n.note_id JOIN question q ON q.note_id = n.note_id
+        JOIN grading g ON g.question_id = q.question_id
+    """).fetchone()
+    assert stored == ("blob", "blob", "blob", "blob")
+
+    assert NoteRepository(db.conn).get_note(note_id)[2] == LONG_TEXT
+    assert NoteRepository(db.conn).search_note_content("powerhouse") == [LONG_TEXT]
+    assert SummaryRepository(db.conn).get_summary_by_note_id(note_id)[0][2] == LONG_TEXT
+    assert GradingRepository(db.conn).get_grading_by_question_id(question_id)[5:7] == (LONG_TEXT, LONG_TEXT)
+    aggregate = NoteAggregateRepository(db.conn).get_note_aggregate(note_id)
+    assert aggregate["note"][2] == LONG_TEXT
+    assert aggregate["summary"] == LONG_TEXT
+    assert aggregate["questions"][0]["grading"][5] == LONG_TEXT
+
+    # The full-text index holds the decoded text
+    results = NoteSearchRepository(db.conn).search("powerhouse")
+    assert [r["note_id"] for r in results] == [note_id]
+    assert "**powerhouse**" in results[0]["snippet"]
+
+
+def test_migration_compresses_existing_rows(tmp_path, monkeypatch):
+    # A database at version 7, with the content stored as plain TEXT
+    all_migrations = migrations.MIGRATIONS
+    monkeypatch.setattr(migrations, "MIGRATIONS", all_migrations[:7])
+    db = MyDB(db_path=str(tmp_path / "v7.db"))
+    db.connect()
+    try:
+        db.cursor.execute("INSERT INTO note (note_name, note_content) VALUES ('Cells', ?)", (LONG_TEXT,))
+        db.conn.commit()
+        note_id = db.cursor.lastrowid
+        assert db.cursor.execute("SELECT typeof(note_content) FROM note").fetchone()[0] == "text"
+
+        monkeypatch.setattr(migrations, "MIGRATIONS", all_migrations[:8])
+        assert SchemaMigrator.migrate(db.pool.get_connection(), db.cursor) == [8]
+        assert db.cursor.execute("SELECT typeof(note_content) FROM note").fetchone()[0] == "blob"
+        assert db.cursor.execute("SELECT decompress_text(note_content) FROM note").fetchone()[0] == LONG_TEXT
+        assert [r["note_id"] for r in NoteSearchRepository(db.conn).search("mitochondria")] == [note_id]
+    finally:
+        db.close()